@@ -0,0 +1,338 @@
+# 📁 benchmark.py - Engine scaling benchmark (no LLM)
+# 🎯 Core function: Per-phase time, peak RSS and world-state size for synthetic worlds of growing size
+# 🔗 Key dependencies: simulator, subprocess (one process per size for clean peak RSS), resource
+# 💡 Usage: python benchmark.py [--sizes 10,1000,10000,100000] [--days 3] [--save-baseline | --check] [--prompts]
+
+import argparse
+import asyncio
+import contextlib
+import json
+import os
+import re
+import subprocess
+import sys
+import tempfile
+import time
+
+try:
+    import resource
+except ImportError:
+    resource = None  # Windows: peak RSS is not reported
+
+
+DEFAULT_SIZES = (10, 1_000, 10_000, 100_000)
+NPCS_PER_LOCATION = 20
+ROLES = ("king", "guard", "peasant", "merchant", "hunter", "sage", "child")
+
+BASELINE_PATH = "benchmark_baseline.json"
+THRESHOLD = 0.25  # Allowed slowdown/growth vs baseline (25 %)
+MIN_SECONDS = 0.005  # Timings below this are too noisy to compare
+
+# --prompts: decision prompt layouts compared against PrefixCachingServer
+PROMPT_MODES = {
+    "off": None,  # One self-contained user message per decision
+    "prefix": {"enabled": True, "conversation": "none"},
+    "npc": {"enabled": True, "conversation": "npc"},
+    "location": {"enabled": True, "conversation": "location"}
+}
+PROMPT_NPCS = 60
+PROMPT_DAYS = 6
+TARGET_PATTERN = re.compile(r"'([^']+)': -?\d+")
+
+
+def peak_rss_mib() -> float:
+    """Peak resident set size of this process"""
+    if resource is None:
+        return 0.0
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak / (1024 * 1024) if sys.platform == "darwin" else peak / 1024
+
+
+def build_world(npc_count: int, output_dir: str, seed: int = 0):
+    """Synthetic world: npc_count NPCs spread over many small locations"""
+    from config import CONFIG
+    from models import NPC, Location
+    from simulator import WorldSimulator
+
+    CONFIG["background_save"] = False  # Time the full save inline
+    simulator = WorldSimulator(seed=seed, output_dir=output_dir)
+    simulator.relationship_init = "location"  # All pairs is quadratic in the world size
+
+    location_count = max(3, npc_count // NPCS_PER_LOCATION)
+    names = [f"Location {i}" for i in range(location_count)]
+    for i, name in enumerate(names):
+        simulator.locations[name] = Location(name, "settlement", "Synthetic location")
+        simulator.location_events[name] = ["market day", "wolf attack", "festival", "harvest"]
+    for i in range(npc_count):
+        npc_id = f"npc_{i}"
+        location = simulator.locations[names[i % location_count]]
+        simulator.npcs[npc_id] = NPC(npc_id, f"Person {i}", ROLES[i % len(ROLES)], location.name,
+                                     simulator.streams.stream(0, npc_id, "init"))
+        location.npc_ids.append(npc_id)
+    simulator.world_initialized = True
+    return simulator
+
+
+def timed(timings: dict, name: str, func, *args):
+    """Call func and add its wall time to timings[name]"""
+    started = time.perf_counter()
+    result = func(*args)
+    timings[name] = timings.get(name, 0.0) + time.perf_counter() - started
+    return result
+
+
+def run_size(npc_count: int, days: int) -> dict:
+    """Benchmark one world size in this process (stdout is silenced)"""
+    with tempfile.TemporaryDirectory() as output_dir, open(os.devnull, "w") as devnull:
+        with contextlib.redirect_stdout(devnull):
+            started = time.perf_counter()
+            simulator = build_world(npc_count, output_dir)
+            build_seconds = time.perf_counter() - started
+
+            setup = {}
+            timed(setup, "init_relationships", simulator._init_relationships)
+
+            phases = {}
+            for day in range(1, days + 1):
+                simulator.current_day = day
+                timed(phases, "clear_daily_data", simulator._clear_daily_data)
+                timed(phases, "update_aging", simulator._update_aging)
+                timed(phases, "rule_based_decisions", simulator._rule_based_decisions)
+                timed(phases, "random_events", simulator._random_events)
+                timed(phases, "log_day", simulator._log_day)
+                timed(phases, "save_world_state", simulator._save_world_state)
+
+            state_path = simulator.state_writer.path
+            state_bytes = os.path.getsize(state_path)
+            timed(setup, "chronicle_data", simulator._collect_chronicle_data)
+            simulator.state_writer.close()
+
+    return {
+        "npcs": npc_count,
+        "locations": len(simulator.locations),
+        "days": days,
+        "build_seconds": round(build_seconds, 4),
+        "setup_seconds": {name: round(seconds, 6) for name, seconds in setup.items()},
+        "phase_seconds_per_day": {name: round(seconds / days, 6) for name, seconds in phases.items()},
+        "state_bytes": state_bytes,
+        "peak_rss_mib": round(peak_rss_mib(), 1)
+    }
+
+
+def run_isolated(npc_count: int, days: int) -> dict:
+    """Run one size in a fresh interpreter so peak RSS belongs to that size"""
+    output = subprocess.run(
+        [sys.executable, os.path.abspath(__file__), "--worker", str(npc_count), "--days", str(days)],
+        check=True, capture_output=True, text=True, cwd=os.path.dirname(os.path.abspath(__file__))
+    ).stdout
+    return json.loads(output.strip().splitlines()[-1])
+
+
+def flatten(result: dict) -> dict:
+    """Comparable metrics of one size: name -> value"""
+    metrics = {f"setup.{name}": value for name, value in result["setup_seconds"].items()}
+    metrics.update({f"phase.{name}": value for name, value in result["phase_seconds_per_day"].items()})
+    metrics["state_bytes"] = result["state_bytes"]
+    metrics["peak_rss_mib"] = result["peak_rss_mib"]
+    return metrics
+
+
+def compare(results: list, baseline: dict, threshold: float) -> list:
+    """Regressions as (size, metric, baseline, current) above the threshold"""
+    regressions = []
+    for result in results:
+        previous = baseline.get(str(result["npcs"]))
+        if not previous:
+            continue
+        old_metrics = flatten(previous)
+        for name, value in flatten(result).items():
+            old = old_metrics.get(name)
+            if old is None:
+                continue
+            if name.startswith(("setup.", "phase.")) and max(old, value) < MIN_SECONDS:
+                continue
+            if value > old * (1 + threshold):
+                regressions.append((result["npcs"], name, old, value))
+    return regressions
+
+
+def print_result(result: dict):
+    phases = result["phase_seconds_per_day"]
+    print(f"👥 {result['npcs']:>7} NPCs / {result['locations']} locations "
+          f"(build {result['build_seconds']:.2f}s, peak RSS {result['peak_rss_mib']:.0f} MiB)")
+    for name, seconds in result["setup_seconds"].items():
+        print(f"   ⚙️ {name:<22} {seconds * 1000:10.2f} ms")
+    for name, seconds in phases.items():
+        print(f"   ⏱️ {name:<22} {seconds * 1000:10.2f} ms/day")
+    print(f"   💾 world_state.json       {result['state_bytes'] / 1024:10.1f} KiB")
+
+
+class PrefixCachingServer:
+    """Stand-in for ollama.AsyncClient.chat that models a prompt (KV) cache.
+
+    Each of `slots` slots keeps the tokens of its last prompt and reply. As
+    in llama.cpp-based servers, a request takes the slot sharing the longest
+    token prefix with it if that covers at least `similarity` of the prompt,
+    else the least recently used slot; only the unshared rest of the prompt
+    is evaluated. Time to first token is proportional to the evaluated
+    tokens; prompt_eval_count reports them."""
+
+    def __init__(self, slots: int = 4, similarity: float = 0.5,
+                 prefill_seconds: float = 0.0002, decode_seconds: float = 0.001):
+        self.slots = [[] for _ in range(slots)]
+        self.similarity = similarity
+        self.last_used = [0] * slots
+        self.prefill_seconds = prefill_seconds  # Per evaluated prompt token
+        self.decode_seconds = decode_seconds  # Per generated token
+        self.requests = 0
+
+    @staticmethod
+    def tokenize(messages) -> list:
+        """Whitespace tokens with a marker per message role"""
+        tokens = []
+        for message in messages:
+            tokens.append(f"<{message['role']}>")
+            tokens.extend(message["content"].split())
+        return tokens
+
+    async def chat(self, model: str, messages: list, stream: bool = False, **options):
+        self.requests += 1
+        tokens = self.tokenize(messages)
+        shared_by_slot = []
+        for cached in self.slots:
+            common = 0
+            for cached_token, token in zip(cached, tokens):
+                if cached_token != token:
+                    break
+                common += 1
+            shared_by_slot.append(common)
+        best = max(range(len(self.slots)), key=shared_by_slot.__getitem__)
+        if shared_by_slot[best] < self.similarity * len(tokens):
+            best = min(range(len(self.slots)), key=self.last_used.__getitem__)
+        shared = shared_by_slot[best]
+        target = TARGET_PATTERN.search(messages[-1]["content"])
+        reply = json.dumps({"action": "chat", "target": target.group(1) if target else "", "reason": "a quiet day"})
+        self.slots[best] = tokens + ["<assistant>"] + reply.split()
+        self.last_used[best] = self.requests
+        return self._stream(len(tokens) - shared, reply.split(" "))
+
+    async def _stream(self, evaluated: int, words: list):
+        await asyncio.sleep(evaluated * self.prefill_seconds)
+        for i, word in enumerate(words):
+            if i:
+                await asyncio.sleep(self.decode_seconds)
+            yield {"message": {"content": word if i == 0 else f" {word}"}, "done": False}
+        yield {"message": {"content": ""}, "done": True, "prompt_eval_count": evaluated}
+
+
+def run_prompt_mode(mode: str, npc_count: int, days: int, slots: int = 4, seed: int = 0) -> dict:
+    """LLM decisions of one prompt layout against the stand-in server"""
+    from llm_clients import LLMManager
+
+    async def run_days(simulator):
+        for day in range(1, days + 1):
+            simulator.current_day = day
+            simulator._clear_daily_data()
+            simulator._update_aging()
+            simulator._rule_based_decisions()
+            await simulator._llm_decisions()
+            simulator._random_events()
+            simulator._log_day()
+
+    with tempfile.TemporaryDirectory() as output_dir, open(os.devnull, "w") as devnull:
+        with contextlib.redirect_stdout(devnull):
+            simulator = build_world(npc_count, output_dir, seed)
+            simulator._init_relationships()
+            manager = LLMManager("stand-in", "sk-your-deepseek-key-here", prompt_cache=PROMPT_MODES[mode])
+            manager.ollama.client = PrefixCachingServer(slots)
+            manager.ollama_available = True
+            simulator.llm_manager = manager
+            started = time.perf_counter()
+            asyncio.run(run_days(simulator))
+            elapsed = time.perf_counter() - started
+            simulator.state_writer.close()
+    result = manager.prompt_status()
+    result["mode"] = mode
+    result["seconds"] = round(elapsed, 3)
+    return result
+
+
+def run_prompts(npc_count: int, days: int, slots: int) -> list:
+    """Compare prompt layouts: prompt tokens evaluated and time to first token"""
+    print(f"🧮 Prompt cache benchmark: {npc_count} NPCs, {days} days, "
+          f"stand-in prefix-caching server with {slots} cache slots\n")
+    results = []
+    for mode in PROMPT_MODES:
+        result = run_prompt_mode(mode, npc_count, days, slots)
+        results.append(result)
+        print(f"   {mode:<9} {result['decisions']:>5} decisions  "
+              f"{result['avg_prompt_eval_tokens']:>7.1f} prompt tokens/decision  "
+              f"TTFT {result['avg_ttft'] * 1000:7.2f} ms  total {result['seconds']:.2f}s")
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Scaling benchmark of the non-LLM simulation core")
+    parser.add_argument("--sizes", default=",".join(str(size) for size in DEFAULT_SIZES))
+    parser.add_argument("--days", type=int, default=3)
+    parser.add_argument("--baseline", default=BASELINE_PATH)
+    parser.add_argument("--save-baseline", action="store_true", help="store these results as the baseline")
+    parser.add_argument("--check", action="store_true", help="exit 1 if a metric regressed past the threshold")
+    parser.add_argument("--threshold", type=float, default=THRESHOLD)
+    parser.add_argument("--output", help="also write the results to this JSON file")
+    parser.add_argument("--prompts", action="store_true",
+                        help="compare decision prompt layouts against a stand-in prefix-caching server")
+    parser.add_argument("--slots", type=int, default=4, help="cache slots of the stand-in server (--prompts)")
+    parser.add_argument("--worker", type=int, help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.worker is not None:
+        print(json.dumps(run_size(args.worker, args.days)))
+        return
+
+    if args.prompts:
+        results = run_prompts(PROMPT_NPCS, PROMPT_DAYS, args.slots)
+        if args.output:
+            with open(args.output, "w", encoding="utf-8") as f:
+                json.dump(results, f, indent=2)
+        return
+
+    sizes = [int(size) for size in args.sizes.split(",") if size]
+    print(f"📊 Engine benchmark: sizes {sizes}, {args.days} days each\n")
+    results = []
+    for size in sizes:
+        result = run_isolated(size, args.days)
+        print_result(result)
+        results.append(result)
+
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(results, f, indent=2)
+
+    if args.save_baseline:
+        baseline = {}
+        if os.path.exists(args.baseline):
+            with open(args.baseline, "r", encoding="utf-8") as f:
+                baseline = json.load(f)
+        baseline.update({str(result["npcs"]): result for result in results})
+        with open(args.baseline, "w", encoding="utf-8") as f:
+            json.dump(baseline, f, indent=2)
+        print(f"\n💾 Baseline saved to {args.baseline}")
+
+    if args.check:
+        if not os.path.exists(args.baseline):
+            print(f"\n⚠️ No baseline at {args.baseline}: run with --save-baseline first")
+            sys.exit(1)
+        with open(args.baseline, "r", encoding="utf-8") as f:
+            baseline = json.load(f)
+        regressions = compare(results, baseline, args.threshold)
+        if regressions:
+            print(f"\n❌ {len(regressions)} regressions (> {args.threshold:.0%} over baseline):")
+            for size, name, old, value in regressions:
+                print(f"   {size} NPCs {name}: {old} → {value}")
+            sys.exit(1)
+        print(f"\n✅ No regressions over {args.threshold:.0%} vs {args.baseline}")
+
+
+if __name__ == "__main__":
+    main()
@@ -9,6 +9,8 @@ CONFIG = {
     "max_days": 10,
     "llm_decision_chance": 0.4,  # 30% decisions via LLM
     "random_event_chance": 0.25,
+    "neighbor_top_k": 3,  # Strongest friends/enemies offered as LLM targets
+    "relationship_thresholds": {"friend": 50, "enemy": -30},  # Friends above, enemies below
     
     # World generation settings
     "world_generation": {
@@ -20,6 +22,110 @@ CONFIG = {
     "ollama_model": "qwen2.5:3b",  # Ollama model
     "deepseek_api_key": os.getenv("DEEPSEEK_API_KEY"),
     
+    # Engine: "daily" (sweep every NPC each day) or "events" (discrete-event scheduler)
+    "engine": "daily",
+    "event_engine": {
+        "resolution": 1.0,  # Time step in days (e.g. 0.25 for sub-day events)
+        "max_gap": 30.0,  # Longest gap between two needs checks of one NPC
+        "save_every": 0  # Save world state every N days (0 = only at the end)
+    },
+    
+    # Pipelined mode: prefetch next-day LLM decisions from a predicted state
+    "prefetch": {
+        "enabled": False,
+        "stat_tolerance": 15  # Max |actual - predicted| per stat to accept a prefetched decision
+    },
+    
+    # Asynchronous decisions: days advance with rule-based fallbacks, LLM decisions apply when they arrive
+    "decision_queue": {
+        "enabled": False,
+        "max_depth": 64,  # Outstanding requests; the oldest is cancelled when full
+        "max_staleness": 2,  # Days a late decision stays applicable
+        "wait_budget": 0.5  # Seconds per day to wait for outstanding requests (0: never wait)
+    },
+    
+    # Adaptive (AIMD) limit on in-flight Ollama requests, seeded by a warm-up probe
+    "llm_concurrency": {
+        "initial": 1,
+        "min": 1,
+        "max": 16,
+        "latency_tolerance": 2.0,  # Latency above tolerance x baseline counts as a spike
+        "backoff": 0.5,  # Multiplicative decrease on spikes/errors
+        "probe": True,  # Warm up the model and try 2, 4, ... parallel requests at startup
+        "probe_max": 8
+    },
+    
+    # KV-cache-friendly decision prompts: a stable per-location system prefix the server can cache,
+    # optionally inside a persistent conversation ("npc" or "location") that only receives each day's turn
+    "prompt_cache": {
+        "enabled": False,
+        "conversation": "none",  # "none", "npc" or "location"
+        "max_turns": 8,  # Restart a conversation after this many turns (bounds context length)
+        "max_conversations": 1024,  # Least recently used conversations are dropped beyond this
+        "keep_alive": "30m"  # Keep the model (and its cached prefixes) loaded between requests
+    },
+    
+    # Distilled local policy: a decision table trained from recorded LLM decisions
+    # (python local_policy.py decisions.jsonl) answers confident cases without the LLM
+    "local_policy": {
+        "enabled": False,
+        "path": "policy.json",  # Trained table
+        "threshold": 0.8,  # Minimum confidence to answer locally; the rest goes to Ollama
+        "min_samples": 5,  # Situations seen fewer times always go to Ollama
+        "audit_rate": 0.05,  # Share of confident decisions also asked of the LLM to measure agreement
+        "audit_seed": 0,  # Seed of the audit rolls (keyed by day and NPC, so runs repeat exactly)
+        "record_path": None  # Append every LLM decision to this JSONL file (training data), e.g. "decisions.jsonl"
+    },
+    
+    # Multi-world host (python world_host.py): worlds share one LLM pool
+    "world_host": {
+        "worlds": 4,
+        "concurrency": 16,  # Workers across all worlds (upper bound; llm_concurrency adapts below it)
+        "output_root": "worlds",  # Each world writes to output_root/world_<i>/
+        "seed": None  # World i uses seed + i (None = unseeded)
+    },
+    
+    # Per-NPC episodic memory: a few relevant memories are added to decision prompts (needs numpy)
+    "memory": {
+        "enabled": False,
+        "dim": 128,  # Hashed bag-of-words embedding size
+        "capacity": 256,  # Memories kept per NPC (least important evicted first)
+        "top_k": 3,  # Memories per prompt
+        "max_chars": 120  # Per memory, so prompt growth is capped
+    },
+    
+    # World state output
+    "state_path": "world_state.json",
+    "background_save": True,  # Serialize and write on a background thread
+    
+    # Columnar per-day export (.npy columns, needs numpy)
+    "timeseries": {
+        "enabled": False,
+        "directory": "timeseries"
+    },
+    
+    # Live status HTTP server with per-day diff stream (SSE)
+    "status_server": {
+        "enabled": False,
+        "host": "127.0.0.1",
+        "port": 8765
+    },
+    
+    # Metrics and profiling (no overhead when disabled)
+    "metrics": {
+        "enabled": False,
+        "jsonl_path": "metrics.jsonl",  # One line per day
+        "prometheus_path": "metrics.prom",  # Prometheus textfile collector
+        "profile_days": None,  # e.g. (3, 5) to sample-profile days 3..5
+        "profile_interval": 0.005,  # Seconds between profiler samples
+        "profile_path": "profile_day_{day}.folded"
+    },
+    
+    # External scenario (rules .json/.toml + CSV/JSONL rosters) instead of the lists below
+    "scenario": None,  # e.g. "scenarios/medieval/scenario.toml"
+    "scenario_cache": True,  # Compile rosters to <rules>.cache for fast repeat loads
+    "relationship_init": "all",  # "all" pairs, "location" (same location only) or "none"
+    
     # Locations
     "locations": [
         ("Castle", "royal", "Majestic castle with stone walls"),
@@ -0,0 +1,156 @@
+# 📁 decision_queue.py - Asynchronous LLM decision queue
+# 🎯 Core function: Let days advance without waiting for the model; apply late decisions on a later day
+# 🔗 Key dependencies: asyncio, collections
+# 💡 Usage: Used by WorldSimulator when CONFIG["decision_queue"]["enabled"] is set
+
+import asyncio
+import time
+from collections import Counter, OrderedDict
+from typing import Dict, List, Optional, Tuple
+
+
+class QueuedDecision:
+    """One outstanding decision request"""
+
+    __slots__ = ("npc_id", "day", "task")
+
+    def __init__(self, npc_id: str, day: int, task: asyncio.Task):
+        self.npc_id = npc_id
+        self.day = day  # Day the decision was requested for
+        self.task = task
+
+
+class DecisionQueue:
+    """Bounded queue of in-flight decisions, at most one per NPC.
+
+    submit() never waits. At the start of each day wait() gives outstanding
+    requests up to wait_budget seconds; finished decisions are then collected
+    with ready() and the caller validates and applies them with their
+    original day. When the queue is full the oldest request is cancelled.
+
+    Each day drains roughly concurrency * (wait_budget + day time) / latency
+    requests. While that is at least the day's candidates nearly every
+    request is applied; below it the queue fills and the excess is dropped
+    (dropped ~ submitted - drained), so raise wait_budget or max_depth when
+    the final applied/dropped ratio is low."""
+
+    def __init__(self, max_depth: int = 64, max_staleness: int = 2, wait_budget: float = 0.5):
+        self.max_depth = max_depth
+        self.max_staleness = max_staleness  # Days after which a late decision is discarded
+        self.wait_budget = wait_budget  # Seconds per day spent waiting for outstanding requests
+        self.pending: "OrderedDict[str, QueuedDecision]" = OrderedDict()  # Oldest first
+
+        # Totals over the whole run
+        self.submitted = 0
+        self.applied = 0
+        self.dropped = 0  # Cancelled to make room (drop-oldest) or still pending at the end
+        self.expired = 0  # Arrived later than max_staleness days
+        self.rejected = 0  # Arrived in time but no longer valid (dead NPC, target gone)
+        self.failed = 0  # Request returned nothing or raised
+        self.fallbacks = 0  # Rule-based decisions made instead of waiting
+        self.waited_seconds = 0.0  # Time spent in wait()
+        self.staleness = Counter()  # Days late -> applied decisions
+
+    @classmethod
+    def from_config(cls, settings: Optional[Dict]) -> Optional["DecisionQueue"]:
+        """Create a queue from CONFIG["decision_queue"], or None if disabled"""
+        if not settings or not settings.get("enabled"):
+            return None
+        return cls(
+            max_depth=settings.get("max_depth", 64),
+            max_staleness=settings.get("max_staleness", 2),
+            wait_budget=settings.get("wait_budget", 0.5)
+        )
+
+    @property
+    def depth(self) -> int:
+        return len(self.pending)
+
+    def has_pending(self, npc_id: str) -> bool:
+        return npc_id in self.pending
+
+    def submit(self, npc_id: str, day: int, coro) -> bool:
+        """Start a request unless the NPC already has one outstanding"""
+        if npc_id in self.pending:
+            coro.close()
+            return False
+        while len(self.pending) >= self.max_depth:
+            _, oldest = self.pending.popitem(last=False)
+            oldest.task.cancel()
+            self.dropped += 1
+        self.pending[npc_id] = QueuedDecision(npc_id, day, asyncio.ensure_future(coro))
+        self.submitted += 1
+        return True
+
+    async def wait(self) -> float:
+        """Let outstanding requests finish for up to wait_budget seconds; returns the seconds waited"""
+        if not self.pending or self.wait_budget <= 0:
+            await asyncio.sleep(0)  # Still let requests that just finished complete
+            return 0.0
+        started = time.perf_counter()
+        await asyncio.wait([entry.task for entry in self.pending.values()], timeout=self.wait_budget)
+        waited = time.perf_counter() - started
+        self.waited_seconds += waited
+        return waited
+
+    def ready(self, day: int) -> List[Tuple[str, int, Dict]]:
+        """Finished decisions as (npc_id, requested day, decision), oldest first.
+
+        Decisions older than max_staleness days are counted and dropped."""
+        finished = []
+        for npc_id, entry in list(self.pending.items()):
+            if not entry.task.done():
+                continue
+            del self.pending[npc_id]
+            decision = None if entry.task.cancelled() or entry.task.exception() else entry.task.result()
+            if not decision:
+                self.failed += 1
+            elif day - entry.day > self.max_staleness:
+                self.expired += 1
+            else:
+                finished.append((npc_id, entry.day, decision))
+        return finished
+
+    def record_fallback(self):
+        """Count a rule-based decision made while the model was still thinking"""
+        self.fallbacks += 1
+
+    def record_applied(self, requested_day: int, day: int, applied: bool):
+        """Count the outcome of a ready decision"""
+        if applied:
+            self.applied += 1
+            self.staleness[day - requested_day] += 1
+        else:
+            self.rejected += 1
+
+    def close(self):
+        """Cancel requests that will never be applied"""
+        for entry in self.pending.values():
+            entry.task.cancel()
+            self.dropped += 1
+        self.pending = OrderedDict()
+
+    def average_staleness(self) -> float:
+        applied = sum(self.staleness.values())
+        return sum(days * count for days, count in self.staleness.items()) / applied if applied else 0.0
+
+    def to_dict(self) -> Dict:
+        """Queue statistics for logs"""
+        return {
+            "depth": self.depth,
+            "submitted": self.submitted,
+            "applied": self.applied,
+            "fallbacks": self.fallbacks,
+            "dropped": self.dropped,
+            "expired": self.expired,
+            "rejected": self.rejected,
+            "failed": self.failed,
+            "waited_seconds": round(self.waited_seconds, 2),
+            "staleness_days": dict(sorted(self.staleness.items())),
+            "average_staleness": round(self.average_staleness(), 2)
+        }
+
+    def report_day(self, day: int, applied_today: int):
+        """Print the queue state for one day"""
+        print(f"📬 [QUEUE] Day {day}: {applied_today} late decisions applied, depth {self.depth}/{self.max_depth}, "
+              f"{self.fallbacks} fallbacks so far, avg staleness {self.average_staleness():.2f} days")
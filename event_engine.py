@@ -0,0 +1,323 @@
+# 📁 event_engine.py - Discrete-event simulation engine
+# 🎯 Core function: Process each NPC only when its next event is due (priority queue)
+# 🔗 Key dependencies: heapq, math, random, simulator (shared rules)
+# 💡 Usage: await simulator.run_event_driven() or CONFIG["engine"] = "events"
+
+import heapq
+import itertools
+import math
+import random
+from collections import Counter
+from typing import Dict, List, Set
+
+
+
+# Event kinds
+EVENT_NEED = "need"          # NPC needs: eat/rest/work, health decline, death
+EVENT_SOCIAL = "social"      # NPC social (LLM) decision
+EVENT_LOCATION = "location"  # Random location event
+
+# Order of events due at the same time (mirrors the daily phase order)
+EVENT_PRIORITY = {EVENT_NEED: 0, EVENT_SOCIAL: 1, EVENT_LOCATION: 2}
+
+# Daily drift ranges (same as WorldSimulator._update_aging)
+ENERGY_LOSS = (10, 25)
+HUNGER_GAIN = (15, 30)
+AGE_PER_DAY = 0.1
+
+# Thresholds of the basic-needs rules
+HUNGER_LIMIT = 70
+ENERGY_LOW = 30
+ENERGY_WORK = 60
+WORK_CHANCE = 0.6
+
+
+def geometric_days(p: float, rng=random) -> float:
+    """Days until the first success of a daily Bernoulli(p) trial (>= 1)"""
+    if p <= 0:
+        return math.inf
+    if p >= 1:
+        return 1
+    return int(math.log(1.0 - rng.random()) / math.log(1.0 - p)) + 1
+
+
+def sum_daily_draws(low: int, high: int, days: float, rng=random) -> int:
+    """Sum of randint(low, high) drawn once per day over a (fractional) span.
+
+    Short spans are drawn exactly; long spans use the matching normal
+    approximation so the cost does not grow with the gap."""
+    whole = int(days)
+    fraction = days - whole
+    if whole <= 8:
+        total = sum(rng.randint(low, high) for _ in range(whole))
+    else:
+        mean = (low + high) / 2
+        variance = ((high - low + 1) ** 2 - 1) / 12
+        total = rng.gauss(whole * mean, math.sqrt(whole * variance))
+    if fraction:
+        total += fraction * rng.randint(low, high)
+    return int(round(total))
+
+
+class EventScheduler:
+    """Priority queue of timestamped events.
+
+    Events due at the same time run in phase order (needs, social, location),
+    then in insertion order."""
+
+    def __init__(self):
+        self._heap = []
+        self._seq = itertools.count()
+
+    def __len__(self):
+        return len(self._heap)
+
+    def schedule(self, time: float, kind: str, key: str, version: int = 0):
+        """Queue an event at a simulation time (in days)"""
+        heapq.heappush(self._heap, (time, EVENT_PRIORITY[kind], next(self._seq), kind, key, version))
+
+    def peek_time(self) -> float:
+        return self._heap[0][0] if self._heap else math.inf
+
+    def pop(self):
+        """Remove and return (time, kind, key, version)"""
+        time, _, _, kind, key, version = heapq.heappop(self._heap)
+        return time, kind, key, version
+
+
+class EventDrivenEngine:
+    """Alternative to the fixed daily sweep with the same rules.
+
+    Stats drift lazily: an NPC is only advanced when one of its events fires
+    (needs threshold crossing, work opportunity, health decline, social
+    decision) or an event hits its location. Between events the daily drift is
+    applied in one step, so the cost scales with the number of events.
+    Results match the daily engine in distribution, not draw-for-draw."""
+
+    def __init__(self, simulator, resolution: float = 1.0, max_gap: float = 30.0, save_every: int = 0):
+        self.sim = simulator
+        self.streams = simulator.streams
+        self.resolution = resolution  # Smallest time step in days (e.g. 0.25)
+        self.max_gap = max_gap  # Longest time an NPC goes without a need check
+        self.save_every = save_every  # Save world state every N days (0 = only at the end)
+        self.scheduler = EventScheduler()
+        self.now = 0.0
+        self.last_update: Dict[str, float] = {}
+        self.versions: Dict[str, int] = {}
+        self.work_versions: Dict[str, int] = {}  # Need events that are a drawn work success
+        self.touched_npcs: Set[str] = set()
+        self.touched_locations: Set[str] = set()
+        self.processed = Counter()
+
+    def _quantize(self, time: float) -> float:
+        """Round a time up to the engine resolution"""
+        steps = math.ceil(time / self.resolution - 1e-9)
+        return max(steps, 1) * self.resolution if time > 0 else self.resolution
+
+    def _rng(self, entity: str, purpose: str, counter: int = 0):
+        """An entity's random stream at the current time step"""
+        return self.streams.stream(int(round(self.now / self.resolution)), entity, purpose, counter)
+
+    def start(self, now: float = 0.0):
+        """Schedule the first events of every NPC and location"""
+        self.now = now
+        for npc in self.sim.npcs.values():
+            if not npc.alive:
+                continue
+            self.last_update[npc.id] = now
+            self._schedule_need(npc)
+            self._schedule_social(npc)
+        for location in self.sim.locations.values():
+            self._schedule_location(location.name)
+
+    # --- scheduling ---
+
+    def _schedule_need(self, npc):
+        """(Re)schedule an NPC's next needs check, invalidating the old one"""
+        version = self.versions.get(npc.id, 0) + 1
+        self.versions[npc.id] = version
+        gap, is_work = self._next_need_gap(npc, version)
+        if is_work:
+            self.work_versions[npc.id] = version
+        self.scheduler.schedule(self.now + gap, EVENT_NEED, npc.id, version)
+
+    def _next_need_gap(self, npc, version: int):
+        """Days until a basic-needs rule could next fire: (gap, is_work_success).
+
+        Threshold checks use the fastest possible drift, so a crossing is never
+        skipped; work days are drawn geometrically from the daily work chance."""
+        if npc.age > 65 or npc.mood <= 40:
+            return 1, False  # Health declines daily: track closely
+
+        gap = min(
+            math.floor(max(HUNGER_LIMIT - npc.hunger, 0) / HUNGER_GAIN[1]) + 1,
+            math.floor(max(npc.energy - ENERGY_LOW, 0) / ENERGY_LOSS[1]) + 1,
+            self.max_gap
+        )
+        if npc.energy > ENERGY_WORK:
+            # Energy stays above the work threshold at most this long (slowest drift)
+            work_window = (npc.energy - ENERGY_WORK) / ENERGY_LOSS[0] + 1
+            work_gap = geometric_days(WORK_CHANCE, self._rng(npc.id, "work", version))
+            if work_gap <= min(gap, work_window):
+                return work_gap, True
+        return gap, False
+
+    def _occurrence_time(self, daily_chance: float, rng) -> float:
+        """Time of the next daily-chance occurrence, placed within its day"""
+        gap = geometric_days(daily_chance, rng)
+        if gap == math.inf:
+            return math.inf
+        day_start = math.floor(self.now + 1e-9)
+        within_day = self._quantize(rng.random()) if self.resolution < 1 else 1.0
+        return max(day_start + gap - 1 + within_day, self.now + self.resolution)
+
+    def _schedule_social(self, npc):
+        if not self.sim.llm_manager:
+            return
+        time = self._occurrence_time(self.sim.llm_decision_chance, self._rng(npc.id, "social"))
+        if time != math.inf:
+            self.scheduler.schedule(time, EVENT_SOCIAL, npc.id)
+
+    def _schedule_location(self, name: str):
+        time = self._occurrence_time(self.sim.random_event_chance, self._rng(name, "location"))
+        if time != math.inf:
+            self.scheduler.schedule(time, EVENT_LOCATION, name)
+
+    # --- state catch-up ---
+
+    def _advance(self, npc) -> bool:
+        """Apply drift since the NPC's last update; returns whether it is alive"""
+        if not npc.alive:
+            return False
+        elapsed = self.now - self.last_update.get(npc.id, self.now)
+        if elapsed <= 0:
+            return True
+        self.last_update[npc.id] = self.now
+
+        npc.age += AGE_PER_DAY * elapsed
+        rng = self._rng(npc.id, "drift")
+        npc.update_stat("energy", -sum_daily_draws(*ENERGY_LOSS, elapsed, rng))
+        npc.update_stat("hunger", sum_daily_draws(*HUNGER_GAIN, elapsed, rng))
+        if npc.age > 65:
+            npc.update_stat("health", -sum_daily_draws(1, 5, elapsed, rng))
+        if npc.mood <= 40:
+            npc.update_stat("health", -sum_daily_draws(1, int((100 - npc.mood) / 10), elapsed, rng))
+
+        if npc.health <= 0:
+            self._touch(npc)
+            self.sim._handle_death(npc)
+            return False
+        return True
+
+    def _touch(self, npc):
+        self.touched_npcs.add(npc.id)
+
+    # --- event handlers ---
+
+    def _on_need(self, npc, version: int):
+        if not self._advance(npc):
+            return
+        # Work only on the drawn success day; other days count as failed rolls
+        work_roll = 0.0 if self.work_versions.pop(npc.id, None) == version else 1.0
+        if self.sim._apply_basic_needs(npc, work_roll):
+            self._touch(npc)
+        self._schedule_need(npc)
+
+    async def _on_social(self, npc):
+        if not npc.alive:
+            return
+        if self._advance(npc) and self.sim.neighbor_index.has_neighbors(npc.id):
+            decision = await self.sim._request_decision(npc)
+            if decision:
+                target = self.sim.npcs.get(decision.get("target", ""))
+                if target is not None:
+                    self._advance(target)
+                await self.sim._apply_llm_decision(npc, decision)
+                self._touch(npc)
+                if target is not None and target.alive:
+                    self._schedule_need(target)
+            self._schedule_need(npc)
+        if npc.alive:
+            self._schedule_social(npc)
+
+    def _on_location(self, name: str):
+        location = self.sim.locations[name]
+        alive_npcs = [self.sim.npcs[npc_id] for npc_id in location.get_alive_npcs(self.sim.npcs)]
+        for npc in alive_npcs:
+            self._advance(npc)
+        self.sim._trigger_location_event(location, self._rng(name, "event"))
+        self.touched_locations.add(name)
+        for npc in alive_npcs:
+            if npc.alive:
+                self._schedule_need(npc)
+        self._schedule_location(name)
+
+    # --- main loop ---
+
+    async def run_until(self, until: float):
+        """Process every event due at or before the given time"""
+        while self.scheduler.peek_time() <= until + 1e-9:
+            time, kind, key, version = self.scheduler.pop()
+            self.now = time
+            if kind == EVENT_NEED:
+                if version != self.versions.get(key):
+                    continue  # Superseded by a reschedule
+                self._on_need(self.sim.npcs[key], version)
+            elif kind == EVENT_SOCIAL:
+                await self._on_social(self.sim.npcs[key])
+            elif kind == EVENT_LOCATION:
+                self._on_location(key)
+            self.processed[kind] += 1
+        self.now = until
+
+    async def run(self, days: int):
+        """Run day by day; only NPCs and locations touched by events are logged"""
+        sim = self.sim
+        if not self.last_update:
+            self.start(float(sim.current_day))
+        first_day = sim.current_day + 1
+        for day in range(first_day, first_day + days):
+            sim.current_day = day
+            await self.run_until(float(day))
+            self._log_day()
+            if self.save_every and day % self.save_every == 0:
+                self.sync_all()
+                sim._save_world_state()
+
+        self.sync_all()
+        total = sum(self.processed.values())
+        print(f"⏱️ [EVENTS] {total} events processed over {days} days "
+              f"({dict(self.processed)})")
+
+    def sync_all(self):
+        """Bring every alive NPC's stats up to the current time (O(NPCs))"""
+        for npc in list(self.sim.npcs.values()):
+            if npc.alive and self._advance(npc):
+                self._schedule_need(npc)
+
+    def _log_day(self):
+        """Daily log built from touched NPCs/locations only, then cleared"""
+        sim = self.sim
+        alive_counts = sim.neighbor_index.alive_counts
+        summary = {"day": sim.current_day, "alive_npcs": sum(alive_counts.values()), "locations": {}}
+        if sim.memory:
+            sim._record_memories(
+                [sim.npcs[npc_id] for npc_id in self.touched_npcs],
+                [sim.locations[name] for name in self.touched_locations]
+            )
+        by_location: Dict[str, List[str]] = {}
+        for npc_id in self.touched_npcs:
+            npc = sim.npcs[npc_id]
+            by_location.setdefault(npc.location, []).extend(npc.describe_actions(sim.npcs))
+            npc.actions_today = []
+        for name in set(by_location) | self.touched_locations:
+            location = sim.locations[name]
+            summary["locations"][name] = {
+                "npc_count": alive_counts.get(name, 0),
+                "events": list(location.events_today),
+                "actions": by_location.get(name, [])
+            }
+            location.clear_daily_events()
+        sim.daily_logs.append(summary)
+        self.touched_npcs = set()
+        self.touched_locations = set()
@@ -1,12 +1,19 @@
 # 📁 llm_clients.py - LLM clients
 # 🎯 Core function: Integration with Ollama and DeepSeek API
-# 🔗 Key dependencies: ollama, openai, prompt_loader
+# 🔗 Key dependencies: ollama, openai, prompt_loader, prompt_cache, response_parser
 # 💡 Usage: Used in simulator.py for LLM decisions and chronicles
 
-import json
+import time
 import asyncio
-from typing import Optional, Dict, Any
+from collections import Counter, deque
+from contextlib import asynccontextmanager
+from typing import Optional, Dict, Any, List, Tuple
 from prompt_loader import prompt_loader
+from prompt_cache import DecisionPromptCache
+from local_policy import LocalPolicy, DecisionRecorder, describe_situation
+from response_parser import (
+    ResponseParseError, OUTCOME_ERROR, OUTCOME_SCHEMA, extract_json, parse_decision
+)
 
 try:
     import ollama
@@ -21,15 +28,193 @@ except ImportError:
     openai = None
 
 
+class AdaptiveConcurrencyLimiter:
+    """AIMD limit on in-flight requests.
+
+    The limit grows by about one per round of requests while latency stays
+    flat (within a quarter of the way to `tolerance` x the baseline, the
+    fastest observed latency), holds while latency rises, and is multiplied
+    by `backoff` on a latency spike (above `tolerance` x baseline) or error.
+    Requests that started before the last backoff cannot trigger another
+    one, so a burst of slow replies only halves the limit once."""
+
+    def __init__(self, initial: int = 1, min_limit: int = 1, max_limit: int = 16,
+                 tolerance: float = 2.0, backoff: float = 0.5, window: float = 10.0):
+        self.limit = float(max(min_limit, min(initial, max_limit)))
+        self.min_limit = min_limit
+        self.max_limit = max_limit
+        self.tolerance = tolerance
+        self.backoff = backoff
+        self.window = window  # Seconds of completions used for throughput
+        self.baseline: Optional[float] = None
+        self.in_flight = 0
+        self.completed = 0
+        self.errors = 0
+        self.cancelled = 0  # Requests cancelled in flight (not used for the limit)
+        self.backoffs = 0
+        self._last_backoff = 0.0
+        self._first_completion: Optional[float] = None
+        self._completions = deque()
+        self._cond: Optional[asyncio.Condition] = None
+
+    @classmethod
+    def from_config(cls, settings: Optional[Dict]) -> "AdaptiveConcurrencyLimiter":
+        """Create a limiter from CONFIG["llm_concurrency"]"""
+        settings = settings or {}
+        return cls(
+            initial=settings.get("initial", 1),
+            min_limit=settings.get("min", 1),
+            max_limit=settings.get("max", 16),
+            tolerance=settings.get("latency_tolerance", 2.0),
+            backoff=settings.get("backoff", 0.5)
+        )
+
+    @property
+    def current_limit(self) -> int:
+        return int(self.limit)
+
+    def throughput(self) -> float:
+        """Completed requests per second over the recent window"""
+        now = time.perf_counter()
+        while self._completions and self._completions[0] < now - self.window:
+            self._completions.popleft()
+        if not self._completions:
+            return 0.0
+        elapsed = min(self.window, now - self._first_completion)
+        return len(self._completions) / max(elapsed, 1e-3)
+
+    def seed(self, latency: float, limit: Optional[int] = None):
+        """Set the baseline latency (and optionally the limit) from a probe"""
+        self.baseline = latency
+        if limit is not None:
+            self.limit = float(max(self.min_limit, min(limit, self.max_limit)))
+
+    @asynccontextmanager
+    async def slot(self):
+        """Wait for a free slot, then time the request made inside it"""
+        if self._cond is None:
+            self._cond = asyncio.Condition()
+        async with self._cond:
+            await self._cond.wait_for(lambda: self.in_flight < int(self.limit))
+            self.in_flight += 1
+        started = time.perf_counter()
+        error = False
+        cancelled = False
+        try:
+            yield
+        except asyncio.CancelledError:
+            # Dropped by the caller (queue/prefetch): its latency says nothing about the server
+            cancelled = True
+            self.cancelled += 1
+            raise
+        except Exception:
+            error = True
+            raise
+        finally:
+            if not cancelled:
+                self.record(started, time.perf_counter() - started, error)
+            async with self._cond:
+                self.in_flight -= 1
+                self._cond.notify_all()
+
+    def record(self, started: float, latency: float, error: bool = False):
+        """Adjust the limit after one request"""
+        old_limit = int(self.limit)
+        if error:
+            self.errors += 1
+        else:
+            self.completed += 1
+            self._completions.append(time.perf_counter())
+            if self._first_completion is None:
+                self._first_completion = self._completions[-1]
+
+        baseline = self.baseline
+        spike = baseline is not None and latency > baseline * self.tolerance
+        flat = baseline is None or latency <= baseline * (1 + (self.tolerance - 1) / 4)
+        if error or spike:
+            if started >= self._last_backoff:
+                self.limit = max(self.min_limit, self.limit * self.backoff)
+                self._last_backoff = time.perf_counter()
+                self.backoffs += 1
+        elif flat:
+            # Additive increase: about +1 per `limit` requests with flat latency
+            self.limit = min(self.max_limit, self.limit + 1 / self.limit)
+        # Between flat and spike the limit holds
+
+        # Baseline follows the fastest latency and drifts up only very slowly
+        if not error:
+            if baseline is None or latency < baseline:
+                self.baseline = latency
+            elif not spike:
+                self.baseline += 0.001 * (latency - baseline)
+
+        if int(self.limit) != old_limit:
+            reason = "error" if error else "latency spike" if spike else "latency flat"
+            print(f"🎚️ [LLM] Concurrency limit {old_limit} → {int(self.limit)} ({reason}, "
+                  f"{latency:.2f}s vs baseline {self.baseline or 0:.2f}s, {self.throughput():.2f} req/s)")
+
+    def to_dict(self) -> Dict:
+        """Current state for logs and metrics"""
+        return {
+            "limit": self.current_limit,
+            "in_flight": self.in_flight,
+            "throughput": round(self.throughput(), 3),
+            "baseline_latency": round(self.baseline or 0.0, 3),
+            "completed": self.completed,
+            "errors": self.errors,
+            "cancelled": self.cancelled,
+            "backoffs": self.backoffs
+        }
+
+
 class OllamaClient:
     """Client for working with Ollama"""
     
-    def __init__(self, model_name: str):
+    # Tiny request used to load the model and measure latency at startup
+    PROBE_PROMPT = "Reply with OK."
+    
+    def __init__(self, model_name: str, metrics=None, concurrency: Optional[Dict] = None,
+                 prompt_cache: Optional[Dict] = None):
         self.model_name = model_name
+        self.metrics = metrics
+        self.parse_outcomes = Counter()  # outcome class -> count
+        self.concurrency = concurrency or {}
+        self.limiter = AdaptiveConcurrencyLimiter.from_config(self.concurrency)
+        self.prompt_cache = DecisionPromptCache.from_config(prompt_cache)
+        self.keep_alive = (prompt_cache or {}).get("keep_alive") if self.prompt_cache else None
+        # Decision requests: count, prompt tokens the server had to evaluate, time to first token
+        self.decision_calls = 0
+        self.prompt_eval_tokens = 0
+        self.ttft_sum = 0.0
         self.client = None
         if ollama:
             self.client = ollama.AsyncClient()
     
+    def _record_call(self, started: float, prompt: str, content: str, outcome: str,
+                     prompt_tokens: int = 0, ttft: Optional[float] = None):
+        """Count the parse outcome and record call metrics if enabled"""
+        self.parse_outcomes[outcome] += 1
+        if not self.metrics:
+            return
+        self.metrics.set_llm_concurrency("ollama", self.limiter.to_dict())
+        self.metrics.record_llm_call(
+            "ollama",
+            time.perf_counter() - started,
+            prompt_chars=len(prompt),
+            response_chars=len(content),
+            error=outcome == OUTCOME_ERROR,
+            parse_outcome=outcome,
+            prompt_tokens=prompt_tokens,
+            ttft=ttft
+        )
+    
+    @staticmethod
+    def _failure_outcome(error: Exception) -> str:
+        """Classify an exception raised while requesting or parsing"""
+        if isinstance(error, ResponseParseError):
+            return error.outcome
+        return OUTCOME_ERROR
+    
     async def check_connection(self) -> bool:
         """Check Ollama connection"""
         if not self.client:
@@ -63,17 +248,108 @@ class OllamaClient:
             elif self.model_name in available_models:
                 print(f"✅ Using configured model: {self.model_name}")
             
+            if self.concurrency.get("probe", True):
+                await self.probe_concurrency()
             return True
         except Exception as e:
             print(f"❌ Ollama connection error: {e}")
             print(f"🔧 Try running: ollama serve")
             return False
     
+    async def _chat(self, prompt: str):
+        """One chat request through the adaptive concurrency limiter"""
+        async with self.limiter.slot():
+            return await self.client.chat(
+                model=self.model_name,
+                messages=[{"role": "user", "content": prompt}]
+            )
+    
+    async def _chat_stream(self, messages: List[Dict]) -> Tuple[str, int, float]:
+        """Streamed chat through the limiter: (content, prompt eval tokens, time to first token).
+
+        prompt_eval_count is what the server actually encoded, so prefix
+        cache hits show up as fewer tokens."""
+        async with self.limiter.slot():
+            started = time.perf_counter()
+            options = {"keep_alive": self.keep_alive} if self.keep_alive else {}
+            stream = await self.client.chat(model=self.model_name, messages=messages, stream=True, **options)
+            parts = []
+            ttft = None
+            prompt_tokens = 0
+            async for chunk in stream:
+                if ttft is None:
+                    ttft = time.perf_counter() - started
+                parts.append(chunk["message"]["content"])
+                if chunk.get("done"):
+                    prompt_tokens = chunk.get("prompt_eval_count") or 0
+            return "".join(parts), prompt_tokens, ttft or 0.0
+    
+    def _decision_messages(self, npc_data: Dict, context: Dict, relationships: Dict):
+        """Chat messages for one decision and the prompt cache commit token"""
+        if self.prompt_cache:
+            return self.prompt_cache.build(npc_data, context, relationships)
+        prompt = prompt_loader.render_template(
+            "npc_decision",
+            npc_role=npc_data['role'],
+            npc_name=npc_data['name'],
+            npc_location=npc_data['location'],
+            health=npc_data['stats']['health'],
+            energy=npc_data['stats']['energy'],
+            mood=npc_data['stats']['mood'],
+            relationships=relationships,
+            memories=context.get('memories', [])
+        )
+        return [{"role": "user", "content": prompt}], None
+    
+    def prompt_stats(self) -> Dict:
+        """Average prompt eval tokens and time to first token per decision"""
+        calls = self.decision_calls
+        return {
+            "decisions": calls,
+            "prompt_eval_tokens": self.prompt_eval_tokens,
+            "avg_prompt_eval_tokens": round(self.prompt_eval_tokens / calls, 1) if calls else 0.0,
+            "avg_ttft": round(self.ttft_sum / calls, 4) if calls else 0.0,
+            "conversation": self.prompt_cache.conversation if self.prompt_cache else "off"
+        }
+    
+    async def probe_concurrency(self):
+        """Warm the model up and seed the limiter.
+
+        A single request gives the baseline latency; then 2, 4, ... parallel
+        requests are tried while their latency stays within tolerance."""
+        limiter = self.limiter
+        
+        async def timed_probe():
+            started = time.perf_counter()
+            await self.client.chat(
+                model=self.model_name,
+                messages=[{"role": "user", "content": self.PROBE_PROMPT}]
+            )
+            return time.perf_counter() - started
+        
+        try:
+            print(f"🔥 [LLM] Warming up {self.model_name}...")
+            await timed_probe()  # First call may include loading the model
+            baseline = await timed_probe()
+            level = 1
+            while level * 2 <= min(limiter.max_limit, self.concurrency.get("probe_max", 8)):
+                latencies = await asyncio.gather(*(timed_probe() for _ in range(level * 2)))
+                if max(latencies) > baseline * limiter.tolerance:
+                    break
+                level *= 2
+            limiter.seed(baseline, max(level, limiter.current_limit))
+            print(f"🎚️ [LLM] Baseline latency {baseline:.2f}s, starting concurrency limit {limiter.current_limit}")
+        except Exception as e:
+            print(f"⚠️ [LLM] Warm-up probe failed: {e}")
+    
     async def generate_random_names(self, name_type: str, count: int) -> Optional[Dict]:
         """Generate random names for locations or NPCs"""
         if not self.client:
             return None
             
+        prompt = ""
+        content = ""
+        started = time.perf_counter()
         try:
             print(f"🎲 [LLM] Generating {count} random {name_type} names...")
             
@@ -86,27 +362,23 @@ class OllamaClient:
 
             print(f"🔄 [LLM] Sending name generation request to {self.model_name}...")
             
-            response = await self.client.chat(
-                model=self.model_name,
-                messages=[{"role": "user", "content": prompt}]
-            )
+            started = time.perf_counter()
+            response = await self._chat(prompt)
             
             # Parse response
             content = response["message"]["content"].strip()
             
             print(f"📝 [LLM] Received name data: {content[:200]}...")
             
-            # Remove markdown formatting if present
-            if content.startswith("```"):
-                content = content.split("```")[1].strip()
-            if content.startswith("json"):
-                content = content[4:].strip()
-                
-            names_data = json.loads(content)
+            names_data, outcome = extract_json(content)
+            if not isinstance(names_data, dict) or not isinstance(names_data.get(name_type), list):
+                raise ResponseParseError(OUTCOME_SCHEMA, f"expected a '{name_type}' list")
+            self._record_call(started, prompt, content, outcome)
             print(f"✅ [LLM] Generated {len(names_data.get(name_type, []))} {name_type}")
             return names_data
             
         except Exception as e:
+            self._record_call(started, prompt, content, self._failure_outcome(e))
             print(f"⚠️ [LLM] Name generation error: {e}")
             return None
 
@@ -115,6 +387,9 @@ class OllamaClient:
         if not self.client:
             return None
             
+        prompt = ""
+        content = ""
+        started = time.perf_counter()
         try:
             print(f"🤖 [LLM] Requesting decision for {npc_data['name']} ({npc_data['role']})...")
             
@@ -124,40 +399,34 @@ class OllamaClient:
                 if k in context.get('nearby_npcs', [])
             }
             
-            prompt = prompt_loader.render_template(
-                "npc_decision",
-                npc_role=npc_data['role'],
-                npc_name=npc_data['name'],
-                npc_location=npc_data['location'],
-                health=npc_data['stats']['health'],
-                energy=npc_data['stats']['energy'],
-                mood=npc_data['stats']['mood'],
-                relationships=relationships_str
-            )
+            messages, cache_token = self._decision_messages(npc_data, context, relationships_str)
+            prompt = "\n".join(message["content"] for message in messages)
 
             print(f"🔄 [LLM] Sending request to model {self.model_name}...")
             
-            response = await self.client.chat(
-                model=self.model_name,
-                messages=[{"role": "user", "content": prompt}]
-            )
+            started = time.perf_counter()
+            content, prompt_tokens, ttft = await self._chat_stream(messages)
+            content = content.strip()
+            self.decision_calls += 1
+            self.prompt_eval_tokens += prompt_tokens
+            self.ttft_sum += ttft
             
-            # Parse response
-            content = response["message"]["content"].strip()
+            print(f"📝 [LLM] Received response: {content} ({prompt_tokens} prompt tokens evaluated, "
+                  f"first token after {ttft:.2f}s)")
             
-            print(f"📝 [LLM] Received response: {content}")
-            
-            # Remove markdown formatting if present
-            if content.startswith("```"):
-                content = content.split("```")[1].strip()
-            if content.startswith("json"):
-                content = content[4:].strip()
-                
-            decision = json.loads(content)
+            # Offered targets: id -> name (names let us map near-miss targets)
+            nearby = context.get('nearby_names') or {
+                npc_id: npc_id for npc_id in context.get('nearby_npcs', [])
+            }
+            decision, outcome = parse_decision(content, nearby)
+            if self.prompt_cache:
+                self.prompt_cache.commit(cache_token, messages, content)
+            self._record_call(started, prompt, content, outcome, prompt_tokens, ttft)
             print(f"✅ [LLM] Decision processed: {decision}")
             return decision
             
         except Exception as e:
+            self._record_call(started, prompt, content, self._failure_outcome(e))
             print(f"⚠️ [LLM] Error for {npc_data['name']}: {e}")
             return None
 
@@ -165,8 +434,9 @@ class OllamaClient:
 class DeepSeekClient:
     """Client for working with DeepSeek API"""
     
-    def __init__(self, api_key: str):
+    def __init__(self, api_key: str, metrics=None):
         self.api_key = api_key
+        self.metrics = metrics
         self.client = None
         if openai and api_key != "sk-your-deepseek-key-here":
             self.client = openai.OpenAI(
@@ -199,14 +469,25 @@ class DeepSeekClient:
 
             print(f"🔄 [LLM] Sending chronicle generation request...")
 
-            response = self.client.chat.completions.create(
-                model="deepseek-chat",
-                messages=[{"role": "user", "content": prompt}],
-                max_tokens=1500,
-                temperature=0.8
-            )
+            started = time.perf_counter()
+            try:
+                response = self.client.chat.completions.create(
+                    model="deepseek-chat",
+                    messages=[{"role": "user", "content": prompt}],
+                    max_tokens=1500,
+                    temperature=0.8
+                )
+            except Exception:
+                if self.metrics:
+                    self.metrics.record_llm_call("deepseek", time.perf_counter() - started,
+                                                 prompt_chars=len(prompt), error=True)
+                raise
             
             chronicle_text = response.choices[0].message.content
+            if self.metrics:
+                self.metrics.record_llm_call("deepseek", time.perf_counter() - started,
+                                             prompt_chars=len(prompt),
+                                             response_chars=len(chronicle_text or ""))
             print(f"✅ [LLM] Chronicle generated ({len(chronicle_text)} characters)")
             print(f"📝 [LLM] Chronicle preview: {chronicle_text[:100]}...")
             
@@ -244,10 +525,14 @@ class DeepSeekClient:
 class LLMManager:
     """Manager for working with multiple LLMs"""
     
-    def __init__(self, ollama_model: str, deepseek_key: str):
-        self.ollama = OllamaClient(ollama_model)
-        self.deepseek = DeepSeekClient(deepseek_key)
+    def __init__(self, ollama_model: str, deepseek_key: str, metrics=None, concurrency: Optional[Dict] = None,
+                 prompt_cache: Optional[Dict] = None, local_policy: Optional[Dict] = None):
+        self.ollama = OllamaClient(ollama_model, metrics=metrics, concurrency=concurrency,
+                                   prompt_cache=prompt_cache)
+        self.deepseek = DeepSeekClient(deepseek_key, metrics=metrics)
         self.ollama_available = False
+        self.policy = LocalPolicy.from_config(local_policy)
+        self.recorder = DecisionRecorder.from_config(local_policy)
         
     async def initialize(self):
         """Initialize LLM clients"""
@@ -273,11 +558,48 @@ class LLMManager:
         return None
     
     async def get_npc_decision(self, npc_data: Dict, context: Dict) -> Optional[Dict]:
-        """Get NPC decision"""
+        """Get NPC decision, from the local policy when it is confident"""
+        situation, local, audit = self.local_decision(npc_data, context)
+        if local and not audit:
+            return local
+        return await self.llm_decision(npc_data, context, situation, local)
+    
+    def local_decision(self, npc_data: Dict, context: Dict) -> Tuple[Optional[Dict], Optional[Dict], bool]:
+        """(situation, confident local decision or None, whether to audit it against the LLM)"""
+        if not self.policy and not self.recorder:
+            return None, None, False
+        situation = describe_situation(npc_data, context)
+        if not self.policy:
+            return situation, None, False
+        # Keyed by world and NPC: worlds sharing this manager audit independently
+        entity = f"{context.get('world', '')}/{npc_data['id']}"
+        local, audit = self.policy.decide(situation, context.get("day", 0), entity)
+        return situation, local, audit
+    
+    async def llm_decision(self, npc_data: Dict, context: Dict, situation: Optional[Dict] = None,
+                           local: Optional[Dict] = None) -> Optional[Dict]:
+        """Ask Ollama; record the answer for training and compare it with an audited local decision"""
+        decision = None
         if self.ollama_available:
-            return await self.ollama.get_npc_decision(npc_data, context)
-        return None
+            decision = await self.ollama.get_npc_decision(npc_data, context)
+        if local:
+            self.policy.record_audit(local, decision)
+        if decision and self.recorder:
+            self.recorder.record(situation, decision)
+        return decision or local
     
     async def generate_chronicle(self, events_data: Dict) -> str:
         """Generate chronicle"""
-        return await self.deepseek.generate_chronicle(events_data) 
\ No newline at end of file
+        return await self.deepseek.generate_chronicle(events_data)
+    
+    def concurrency_status(self) -> Dict:
+        """Current Ollama concurrency limit and observed throughput"""
+        return self.ollama.limiter.to_dict()
+    
+    def policy_status(self) -> Optional[Dict]:
+        """Local policy share and agreement with audited LLM decisions"""
+        return self.policy.to_dict() if self.policy else None
+    
+    def prompt_status(self) -> Dict:
+        """Prompt eval tokens and time to first token of Ollama decisions"""
+        return self.ollama.prompt_stats()
@@ -0,0 +1,243 @@
+# 📁 local_policy.py - Distilled local decision policy
+# 🎯 Core function: Answer routine NPC decisions from a table learned from recorded LLM decisions
+# 🔗 Key dependencies: json, rng_streams (reproducible audit draws)
+# 💡 Usage: python local_policy.py decisions.jsonl --output policy.json; then CONFIG["local_policy"]["enabled"] = True
+
+import argparse
+import json
+import os
+from collections import Counter
+from typing import Dict, Iterator, List, Optional, Tuple
+
+from rng_streams import RandomStreams
+
+
+# Situation buckets: (upper bound, label), checked in order
+MOOD_BUCKETS = ((35, "low"), (70, "mid"), (101, "high"))
+ENERGY_BUCKETS = ((30, "tired"), (101, "rested"))
+RELATIONSHIP_BUCKETS = ((-30, "hostile"), (-10, "cold"), (31, "neutral"), (51, "warm"), (101, "friend"))
+
+
+def _bucket(value: int, buckets) -> str:
+    for bound, label in buckets:
+        if value < bound:
+            return label
+    return buckets[-1][1]
+
+
+def is_struggling(stats: Dict) -> bool:
+    """Another NPC that visibly needs help"""
+    return stats.get("health", 100) < 40 or stats.get("energy", 100) < 25 or stats.get("mood", 100) < 30
+
+
+def situation_key(npc: Dict, target: Dict) -> str:
+    """Table key of one (NPC, offered target) pair"""
+    return "|".join((
+        _bucket(npc["mood"], MOOD_BUCKETS),
+        _bucket(npc["energy"], ENERGY_BUCKETS),
+        _bucket(target["relationship"], RELATIONSHIP_BUCKETS),
+        "struggling" if is_struggling(target) else "fine"
+    ))
+
+
+def describe_situation(npc_data: Dict, context: Dict) -> Dict:
+    """Raw inputs of a decision: the NPC's stats and each offered target"""
+    stats = npc_data["stats"]
+    nearby_stats = context.get("nearby_stats", {})
+    return {
+        "npc": {"health": stats["health"], "energy": stats["energy"], "mood": stats["mood"]},
+        "targets": [
+            dict(nearby_stats.get(target_id, {}), id=target_id,
+                 relationship=npc_data["relationships"].get(target_id, 0))
+            for target_id in context.get("nearby_npcs", [])
+        ]
+    }
+
+
+def train_table(records) -> Dict[str, Dict[str, int]]:
+    """Action counts per situation of the chosen target.
+
+    "ignore" has no target, so it is counted in the cell of every offered
+    target: cells where the LLM often ignores everyone stay unconfident
+    (or predict "ignore") instead of only seeing the social actions."""
+    table: Dict[str, Counter] = {}
+    for record in records:
+        if record["action"] == "ignore":
+            chosen = record["targets"]
+        else:
+            chosen = [target for target in record["targets"] if target["id"] == record["target"]][:1]
+        for target in chosen:
+            table.setdefault(situation_key(record["npc"], target), Counter())[record["action"]] += 1
+    return {key: dict(counts) for key, counts in sorted(table.items())}
+
+
+def read_records(path: str) -> Iterator[Dict]:
+    """Recorded decisions from a JSONL log"""
+    with open(path, "r", encoding="utf-8") as f:
+        for line in f:
+            if line.strip():
+                yield json.loads(line)
+
+
+class LocalPolicy:
+    """Decision table distilled from LLM decisions.
+
+    Each offered target is looked up by situation (own mood and energy,
+    relationship to the target, whether the target is struggling). The
+    confidence of a cell is count(best action) / (samples + 1), so sparse
+    cells stay below the threshold; decisions below it go to the LLM."""
+
+    def __init__(self, table: Dict[str, Dict[str, int]], threshold: float = 0.8,
+                 min_samples: int = 5, audit_rate: float = 0.05, seed: int = 0):
+        self.table = table
+        self.threshold = threshold
+        self.min_samples = min_samples
+        self.audit_rate = audit_rate  # Share of confident decisions also asked of the LLM
+        self.streams = RandomStreams(seed)  # Audit rolls keyed by (day, NPC), independent of call order
+
+        self.local = 0
+        self.routed = 0
+        self.audited = 0
+        self.audit_action_agree = 0
+        self.audit_full_agree = 0  # Same action and target
+
+    @classmethod
+    def from_config(cls, settings: Optional[Dict]) -> Optional["LocalPolicy"]:
+        """Load the table named by CONFIG["local_policy"], or None if disabled"""
+        if not settings or not settings.get("enabled"):
+            return None
+        path = settings.get("path", "policy.json")
+        if not os.path.exists(path):
+            print(f"⚠️ Local policy disabled: {path} not found (train it with python local_policy.py)")
+            return None
+        with open(path, "r", encoding="utf-8") as f:
+            table = json.load(f)["table"]
+        print(f"🧭 Local policy loaded: {len(table)} situations, threshold {settings.get('threshold', 0.8)}")
+        return cls(
+            table,
+            threshold=settings.get("threshold", 0.8),
+            min_samples=settings.get("min_samples", 5),
+            audit_rate=settings.get("audit_rate", 0.05),
+            seed=settings.get("audit_seed", 0)
+        )
+
+    def predict(self, situation: Dict) -> Tuple[Optional[Dict], float]:
+        """Most confident (decision, confidence) over the offered targets"""
+        best, best_confidence = None, 0.0
+        for target in situation["targets"]:
+            counts = self.table.get(situation_key(situation["npc"], target))
+            if not counts:
+                continue
+            samples = sum(counts.values())
+            if samples < self.min_samples:
+                continue
+            action, count = max(counts.items(), key=lambda item: item[1])
+            confidence = count / (samples + 1)
+            if confidence > best_confidence:
+                best_confidence = confidence
+                best = {"action": action, "target": "" if action == "ignore" else target["id"],
+                        "reason": "routine"}
+        return best, best_confidence
+
+    def decide(self, situation: Dict, day: int, entity: str) -> Tuple[Optional[Dict], bool]:
+        """(local decision or None, whether to also ask the LLM for an audit).
+        The audit roll is drawn from the (day, entity) stream, so runs repeat exactly."""
+        decision, confidence = self.predict(situation)
+        if decision is None or confidence < self.threshold:
+            self.routed += 1
+            return None, False
+        if self.audit_rate and self.streams.stream(day, entity, "audit").random() < self.audit_rate:
+            return decision, True
+        self.local += 1
+        return decision, False
+
+    def record_audit(self, local: Dict, llm: Optional[Dict]):
+        """Compare an audited local decision with the LLM's"""
+        if not llm:
+            return
+        self.audited += 1
+        if llm.get("action") == local["action"]:
+            self.audit_action_agree += 1
+            if llm.get("target") == local["target"]:
+                self.audit_full_agree += 1
+
+    def to_dict(self) -> Dict:
+        decided = self.local + self.routed + self.audited
+        return {
+            "local": self.local,
+            "routed": self.routed,
+            "audited": self.audited,
+            "local_share": round(self.local / decided, 3) if decided else 0.0,
+            "action_agreement": round(self.audit_action_agree / self.audited, 3) if self.audited else None,
+            "full_agreement": round(self.audit_full_agree / self.audited, 3) if self.audited else None
+        }
+
+
+class DecisionRecorder:
+    """Appends LLM decisions with their situation to a JSONL training log"""
+
+    def __init__(self, path: str):
+        self.path = path
+        self.recorded = 0
+
+    @classmethod
+    def from_config(cls, settings: Optional[Dict]) -> Optional["DecisionRecorder"]:
+        if not settings or not settings.get("record_path"):
+            return None
+        return cls(settings["record_path"])
+
+    def record(self, situation: Dict, decision: Dict):
+        record = dict(situation, action=decision.get("action"), target=decision.get("target"))
+        with open(self.path, "a", encoding="utf-8") as f:
+            f.write(json.dumps(record) + "\n")
+        self.recorded += 1
+
+
+def evaluate(table: Dict, records: List[Dict], threshold: float, min_samples: int) -> Dict:
+    """Coverage and agreement of a table on held-out records"""
+    policy = LocalPolicy(table, threshold, min_samples, audit_rate=0.0)
+    covered = action_agree = full_agree = 0
+    for record in records:
+        decision, confidence = policy.predict(record)
+        if decision is None or confidence < threshold:
+            continue
+        covered += 1
+        if decision["action"] == record["action"]:
+            action_agree += 1
+            if decision["target"] == record["target"]:
+                full_agree += 1
+    return {
+        "records": len(records),
+        "coverage": round(covered / len(records), 3) if records else 0.0,
+        "action_agreement": round(action_agree / covered, 3) if covered else None,
+        "full_agreement": round(full_agree / covered, 3) if covered else None
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Train the local decision policy from recorded LLM decisions")
+    parser.add_argument("logs", nargs="+", help="decision logs (JSONL) written via CONFIG['local_policy']['record_path']")
+    parser.add_argument("--output", default="policy.json")
+    parser.add_argument("--threshold", type=float, default=0.8)
+    parser.add_argument("--min-samples", type=int, default=5)
+    args = parser.parse_args()
+
+    records = [record for path in args.logs for record in read_records(path)]
+    if not records:
+        print("❌ No recorded decisions")
+        return
+    # Every fifth record is held out to estimate agreement before training on everything
+    held_out = records[4::5]
+    training = [record for i, record in enumerate(records) if i % 5 != 4]
+    result = evaluate(train_table(training), held_out, args.threshold, args.min_samples)
+    print(f"📊 Held-out: {result['records']} decisions, {result['coverage']:.0%} answered locally, "
+          f"action agreement {result['action_agreement']}, action+target agreement {result['full_agreement']}")
+
+    table = train_table(records)
+    with open(args.output, "w", encoding="utf-8") as f:
+        json.dump({"records": len(records), "holdout": result, "table": table}, f, indent=2)
+    print(f"💾 Policy with {len(table)} situations from {len(records)} decisions saved to {args.output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,173 @@
+# 📁 memory.py - Per-NPC episodic memory
+# 🎯 Core function: Store actions/events as hashed embeddings and recall the most relevant few
+# 🔗 Key dependencies: numpy (optional), re, zlib, world_fork
+# 💡 Usage: Enabled via CONFIG["memory"]; recalled memories are added to npc_decision.j2
+
+import re
+import zlib
+from typing import Dict, List, Optional
+
+from world_fork import fork_mapping
+
+try:
+    import numpy as np
+except ImportError:
+    print("⚠️ NumPy not installed: pip install numpy")
+    np = None
+
+
+TOKEN_PATTERN = re.compile(r"[a-z0-9]+")
+
+# Words that carry no meaning for retrieval
+STOP_WORDS = frozenset(("a", "an", "the", "to", "of", "in", "on", "and", "with", "day", "is", "at"))
+
+# Importance of remembered actions (higher survives eviction longer)
+ACTION_IMPORTANCE = {"chat": 1.0, "help": 2.0, "argue": 2.0, "died": 3.0}
+EVENT_IMPORTANCE = 1.5
+
+RECENCY_WEIGHT = 0.2  # Score bonus of a memory from today, halving every RECENCY_HALF_LIFE days
+RECENCY_HALF_LIFE = 5.0
+IMPORTANCE_WEIGHT = 0.05
+
+
+def numpy_available() -> bool:
+    """Check whether episodic memory can run"""
+    return np is not None
+
+
+def tokenize(text: str) -> List[str]:
+    """Lowercase word tokens without stop words"""
+    return [token for token in TOKEN_PATTERN.findall(text.lower()) if token not in STOP_WORDS]
+
+
+def embed_text(text: str, dim: int = 128):
+    """Deterministic bag-of-words embedding (signed feature hashing, L2-normalized).
+
+    crc32 is used instead of hash() so vectors are stable across processes."""
+    vector = np.zeros(dim, dtype=np.float32)
+    for token in tokenize(text):
+        digest = zlib.crc32(token.encode("utf-8"))
+        vector[digest % dim] += 1.0 if digest & 0x80000000 else -1.0
+    norm = float(np.linalg.norm(vector))
+    if norm:
+        vector /= norm
+    return vector
+
+
+class NPCMemoryIndex:
+    """Fixed-capacity similarity index of one NPC's memories.
+
+    Vectors live in one preallocated matrix, so a search is a single
+    matrix-vector product over at most `capacity` rows. When full, the
+    memory with the lowest importance (oldest first on ties) is replaced."""
+
+    __slots__ = ("vectors", "days", "importance", "texts", "size")
+
+    def __init__(self, dim: int, capacity: int):
+        self.vectors = np.zeros((capacity, dim), dtype=np.float32)
+        self.days = np.zeros(capacity, dtype=np.float32)
+        self.importance = np.zeros(capacity, dtype=np.float32)
+        self.texts: List[str] = []
+        self.size = 0
+
+    def __len__(self):
+        return self.size
+
+    def copy(self) -> "NPCMemoryIndex":
+        index = NPCMemoryIndex.__new__(NPCMemoryIndex)
+        index.vectors = self.vectors.copy()
+        index.days = self.days.copy()
+        index.importance = self.importance.copy()
+        index.texts = list(self.texts)
+        index.size = self.size
+        return index
+
+    def add(self, vector, text: str, day: int, importance: float):
+        """Store a memory, evicting the least important one if full"""
+        if self.size < len(self.days):
+            slot = self.size
+            self.size += 1
+            self.texts.append(text)
+        else:
+            # Retention: importance first, then recency
+            slot = int(np.argmin(self.importance + self.days * 1e-4))
+            self.texts[slot] = text
+        self.vectors[slot] = vector
+        self.days[slot] = day
+        self.importance[slot] = importance
+
+    def search(self, query, k: int, day: int) -> List[str]:
+        """Texts of the k best memories by similarity, recency and importance"""
+        if not self.size:
+            return []
+        size = self.size
+        scores = self.vectors[:size] @ query
+        scores += RECENCY_WEIGHT * np.exp2((self.days[:size] - day) / RECENCY_HALF_LIFE)
+        scores += IMPORTANCE_WEIGHT * self.importance[:size]
+        if size > k:
+            best = np.argpartition(scores, -k)[-k:]
+        else:
+            best = np.arange(size)
+        best = best[np.argsort(-scores[best])]
+        return [self.texts[i] for i in best]
+
+
+class EpisodicMemory:
+    """Memories of all NPCs: one bounded index per NPC"""
+
+    def __init__(self, dim: int = 128, capacity: int = 256, top_k: int = 3, max_chars: int = 120):
+        self.dim = dim
+        self.capacity = capacity
+        self.top_k = top_k
+        self.max_chars = max_chars  # Per recalled memory, so the prompt addition is capped
+        self.indexes: Dict[str, NPCMemoryIndex] = {}
+        self.recorded = 0
+
+    @classmethod
+    def from_config(cls, settings: Optional[Dict]) -> Optional["EpisodicMemory"]:
+        """Create memory from CONFIG["memory"], or None if disabled/unavailable"""
+        if not settings or not settings.get("enabled"):
+            return None
+        if not numpy_available():
+            print("⚠️ Episodic memory disabled (numpy unavailable)")
+            return None
+        return cls(
+            dim=settings.get("dim", 128),
+            capacity=settings.get("capacity", 256),
+            top_k=settings.get("top_k", 3),
+            max_chars=settings.get("max_chars", 120)
+        )
+
+    @property
+    def size(self) -> int:
+        """Memories currently stored across all NPCs"""
+        return sum(len(index) for index in self.indexes.values())
+
+    def remember(self, npc_ids, text: str, day: int, importance: float = 1.0):
+        """Store one memory for each of the given NPCs (embedded once)"""
+        text = f"Day {day}: {text}"[:self.max_chars]
+        vector = embed_text(text, self.dim)
+        for npc_id in npc_ids:
+            index = self.indexes.get(npc_id)
+            if index is None:
+                index = self.indexes[npc_id] = NPCMemoryIndex(self.dim, self.capacity)
+            index.add(vector, text, day, importance)
+            self.recorded += 1
+
+    def recall(self, npc_id: str, situation: str, day: int) -> List[str]:
+        """Most relevant memories of an NPC for a situation description"""
+        index = self.indexes.get(npc_id)
+        if index is None or not len(index):
+            return []
+        return index.search(embed_text(situation, self.dim), self.top_k, day)
+
+    def fork(self) -> "EpisodicMemory":
+        """Copy for a forked world; each NPC's index is copied on first access"""
+        branch = EpisodicMemory(self.dim, self.capacity, self.top_k, self.max_chars)
+        self.indexes, branch.indexes = fork_mapping(self.indexes, NPCMemoryIndex.copy)
+        branch.recorded = self.recorded
+        return branch
+
+    def forget(self, npc_id: str):
+        """Drop all memories of an NPC"""
+        self.indexes.pop(npc_id, None)
@@ -0,0 +1,82 @@
+# 📁 memory_report.py - NPC memory footprint report
+# 🎯 Core function: Compare legacy dict-based NPCs with compact slotted NPCs
+# 🔗 Key dependencies: tracemalloc, models
+# 💡 Usage: python memory_report.py [npc_count] [relationships_per_npc]
+
+import random
+import sys
+import tracemalloc
+
+from models import NPC
+
+
+class LegacyNPC:
+    """Pre-slots NPC layout (per-instance __dict__, stats dict, text actions)"""
+
+    def __init__(self, npc_id, name, role, location):
+        self.id = npc_id
+        self.name = name
+        self.role = role
+        self.location = location
+        self.age = random.randint(18, 60)
+        self.stats = {
+            "health": random.randint(70, 100),
+            "energy": random.randint(40, 100),
+            "hunger": random.randint(20, 80),
+            "mood": random.randint(30, 90)
+        }
+        self.relationships = {}
+        self.alive = True
+        self.actions_today = []
+
+
+def _measure(build):
+    """Return traced bytes allocated by build()"""
+    tracemalloc.start()
+    before = tracemalloc.get_traced_memory()[0]
+    keep = build()
+    after = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    del keep
+    return after - before
+
+
+def _build_world(npc_class, count, relationships, legacy):
+    """Create NPCs with relationships and a typical day of actions"""
+    random.seed(0)
+    npcs = {}
+    for i in range(count):
+        npc = npc_class(f"npc_{i}", f"Name {i}", "peasant", "Village")
+        npcs[npc.id] = npc
+    ids = list(npcs.keys())
+    for i, npc in enumerate(npcs.values()):
+        for j in range(1, relationships + 1):
+            npc.relationships[ids[(i + j) % count]] = random.randint(-30, 50)
+        target = ids[(i + 1) % count]
+        if legacy:
+            npc.actions_today.append(f"🍞 {npc.name} ate")
+            npc.actions_today.append(f"{npc.name} 🌾 worked in the field")
+            npc.actions_today.append(f"💬 {npc.name} talked to {npcs[target].name} (friendly chat)")
+        else:
+            npc.add_action("ate")
+            npc.add_action("work", reason="🌾 worked in the field")
+            npc.add_action("chat", target, "friendly chat")
+    return npcs
+
+
+def main():
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 10_000
+    relationships = int(sys.argv[2]) if len(sys.argv) > 2 else 0
+    scale = 10_000 / count
+
+    print(f"📊 Memory report: {count} NPCs, {relationships} relationships each, 3 actions/day")
+    legacy = _measure(lambda: _build_world(LegacyNPC, count, relationships, True))
+    compact = _measure(lambda: _build_world(NPC, count, relationships, False))
+
+    print(f"   🐘 Legacy NPC:  {legacy * scale / 1024 / 1024:.2f} MiB per 10k NPCs ({legacy / count:.0f} B/NPC)")
+    print(f"   🪶 Compact NPC: {compact * scale / 1024 / 1024:.2f} MiB per 10k NPCs ({compact / count:.0f} B/NPC)")
+    print(f"   💾 Saved: {(1 - compact / legacy) * 100:.1f}%")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,292 @@
+# 📁 metrics.py - Simulation metrics and profiling
+# 🎯 Core function: Per-phase timings, LLM call metrics, sampling profiler
+# 🔗 Key dependencies: json, time, threading (standard library only)
+# 💡 Usage: Created by WorldSimulator when CONFIG["metrics"]["enabled"] is set
+
+import json
+import os
+import sys
+import threading
+import time
+from collections import Counter
+from contextlib import contextmanager, nullcontext
+from typing import Dict, Optional
+
+
+# Upper bounds (seconds) of LLM latency histogram buckets
+LATENCY_BUCKETS = (0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0, float("inf"))
+
+# Parse outcomes that produced a usable value
+PARSE_SUCCESS = ("ok", "repaired")
+
+# Shared no-op context used when metrics are disabled
+NULL_PHASE = nullcontext()
+
+
+def null_phase(name: str):
+    """Phase timer used when metrics are off"""
+    return NULL_PHASE
+
+
+class LLMBackendStats:
+    """Counters and latency histogram for one LLM backend"""
+
+    def __init__(self):
+        self.calls = 0
+        self.errors = 0
+        self.parse_failures = 0
+        self.prompt_chars = 0
+        self.response_chars = 0
+        self.prompt_tokens = 0  # Prompt tokens the server evaluated (cache misses)
+        self.ttft_sum = 0.0
+        self.ttft_count = 0
+        self.latency_sum = 0.0
+        self.latency_buckets = [0] * len(LATENCY_BUCKETS)
+        self.parse_outcomes = Counter()
+
+    def record(self, latency: float, prompt_chars: int, response_chars: int,
+               error: bool = False, parse_outcome: Optional[str] = None,
+               prompt_tokens: int = 0, ttft: Optional[float] = None):
+        """Record one call"""
+        self.calls += 1
+        self.prompt_tokens += prompt_tokens
+        if ttft is not None:
+            self.ttft_sum += ttft
+            self.ttft_count += 1
+        self.errors += int(error)
+        if parse_outcome:
+            self.parse_outcomes[parse_outcome] += 1
+            if not error and parse_outcome not in PARSE_SUCCESS:
+                self.parse_failures += 1
+        self.prompt_chars += prompt_chars
+        self.response_chars += response_chars
+        self.latency_sum += latency
+        for i, bound in enumerate(LATENCY_BUCKETS):
+            if latency <= bound:
+                self.latency_buckets[i] += 1
+                break
+
+    def to_dict(self) -> Dict:
+        """Serialize to dictionary for JSON"""
+        return {
+            "calls": self.calls,
+            "errors": self.errors,
+            "parse_failures": self.parse_failures,
+            "prompt_chars": self.prompt_chars,
+            "response_chars": self.response_chars,
+            "prompt_tokens": self.prompt_tokens,
+            "ttft_sum": round(self.ttft_sum, 6),
+            "ttft_count": self.ttft_count,
+            "parse_outcomes": dict(self.parse_outcomes),
+            "latency_sum": round(self.latency_sum, 6),
+            "latency_buckets": dict(zip([str(b) for b in LATENCY_BUCKETS], self.latency_buckets))
+        }
+
+
+class SamplingProfiler:
+    """Background thread sampling the stack of one thread into folded stacks"""
+
+    def __init__(self, interval: float = 0.005, thread_id: Optional[int] = None):
+        self.interval = interval
+        self.thread_id = thread_id or threading.get_ident()
+        self.samples = Counter()
+        self._stop = threading.Event()
+        self._thread = None
+
+    def start(self):
+        """Start sampling"""
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name="sampling-profiler", daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        """Stop sampling and wait for the sampler thread"""
+        self._stop.set()
+        if self._thread:
+            self._thread.join()
+            self._thread = None
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            frame = sys._current_frames().get(self.thread_id)
+            stack = []
+            while frame is not None:
+                code = frame.f_code
+                stack.append(f"{os.path.basename(code.co_filename)}:{code.co_name}")
+                frame = frame.f_back
+            if stack:
+                self.samples[";".join(reversed(stack))] += 1
+
+    def write_folded(self, path: str):
+        """Write samples in collapsed-stack format (flamegraph.pl / speedscope)"""
+        with open(path, "w", encoding="utf-8") as f:
+            for stack, count in self.samples.most_common():
+                f.write(f"{stack} {count}\n")
+
+
+class SimulationMetrics:
+    """Collects per-day phase timings and per-backend LLM metrics"""
+
+    def __init__(self, jsonl_path: str = "metrics.jsonl", prometheus_path: str = "metrics.prom",
+                 profile_days=None, profile_interval: float = 0.005,
+                 profile_path: str = "profile_day_{day}.folded"):
+        self.jsonl_path = jsonl_path
+        self.prometheus_path = prometheus_path
+        self.profile_days = tuple(profile_days) if profile_days else None
+        self.profile_interval = profile_interval
+        self.profile_path = profile_path
+
+        self.current_day = 0
+        self.phase_totals: Dict[str, float] = {}
+        self.day_phases: Dict[str, float] = {}
+        self.llm_totals: Dict[str, LLMBackendStats] = {}
+        self.day_llm: Dict[str, LLMBackendStats] = {}
+        self.llm_concurrency: Dict[str, Dict] = {}  # backend -> latest limiter state
+        self._profiler = None
+
+    @classmethod
+    def from_config(cls, settings: Optional[Dict], output_dir: str = "") -> Optional["SimulationMetrics"]:
+        """Create metrics from CONFIG["metrics"], or None if disabled.
+        Relative output paths are placed under output_dir."""
+        if not settings or not settings.get("enabled"):
+            return None
+        return cls(
+            jsonl_path=os.path.join(output_dir, settings.get("jsonl_path", "metrics.jsonl")),
+            prometheus_path=os.path.join(output_dir, settings.get("prometheus_path", "metrics.prom")),
+            profile_days=settings.get("profile_days"),
+            profile_interval=settings.get("profile_interval", 0.005),
+            profile_path=os.path.join(output_dir, settings.get("profile_path", "profile_day_{day}.folded"))
+        )
+
+    @contextmanager
+    def phase(self, name: str):
+        """Time a simulation phase"""
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            elapsed = time.perf_counter() - started
+            self.day_phases[name] = self.day_phases.get(name, 0.0) + elapsed
+            self.phase_totals[name] = self.phase_totals.get(name, 0.0) + elapsed
+
+    def record_llm_call(self, backend: str, latency: float, prompt_chars: int = 0,
+                        response_chars: int = 0, error: bool = False,
+                        parse_outcome: Optional[str] = None, prompt_tokens: int = 0,
+                        ttft: Optional[float] = None):
+        """Record one LLM request"""
+        for table in (self.day_llm, self.llm_totals):
+            stats = table.get(backend)
+            if stats is None:
+                stats = table[backend] = LLMBackendStats()
+            stats.record(latency, prompt_chars, response_chars, error, parse_outcome, prompt_tokens, ttft)
+
+    def set_llm_concurrency(self, backend: str, state: Dict):
+        """Latest adaptive concurrency state of a backend (limit, throughput, ...)"""
+        self.llm_concurrency[backend] = state
+
+    def start_day(self, day: int):
+        """Reset per-day counters and start the profiler if the day is in range"""
+        self.current_day = day
+        self.day_phases = {}
+        self.day_llm = {}
+        if self.profile_days and self.profile_days[0] <= day <= self.profile_days[1]:
+            self._profiler = SamplingProfiler(self.profile_interval)
+            self._profiler.start()
+
+    def end_day(self, day: int):
+        """Write the day's metrics to JSONL and refresh the Prometheus textfile"""
+        if self._profiler:
+            self._profiler.stop()
+            self._profiler.write_folded(self.profile_path.format(day=day))
+            print(f"🔬 [METRICS] Profile for day {day} saved to {self.profile_path.format(day=day)}")
+            self._profiler = None
+
+        self._write_record({"day": day})
+
+    def start_final(self):
+        """Reset per-day counters for the work after the last day (final chronicle)"""
+        self.day_phases = {}
+        self.day_llm = {}
+
+    def end_final(self):
+        """Write the post-run record (e.g. the chronicle's LLM call) to JSONL and Prometheus"""
+        self._write_record({"day": self.current_day, "final": True})
+
+    def _write_record(self, record: Dict):
+        record.update({
+            "timestamp": time.time(),
+            "phases": {name: round(seconds, 6) for name, seconds in self.day_phases.items()},
+            "llm": {backend: stats.to_dict() for backend, stats in self.day_llm.items()},
+            "llm_concurrency": self.llm_concurrency
+        })
+        with open(self.jsonl_path, "a", encoding="utf-8") as f:
+            f.write(json.dumps(record) + "\n")
+        self.write_prometheus()
+
+    def close(self):
+        """Stop a running profiler"""
+        if self._profiler:
+            self._profiler.stop()
+            self._profiler = None
+
+    def write_prometheus(self):
+        """Write cumulative metrics in Prometheus textfile-collector format"""
+        lines = [
+            "# HELP llm_sim_day Current simulation day",
+            "# TYPE llm_sim_day gauge",
+            f"llm_sim_day {self.current_day}",
+            "# HELP llm_sim_phase_seconds_total Time spent in each simulation phase",
+            "# TYPE llm_sim_phase_seconds_total counter"
+        ]
+        for name, seconds in sorted(self.phase_totals.items()):
+            lines.append(f'llm_sim_phase_seconds_total{{phase="{name}"}} {seconds:.6f}')
+
+        counters = (
+            ("llm_sim_llm_calls_total", "LLM requests", "calls"),
+            ("llm_sim_llm_errors_total", "LLM requests that failed", "errors"),
+            ("llm_sim_llm_parse_failures_total", "LLM responses that could not be parsed", "parse_failures"),
+            ("llm_sim_llm_prompt_chars_total", "Characters sent in prompts", "prompt_chars"),
+            ("llm_sim_llm_response_chars_total", "Characters received in responses", "response_chars"),
+            ("llm_sim_llm_prompt_eval_tokens_total", "Prompt tokens evaluated by the server (not served from its cache)", "prompt_tokens"),
+            ("llm_sim_llm_ttft_seconds_total", "Summed time to first token", "ttft_sum"),
+            ("llm_sim_llm_ttft_count_total", "Requests with a measured time to first token", "ttft_count")
+        )
+        for metric, help_text, attr in counters:
+            lines.append(f"# HELP {metric} {help_text}")
+            lines.append(f"# TYPE {metric} counter")
+            for backend, stats in sorted(self.llm_totals.items()):
+                lines.append(f'{metric}{{backend="{backend}"}} {getattr(stats, attr)}')
+
+        lines.append("# HELP llm_sim_llm_parse_outcomes_total LLM responses by parse outcome class")
+        lines.append("# TYPE llm_sim_llm_parse_outcomes_total counter")
+        for backend, stats in sorted(self.llm_totals.items()):
+            for outcome, count in sorted(stats.parse_outcomes.items()):
+                lines.append(f'llm_sim_llm_parse_outcomes_total{{backend="{backend}",outcome="{outcome}"}} {count}')
+
+        gauges = (
+            ("llm_sim_llm_concurrency_limit", "Adaptive limit on in-flight LLM requests", "limit"),
+            ("llm_sim_llm_in_flight", "LLM requests in flight", "in_flight"),
+            ("llm_sim_llm_throughput", "Completed LLM requests per second (recent window)", "throughput")
+        )
+        for metric, help_text, key in gauges:
+            lines.append(f"# HELP {metric} {help_text}")
+            lines.append(f"# TYPE {metric} gauge")
+            for backend, state in sorted(self.llm_concurrency.items()):
+                lines.append(f'{metric}{{backend="{backend}"}} {state.get(key, 0)}')
+
+        lines.append("# HELP llm_sim_llm_latency_seconds LLM request latency")
+        lines.append("# TYPE llm_sim_llm_latency_seconds histogram")
+        for backend, stats in sorted(self.llm_totals.items()):
+            cumulative = 0
+            for bound, count in zip(LATENCY_BUCKETS, stats.latency_buckets):
+                cumulative += count
+                le = "+Inf" if bound == float("inf") else f"{bound}"
+                lines.append(f'llm_sim_llm_latency_seconds_bucket{{backend="{backend}",le="{le}"}} {cumulative}')
+            lines.append(f'llm_sim_llm_latency_seconds_sum{{backend="{backend}"}} {stats.latency_sum:.6f}')
+            lines.append(f'llm_sim_llm_latency_seconds_count{{backend="{backend}"}} {stats.calls}')
+
+        # Write atomically so collectors never read a half-written file
+        tmp_path = f"{self.prometheus_path}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            f.write("\n".join(lines) + "\n")
+        os.replace(tmp_path, self.prometheus_path)
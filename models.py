@@ -4,28 +4,108 @@
 # 💡 Usage: Used in simulator.py to create game world
 
 import random
+import sys
+
+
+# Stats stored in fixed NPC slots, in serialization order
+STAT_NAMES = ("health", "energy", "hunger", "mood")
+
+# Initial values drawn for a new NPC: (attribute, low, high), in draw order
+INITIAL_RANGES = (
+    ("age", 18, 60),
+    ("health", 70, 100),
+    ("energy", 40, 100),
+    ("hunger", 20, 80),
+    ("mood", 30, 90)
+)
+
+# Action codes -> display templates (text is only built on output)
+ACTION_TEMPLATES = {
+    "ate": "🍞 {name} ate",
+    "rested": "😴 {name} rested",
+    "work": "{name} {reason}",
+    "chat": "💬 {name} talked to {target} ({reason})",
+    "help": "🤝 {name} helped {target} ({reason})",
+    "argue": "😠 {name} argued with {target} ({reason})",
+    "died": "💀 {name} died",
+    "note": "{reason}"
+}
+
+# Interned action reasons: id -> text and text -> id
+_reason_texts = []
+_reason_ids = {}
+
+
+def intern_reason(text):
+    """Return a small integer id for a reason string"""
+    if text is None:
+        return None
+    reason_id = _reason_ids.get(text)
+    if reason_id is None:
+        text = sys.intern(text)
+        reason_id = len(_reason_texts)
+        _reason_texts.append(text)
+        _reason_ids[text] = reason_id
+    return reason_id
+
+
+def reason_text(reason_id):
+    """Resolve an interned reason id back to text"""
+    if reason_id is None:
+        return ""
+    return _reason_texts[reason_id]
 
 
 class NPC:
     """NPC class - autonomous agent with state and behavior"""
     
-    def __init__(self, npc_id, name, role, location):
+    __slots__ = (
+        "id", "name", "role", "location", "age",
+        "health", "energy", "hunger", "mood",
+        "relationships", "alive", "actions_today", "observers", "shared_relationships"
+    )
+    
+    def __init__(self, npc_id, name, role, location, rng=None, initial=None):
+        if initial is None:
+            rng = rng or random  # The NPC's RandomStream, or the global generator
+            initial = [rng.randint(low, high) for _, low, high in INITIAL_RANGES]
         self.id = npc_id
         self.name = name
         self.role = role
         self.location = location
-        self.age = random.randint(18, 60)
-        self.stats = {
-            "health": random.randint(70, 100),
-            "energy": random.randint(40, 100),
-            "hunger": random.randint(20, 80),
-            "mood": random.randint(30, 90)
-        }
+        self.age, self.health, self.energy, self.hunger, self.mood = initial
         self.relationships = {}  # other_id: level (-100 to 100)
         self.alive = True
-        self.actions_today = []
+        self.actions_today = []  # (action code, target id, reason id)
+        self.observers = ()  # callables(npc, other_id, old, new) on relationship change
+        self.shared_relationships = False  # relationships dict is shared with a forked world
 
-    def to_dict(self):
+    def fork_copy(self):
+        """Copy for a forked world; the relationships dict is copied on first write"""
+        npc = NPC.__new__(NPC)
+        npc.id, npc.name, npc.role, npc.location = self.id, self.name, self.role, self.location
+        npc.age, npc.health, npc.energy, npc.hunger, npc.mood = (
+            self.age, self.health, self.energy, self.hunger, self.mood
+        )
+        npc.relationships = self.relationships
+        npc.shared_relationships = True
+        npc.alive = self.alive
+        npc.actions_today = list(self.actions_today)
+        npc.observers = self.observers
+        return npc
+
+    @property
+    def stats(self):
+        """Stats as a fresh dictionary (for serialization and display)"""
+        return {name: getattr(self, name) for name in STAT_NAMES}
+
+    @stats.setter
+    def stats(self, values):
+        for name in STAT_NAMES:
+            if name in values:
+                setattr(self, name, values[name])
+
+    def to_dict(self, npcs=None):
         """Serialize to dictionary for JSON"""
         return {
             "id": self.id,
@@ -34,9 +114,9 @@ class NPC:
             "location": self.location,
             "age": self.age,
             "stats": self.stats,
-            "relationships": self.relationships,
+            "relationships": dict(self.relationships),
             "alive": self.alive,
-            "actions_today": self.actions_today
+            "actions_today": self.describe_actions(npcs)
         }
 
     @classmethod
@@ -47,15 +127,35 @@ class NPC:
         npc.stats = data["stats"]
         npc.relationships = data["relationships"]
         npc.alive = data["alive"]
-        npc.actions_today = data.get("actions_today", [])
+        npc.actions_today = [
+            ("note", None, intern_reason(action))
+            for action in data.get("actions_today", [])
+        ]
         return npc
 
-    def add_action(self, action):
-        """Add action to daily actions list"""
-        self.actions_today.append(action)
+    def add_action(self, code, target_id=None, reason=None):
+        """Add action record to daily actions list"""
+        self.actions_today.append((code, target_id, intern_reason(reason)))
+
+    def format_action(self, action, npcs=None):
+        """Render an action record as human-readable text"""
+        code, target_id, reason_id = action
+        target = target_id or ""
+        if target_id and npcs and target_id in npcs:
+            target = npcs[target_id].name
+        return ACTION_TEMPLATES.get(code, "{name} {reason}").format(
+            name=self.name, target=target, reason=reason_text(reason_id)
+        )
+
+    def describe_actions(self, npcs=None):
+        """Human-readable list of today's actions"""
+        return [self.format_action(action, npcs) for action in self.actions_today]
         
     def update_relationship(self, other_id, change):
         """Update relationship with another NPC"""
+        if self.shared_relationships:
+            self.relationships = dict(self.relationships)
+            self.shared_relationships = False
         current = self.relationships.get(other_id, 0)
         new_value = max(-100, min(100, current + change))
         
@@ -65,11 +165,13 @@ class NPC:
             print(f"  💕 {self.name} → relationship {direction}{change}: {current} → {new_value}")
         
         self.relationships[other_id] = new_value
+        for observer in self.observers:
+            observer(self, other_id, current, new_value)
         
     def update_stat(self, stat_name, change):
         """Update stat with limits"""
-        if stat_name in self.stats:
-            old_value = self.stats[stat_name]
+        if stat_name in STAT_NAMES:
+            old_value = getattr(self, stat_name)
             new_value = max(0, min(100, old_value + change))
             
             # Log significant stat changes
@@ -83,12 +185,14 @@ class NPC:
                 }.get(stat_name, "📊")
                 print(f"  {stat_icon} {self.name} → {stat_name} {direction}{change}: {old_value} → {new_value}")
             
-            self.stats[stat_name] = new_value
+            setattr(self, stat_name, new_value)
 
 
 class Location:
     """Location class with NPCs and events"""
     
+    __slots__ = ("name", "type", "description", "npc_ids", "events_today")
+    
     def __init__(self, name, location_type, description):
         self.name = name
         self.type = location_type
@@ -96,14 +200,21 @@ class Location:
         self.npc_ids = []
         self.events_today = []
 
+    def fork_copy(self):
+        """Copy for a forked world"""
+        location = Location(self.name, self.type, self.description)
+        location.npc_ids = list(self.npc_ids)
+        location.events_today = list(self.events_today)
+        return location
+
     def to_dict(self):
         """Serialize to dictionary for JSON"""
         return {
             "name": self.name,
             "type": self.type,
             "description": self.description,
-            "npc_ids": self.npc_ids,
-            "events_today": self.events_today
+            "npc_ids": list(self.npc_ids),
+            "events_today": list(self.events_today)
         }
 
     @classmethod
@@ -0,0 +1,156 @@
+# 📁 neighbor_index.py - Per-location relevant-neighbor index
+# 🎯 Core function: Top-k strongest friends/enemies among co-located NPCs
+# 🔗 Key dependencies: heapq, models (NPC relationship observers)
+# 💡 Usage: Maintained by WorldSimulator, queried in _llm_decisions
+
+import heapq
+from typing import Dict, List, Set
+
+
+class NeighborIndex:
+    """Top-k strongest positive and negative relationships per NPC, restricted
+    to alive NPCs in the same location. Updated incrementally; an NPC whose
+    list lost a member it cannot refill is rebuilt lazily on the next query."""
+
+    def __init__(self, npcs: Dict, locations: Dict, k: int = 3):
+        self.npcs = npcs
+        self.locations = locations
+        self.k = k
+        self.friends: Dict[str, List] = {}  # npc_id -> [(value, other_id)], strongest first
+        self.enemies: Dict[str, List] = {}  # npc_id -> [(value, other_id)], most negative first
+        self.referenced_by: Dict[str, Set[str]] = {}  # other_id -> npc_ids listing it
+        self.alive_counts: Dict[str, int] = {}
+        self.dirty: Set[str] = set()
+        self.build()
+
+    def build(self):
+        """Reset the index; every NPC is rebuilt on first query"""
+        self.friends = {}
+        self.enemies = {}
+        self.referenced_by = {}
+        self.dirty = set(self.npcs.keys())
+        self.alive_counts = {
+            name: len(loc.get_alive_npcs(self.npcs))
+            for name, loc in self.locations.items()
+        }
+
+    def has_neighbors(self, npc_id: str) -> bool:
+        """Whether any other alive NPC shares this NPC's location"""
+        return self.alive_counts.get(self.npcs[npc_id].location, 0) > 1
+
+    def top_neighbors(self, npc_id: str, limit: int = None) -> List[str]:
+        """Most relevant co-located NPC ids, strongest relationships first"""
+        if npc_id in self.dirty:
+            self._rebuild(npc_id)
+        entries = self.friends.get(npc_id, []) + self.enemies.get(npc_id, [])
+        entries.sort(key=lambda entry: -abs(entry[0]))
+        return [other_id for _, other_id in entries[:limit or self.k]]
+
+    def top_friends(self, npc_id: str) -> List[str]:
+        """Strongest positive co-located relationships"""
+        if npc_id in self.dirty:
+            self._rebuild(npc_id)
+        return [other_id for _, other_id in self.friends.get(npc_id, [])]
+
+    def top_enemies(self, npc_id: str) -> List[str]:
+        """Strongest negative co-located relationships"""
+        if npc_id in self.dirty:
+            self._rebuild(npc_id)
+        return [other_id for _, other_id in self.enemies.get(npc_id, [])]
+
+    def on_relationship_change(self, npc, other_id: str, old_value: int, new_value: int):
+        """Observer called by NPC.update_relationship"""
+        npc_id = npc.id
+        if npc_id in self.dirty or other_id == npc_id:
+            return
+        other = self.npcs.get(other_id)
+        if other is None or not other.alive or other.location != npc.location:
+            return
+
+        friends = self.friends.setdefault(npc_id, [])
+        enemies = self.enemies.setdefault(npc_id, [])
+
+        # A full list that loses a member to a weaker value may now hide a
+        # better non-member candidate, so it must be rebuilt
+        for entries, weaker in ((friends, new_value < old_value), (enemies, new_value > old_value)):
+            was_full = len(entries) >= self.k
+            if self._remove(entries, npc_id, other_id) and was_full and weaker:
+                self._mark_dirty(npc_id)
+                return
+
+        if new_value >= 0:
+            self._insert(friends, npc_id, other_id, new_value, reverse=True)
+        else:
+            self._insert(enemies, npc_id, other_id, new_value, reverse=False)
+
+    def on_death(self, npc_id: str):
+        """Drop a dead NPC from every list that references it"""
+        location = self.npcs[npc_id].location
+        self.alive_counts[location] = max(0, self.alive_counts.get(location, 0) - 1)
+
+        for owner_id in self.referenced_by.pop(npc_id, set()):
+            for entries in (self.friends.get(owner_id, []), self.enemies.get(owner_id, [])):
+                was_full = len(entries) >= self.k
+                if self._remove(entries, owner_id, npc_id, track=False) and was_full:
+                    self._mark_dirty(owner_id)
+
+        self._forget(npc_id)
+        self.dirty.discard(npc_id)
+
+    def _insert(self, entries: List, npc_id: str, other_id: str, value: int, reverse: bool):
+        """Insert into a sorted top-k list, evicting the weakest entry"""
+        if len(entries) >= self.k:
+            weakest = entries[-1][0]
+            if (value <= weakest) if reverse else (value >= weakest):
+                return
+            _, evicted_id = entries.pop()
+            self._unreference(evicted_id, npc_id)
+        entries.append((value, other_id))
+        entries.sort(key=lambda entry: -entry[0] if reverse else entry[0])
+        self.referenced_by.setdefault(other_id, set()).add(npc_id)
+
+    def _remove(self, entries: List, npc_id: str, other_id: str, track: bool = True) -> bool:
+        """Remove other_id from a list, returning whether it was present"""
+        for i, (_, listed_id) in enumerate(entries):
+            if listed_id == other_id:
+                del entries[i]
+                if track:
+                    self._unreference(other_id, npc_id)
+                return True
+        return False
+
+    def _unreference(self, other_id: str, npc_id: str):
+        owners = self.referenced_by.get(other_id)
+        if owners is not None:
+            owners.discard(npc_id)
+
+    def _forget(self, npc_id: str):
+        """Drop an NPC's own lists and their back-references"""
+        for entries in (self.friends.pop(npc_id, []), self.enemies.pop(npc_id, [])):
+            for _, other_id in entries:
+                self._unreference(other_id, npc_id)
+
+    def _mark_dirty(self, npc_id: str):
+        self._forget(npc_id)
+        self.dirty.add(npc_id)
+
+    def _rebuild(self, npc_id: str):
+        """Recompute one NPC's lists from its location (O(location size))"""
+        self._forget(npc_id)
+        self.dirty.discard(npc_id)
+        npc = self.npcs[npc_id]
+        location = self.locations.get(npc.location)
+        if location is None:
+            return
+
+        candidates = [
+            (npc.relationships.get(other_id, 0), other_id)
+            for other_id in location.npc_ids
+            if other_id != npc_id and self.npcs[other_id].alive
+        ]
+        friends = heapq.nlargest(self.k, (c for c in candidates if c[0] >= 0))
+        enemies = heapq.nsmallest(self.k, (c for c in candidates if c[0] < 0))
+        self.friends[npc_id] = friends
+        self.enemies[npc_id] = enemies
+        for _, other_id in friends + enemies:
+            self.referenced_by.setdefault(other_id, set()).add(npc_id)
@@ -0,0 +1,111 @@
+# 📁 prefetch.py - Speculative next-day LLM decision prefetch
+# 🎯 Core function: Overlap next-day LLM requests with the rest of the current day
+# 🔗 Key dependencies: asyncio, time
+# 💡 Usage: Used by WorldSimulator when CONFIG["prefetch"]["enabled"] is set
+
+import asyncio
+import time
+from typing import Callable, Dict, List, Optional
+
+
+async def _timed(coro):
+    """Await a coroutine and note when it finished"""
+    result = await coro
+    return result, time.perf_counter()
+
+
+class PrefetchEntry:
+    """One in-flight speculative decision"""
+
+    __slots__ = ("task", "predicted_stats", "started")
+
+    def __init__(self, task: asyncio.Task, predicted_stats: Dict[str, int], started: float):
+        self.task = task
+        self.predicted_stats = predicted_stats
+        self.started = started
+
+
+class DecisionPrefetcher:
+    """Holds speculative decisions for one upcoming day and validates them on use"""
+
+    def __init__(self, stat_tolerance: int = 15):
+        self.stat_tolerance = stat_tolerance
+        self.day = None
+        self.candidates: List[str] = []
+        self.pending: Dict[str, PrefetchEntry] = {}
+
+        # Totals over the whole run
+        self.prefetched = 0
+        self.hits = 0
+        self.misses = 0
+        self.wasted = 0
+        self.saved_seconds = 0.0
+
+        # Current day
+        self._day_hits = 0
+        self._day_prefetched = 0
+        self._day_saved = 0.0
+
+    @property
+    def hit_rate(self) -> float:
+        return self.hits / self.prefetched if self.prefetched else 0.0
+
+    def has_day(self, day: int) -> bool:
+        """Whether candidates were already drawn for this day"""
+        return self.day == day
+
+    def start(self, day: int, candidates: List[str]):
+        """Begin a new prefetch round for the given day"""
+        self.discard_unused()
+        self.day = day
+        self.candidates = list(candidates)
+        self._day_hits = 0
+        self._day_prefetched = 0
+        self._day_saved = 0.0
+
+    def submit(self, npc_id: str, coro, predicted_stats: Dict[str, int]):
+        """Start a speculative request for an NPC"""
+        task = asyncio.ensure_future(_timed(coro))
+        self.pending[npc_id] = PrefetchEntry(task, predicted_stats, time.perf_counter())
+        self.prefetched += 1
+        self._day_prefetched += 1
+
+    async def take(self, npc, is_valid_target: Callable) -> Optional[Dict]:
+        """Return the prefetched decision if it still fits the actual state"""
+        entry = self.pending.pop(npc.id, None)
+        if entry is None:
+            return None
+
+        wait_started = time.perf_counter()
+        decision, finished = await entry.task
+        waited = time.perf_counter() - wait_started
+
+        within_tolerance = all(
+            abs(getattr(npc, name) - value) <= self.stat_tolerance
+            for name, value in entry.predicted_stats.items()
+        )
+        if decision and within_tolerance and is_valid_target(npc, decision.get("target", "")):
+            saved = max(0.0, (finished - entry.started) - waited)
+            self.hits += 1
+            self._day_hits += 1
+            self.saved_seconds += saved
+            self._day_saved += saved
+            return decision
+
+        self.misses += 1
+        return None
+
+    def discard_unused(self):
+        """Cancel prefetched requests that were never consumed"""
+        for entry in self.pending.values():
+            entry.task.cancel()
+            self.wasted += 1
+        self.pending = {}
+
+    def report_day(self):
+        """Print the prefetch outcome for the current day"""
+        if not self._day_prefetched:
+            return
+        print(f"🔮 [PREFETCH] Day {self.day}: {self._day_hits}/{self._day_prefetched} hits, "
+              f"~{self._day_saved:.2f}s saved (run hit rate {self.hit_rate:.0%}, "
+              f"~{self.saved_seconds:.2f}s saved)")
@@ -0,0 +1,123 @@
+# 📁 prompt_cache.py - KV-cache-friendly decision prompts
+# 🎯 Core function: Stable shared system prefix + optional per-NPC/per-location conversations sending only the day's delta
+# 🔗 Key dependencies: prompt_loader, collections
+# 💡 Usage: Enabled via CONFIG["prompt_cache"]; used by OllamaClient.get_npc_decision
+
+from collections import OrderedDict
+from typing import Dict, List, Optional, Tuple
+
+from prompt_loader import prompt_loader
+
+
+CONVERSATION_MODES = ("none", "npc", "location")
+
+
+class Conversation:
+    """Messages already sent (and answered) in one persistent context"""
+
+    __slots__ = ("system", "messages", "memories")
+
+    def __init__(self, system: str):
+        self.system = system
+        self.messages: List[Dict] = [{"role": "system", "content": system}]
+        self.memories = set()  # Memory texts already shown in this conversation
+
+
+class DecisionPromptCache:
+    """Builds decision requests whose prefix the server has likely cached.
+
+    The system message (rules, location, output schema) is identical for
+    every NPC of a location, so it is encoded once per server slot. With a
+    conversation mode, each request re-sends the earlier turns unchanged and
+    appends only today's turn (stats, nearby relationships, new memories).
+    A conversation is restarted after `max_turns` turns rather than trimmed,
+    because dropping its oldest turn would change the prefix of every later
+    request."""
+
+    def __init__(self, conversation: str = "none", max_turns: int = 8, max_conversations: int = 1024):
+        if conversation not in CONVERSATION_MODES:
+            raise ValueError(f"conversation must be one of {', '.join(CONVERSATION_MODES)}")
+        self.conversation = conversation
+        self.max_turns = max_turns
+        self.max_conversations = max_conversations
+        self.conversations: "OrderedDict[Tuple[str, str], Conversation]" = OrderedDict()
+        self.restarts = 0
+
+    @classmethod
+    def from_config(cls, settings: Optional[Dict]) -> Optional["DecisionPromptCache"]:
+        """Create from CONFIG["prompt_cache"], or None if disabled"""
+        if not settings or not settings.get("enabled"):
+            return None
+        return cls(
+            conversation=settings.get("conversation", "none"),
+            max_turns=settings.get("max_turns", 8),
+            max_conversations=settings.get("max_conversations", 1024)
+        )
+
+    def _key(self, npc_data: Dict, context: Dict) -> Tuple[str, str]:
+        """Conversation key; worlds sharing one client keep separate conversations"""
+        owner = npc_data["id"] if self.conversation == "npc" else npc_data["location"]
+        return context.get("world", ""), owner
+
+    def _conversation(self, key: Tuple[str, str], system: str) -> Conversation:
+        """Existing conversation for key, restarted if full or its prefix changed"""
+        conversation = self.conversations.get(key)
+        if conversation is not None and (
+            conversation.system != system or len(conversation.messages) > 2 * self.max_turns
+        ):
+            conversation = None
+            self.restarts += 1
+        if conversation is None:
+            conversation = self.conversations[key] = Conversation(system)
+            if len(self.conversations) > self.max_conversations:
+                self.conversations.popitem(last=False)
+        self.conversations.move_to_end(key)
+        return conversation
+
+    def build(self, npc_data: Dict, context: Dict, relationships: Dict) -> Tuple[List[Dict], Optional[Tuple]]:
+        """Messages for one decision and a token to pass to commit()"""
+        system = prompt_loader.render_template(
+            "npc_decision_system",
+            npc_location=npc_data["location"],
+            location_type=context.get("location_type", ""),
+            location_description=context.get("location_description", "")
+        )
+        memories = context.get("memories", [])
+
+        conversation = None
+        history = [{"role": "system", "content": system}]
+        if self.conversation != "none":
+            key = self._key(npc_data, context)
+            conversation = self._conversation(key, system)
+            history = conversation.messages
+            memories = [memory for memory in memories if memory not in conversation.memories]
+
+        turn = prompt_loader.render_template(
+            "npc_decision_turn",
+            day=context.get("day", 0),
+            npc_role=npc_data["role"],
+            npc_name=npc_data["name"],
+            health=npc_data["stats"]["health"],
+            energy=npc_data["stats"]["energy"],
+            mood=npc_data["stats"]["mood"],
+            relationships=relationships,
+            memories=memories
+        )
+        messages = history + [{"role": "user", "content": turn}]
+        if conversation is None:
+            return messages, None
+        return messages, (key, conversation, len(history), memories)
+
+    def commit(self, token: Optional[Tuple], messages: List[Dict], reply: str):
+        """Keep a successful exchange in its conversation.
+
+        Skipped if the conversation moved on while the request was in flight,
+        so stored history always equals what the server has seen."""
+        if token is None:
+            return
+        key, conversation, base_length, memories = token
+        if self.conversations.get(key) is not conversation or len(conversation.messages) != base_length:
+            return
+        conversation.messages.append(messages[-1])
+        conversation.messages.append({"role": "assistant", "content": reply})
+        conversation.memories.update(memories)
@@ -76,13 +76,35 @@ Return ONLY JSON in this format:
 ]}}"""
         
         elif template_name == "npc_decision":
+            memories = ''.join(f"- {memory}\n" for memory in kwargs.get('memories', []))
+            if memories:
+                memories = "Things you remember:\n" + memories
             return f"""You are a {kwargs.get('npc_role', 'person')} named {kwargs.get('npc_name', 'Unknown')} in {kwargs.get('npc_location', 'somewhere')}.
 Your stats: health={kwargs.get('health', 100)}, energy={kwargs.get('energy', 100)}, mood={kwargs.get('mood', 50)}.
 Your relationships with nearby people: {kwargs.get('relationships', '{}')}
-
+{memories}
 Make ONE social decision. Reply ONLY JSON:
 {{"action": "chat/help/argue/ignore", "target": "other_npc_id", "reason": "brief reason"}}"""
-        
+
+        elif template_name == "npc_decision_system":
+            location_type = kwargs.get('location_type')
+            location_type = f" ({location_type})" if location_type else ""
+            description = kwargs.get('location_description')
+            description = f"{description}.\n" if description else ""
+            return f"""You decide the social actions of people living in {kwargs.get('npc_location', 'somewhere')}{location_type}.
+{description}Each message describes one person on one day: their stats, their relationships with nearby people and things they remember.
+Make ONE social decision for that person. Reply ONLY JSON:
+{{"action": "chat/help/argue/ignore", "target": "other_npc_id", "reason": "brief reason"}}"""
+
+        elif template_name == "npc_decision_turn":
+            memories = ''.join(f"- {memory}\n" for memory in kwargs.get('memories', []))
+            if memories:
+                memories = "Things you remember:\n" + memories
+            return f"""Day {kwargs.get('day', 0)}. You are a {kwargs.get('npc_role', 'person')} named {kwargs.get('npc_name', 'Unknown')}.
+Your stats: health={kwargs.get('health', 100)}, energy={kwargs.get('energy', 100)}, mood={kwargs.get('mood', 50)}.
+Your relationships with nearby people: {kwargs.get('relationships', '{}')}
+{memories}"""
+
         elif template_name == "generate_chronicle":
             current_day = kwargs.get('current_day', 0)
             key_events = kwargs.get('key_events', [])[:20]
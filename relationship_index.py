@@ -0,0 +1,137 @@
+# 📁 relationship_index.py - Friend/enemy threshold index
+# 🎯 Core function: Pairs above/below the friend/enemy thresholds, per-NPC counts, per-location factions
+# 🔗 Key dependencies: models (NPC relationship observers)
+# 💡 Usage: Maintained by WorldSimulator; used by the chronicle and the status server
+
+from typing import Dict, Iterator, List, Set, Tuple
+
+
+class RelationshipIndex:
+    """Directed friend (value > friend_threshold) and enemy (value <
+    enemy_threshold) sets, kept current by NPC relationship observers.
+
+    Factions are connected components of the friendship graph (either
+    direction) among alive NPCs of one location. They are merged with
+    union-find as friendships form; a location that loses an edge or a
+    member is rebuilt lazily on its next query."""
+
+    def __init__(self, npcs: Dict, locations: Dict, friend_threshold: int = 50, enemy_threshold: int = -30):
+        self.npcs = npcs
+        self.locations = locations
+        self.friend_threshold = friend_threshold
+        self.enemy_threshold = enemy_threshold
+        self.friends: Dict[str, Dict[str, None]] = {}  # npc_id -> ordered set of friend ids
+        self.enemies: Dict[str, Dict[str, None]] = {}  # npc_id -> ordered set of enemy ids
+        self._parents: Dict[str, Dict[str, str]] = {}  # location -> union-find parents
+        self._dirty_locations: Set[str] = set()
+        self.build()
+
+    def build(self):
+        """Index every relationship once (O(total relationships))"""
+        self.friends = {}
+        self.enemies = {}
+        for npc_id, npc in self.npcs.items():
+            if not npc.alive:
+                continue
+            for other_id, value in npc.relationships.items():
+                if value > self.friend_threshold:
+                    self.friends.setdefault(npc_id, {})[other_id] = None
+                elif value < self.enemy_threshold:
+                    self.enemies.setdefault(npc_id, {})[other_id] = None
+        self._parents = {}
+        self._dirty_locations = set(self.locations.keys())
+
+    # --- queries (O(result)) ---
+
+    def friends_of(self, npc_id: str) -> List[str]:
+        return list(self.friends.get(npc_id, ()))
+
+    def enemies_of(self, npc_id: str) -> List[str]:
+        return list(self.enemies.get(npc_id, ()))
+
+    def counts(self, npc_id: str) -> Tuple[int, int]:
+        """(friend count, enemy count) of an NPC"""
+        return len(self.friends.get(npc_id, ())), len(self.enemies.get(npc_id, ()))
+
+    def pairs(self) -> Iterator[Tuple[str, str, str]]:
+        """(npc_id, other_id, "friends"/"enemies") for every indexed pair"""
+        for status, table in (("friends", self.friends), ("enemies", self.enemies)):
+            for npc_id, others in table.items():
+                for other_id in others:
+                    yield npc_id, other_id, status
+
+    def factions(self, location_name: str) -> List[List[str]]:
+        """Friendship clusters (2+ NPCs) in a location, largest first"""
+        if location_name in self._dirty_locations or location_name not in self._parents:
+            self._rebuild_location(location_name)
+        parents = self._parents[location_name]
+        groups: Dict[str, List[str]] = {}
+        for npc_id in parents:
+            groups.setdefault(self._find(parents, npc_id), []).append(npc_id)
+        return sorted((group for group in groups.values() if len(group) > 1), key=len, reverse=True)
+
+    # --- maintenance ---
+
+    def on_relationship_change(self, npc, other_id: str, old_value: int, new_value: int):
+        """Observer called by NPC.update_relationship"""
+        if not npc.alive or other_id == npc.id:
+            return
+        npc_id = npc.id
+        was_friend = old_value > self.friend_threshold
+        is_friend = new_value > self.friend_threshold
+        if is_friend and not was_friend:
+            self.friends.setdefault(npc_id, {})[other_id] = None
+            self._link(npc, other_id)
+        elif was_friend and not is_friend:
+            self.friends.get(npc_id, {}).pop(other_id, None)
+            if npc_id not in self.friends.get(other_id, ()):
+                self._dirty_locations.add(npc.location)
+
+        was_enemy = old_value < self.enemy_threshold
+        is_enemy = new_value < self.enemy_threshold
+        if is_enemy and not was_enemy:
+            self.enemies.setdefault(npc_id, {})[other_id] = None
+        elif was_enemy and not is_enemy:
+            self.enemies.get(npc_id, {}).pop(other_id, None)
+
+    def on_death(self, npc_id: str):
+        """Dead NPCs keep no pairs of their own and leave their faction"""
+        self.friends.pop(npc_id, None)
+        self.enemies.pop(npc_id, None)
+        self._dirty_locations.add(self.npcs[npc_id].location)
+
+    def _link(self, npc, other_id: str):
+        """Merge two co-located NPCs' factions"""
+        location = npc.location
+        other = self.npcs.get(other_id)
+        if other is None or not other.alive or other.location != location:
+            return
+        if location in self._dirty_locations or location not in self._parents:
+            return  # Rebuilt on the next query anyway
+        parents = self._parents[location]
+        root_a = self._find(parents, npc.id)
+        root_b = self._find(parents, other_id)
+        if root_a != root_b:
+            parents[root_a] = root_b
+
+    def _rebuild_location(self, location_name: str):
+        """Recompute a location's factions from its friend sets"""
+        self._dirty_locations.discard(location_name)
+        location = self.locations[location_name]
+        parents = {npc_id: npc_id for npc_id in location.get_alive_npcs(self.npcs)}
+        self._parents[location_name] = parents
+        for npc_id in parents:
+            for other_id in self.friends.get(npc_id, ()):
+                if other_id in parents:
+                    root_a = self._find(parents, npc_id)
+                    root_b = self._find(parents, other_id)
+                    if root_a != root_b:
+                        parents[root_a] = root_b
+
+    @staticmethod
+    def _find(parents: Dict[str, str], npc_id: str) -> str:
+        """Union-find root with path halving"""
+        while parents[npc_id] != npc_id:
+            parents[npc_id] = parents[parents[npc_id]]
+            npc_id = parents[npc_id]
+        return npc_id
@@ -0,0 +1,279 @@
+# 📁 response_parser.py - Tolerant LLM response parsing
+# 🎯 Core function: Extract, repair and validate JSON from free-form LLM output
+# 🔗 Key dependencies: json (standard library only)
+# 💡 Usage: Used in llm_clients.py for name generation and NPC decisions
+
+import json
+from typing import Any, Dict, Iterator, Optional, Tuple
+
+
+# Parse outcome classes (counted per backend)
+OUTCOME_OK = "ok"
+OUTCOME_REPAIRED = "repaired"
+OUTCOME_NO_JSON = "no_json"
+OUTCOME_UNREPAIRABLE = "unrepairable"
+OUTCOME_SCHEMA = "schema"
+OUTCOME_INVALID_ACTION = "invalid_action"
+OUTCOME_INVALID_TARGET = "invalid_target"
+OUTCOME_ERROR = "error"  # Request failed before any text arrived
+
+SUCCESS_OUTCOMES = (OUTCOME_OK, OUTCOME_REPAIRED)
+
+DECISION_ACTIONS = ("chat", "help", "argue", "ignore")
+
+# Near-miss action words -> canonical action
+ACTION_SYNONYMS = {
+    "talk": "chat", "talked": "chat", "talks": "chat", "speak": "chat", "converse": "chat",
+    "greet": "chat", "chatted": "chat",
+    "assist": "help", "helped": "help", "helps": "help", "support": "help", "aid": "help",
+    "fight": "argue", "quarrel": "argue", "argued": "argue", "argues": "argue", "insult": "argue",
+    "none": "ignore", "nothing": "ignore", "ignored": "ignore", "rest": "ignore", "wait": "ignore"
+}
+
+SMART_QUOTES = str.maketrans({"“": '"', "”": '"', "‘": "'", "’": "'"})
+
+LITERALS = {"true": "true", "false": "false", "null": "null",
+            "True": "true", "False": "false", "None": "null"}
+
+CLOSERS = {"{": "}", "[": "]"}
+
+
+class ResponseParseError(ValueError):
+    """LLM response could not be turned into a usable value"""
+
+    def __init__(self, outcome: str, message: str = ""):
+        super().__init__(message or outcome)
+        self.outcome = outcome
+
+
+def _closes_string(text: str, i: int) -> bool:
+    """A quote ends a string only if followed by structure (or end of text)"""
+    j = i + 1
+    while j < len(text) and text[j] in " \t\r\n":
+        j += 1
+    return j >= len(text) or text[j] in ",:}]"
+
+
+def repair_json(text: str) -> str:
+    """Repair common LLM JSON defects in the value starting at text[0].
+
+    Handles single/smart quotes, unescaped inner quotes, Python literals,
+    unquoted keys and bare-word values, comments, trailing commas and
+    truncated output (missing closers). Text after the root value is dropped."""
+    text = text.translate(SMART_QUOTES)
+    out = []
+    stack = []
+    i, n = 0, len(text)
+
+    def strip_trailing_comma():
+        while out and out[-1].isspace():
+            out.pop()
+        if out and out[-1] == ",":
+            out.pop()
+
+    while i < n:
+        ch = text[i]
+
+        if ch in "\"'":
+            quote = ch
+            buf = ['"']
+            i += 1
+            while i < n:
+                c = text[i]
+                if c == "\\" and i + 1 < n:
+                    nxt = text[i + 1]
+                    buf.append("'" if nxt == "'" else c + nxt)
+                    i += 2
+                    continue
+                if c == quote and _closes_string(text, i):
+                    i += 1
+                    break
+                if c == '"':
+                    buf.append('\\"')
+                elif c == "\n":
+                    buf.append("\\n")
+                else:
+                    buf.append(c)
+                i += 1
+            buf.append('"')
+            out.append("".join(buf))
+            continue
+
+        if ch == "/" and text.startswith("//", i):
+            end = text.find("\n", i)
+            i = n if end == -1 else end
+            continue
+        if ch == "/" and text.startswith("/*", i):
+            end = text.find("*/", i + 2)
+            i = n if end == -1 else end + 2
+            continue
+
+        if ch in "{[":
+            stack.append(ch)
+            out.append(ch)
+        elif ch in "}]":
+            if not stack:
+                break
+            strip_trailing_comma()
+            out.append(CLOSERS[stack.pop()])
+            if not stack:
+                break
+        elif ch.isalpha() or ch == "_":
+            j = i
+            while j < n and (text[j].isalnum() or text[j] in "_-"):
+                j += 1
+            word = text[i:j]
+            k = j
+            while k < n and text[k] in " \t\r\n":
+                k += 1
+            if k < n and text[k] == ":":
+                out.append(json.dumps(word))
+            elif word in LITERALS:
+                out.append(LITERALS[word])
+            else:
+                # Bare word value: take the rest up to the next delimiter
+                end = j
+                while end < n and text[end] not in ",}]\n":
+                    end += 1
+                out.append(json.dumps(text[i:end].strip()))
+                j = end
+            i = j
+            continue
+        else:
+            out.append(ch)
+        i += 1
+
+    strip_trailing_comma()
+    while stack:
+        out.append(CLOSERS[stack.pop()])
+    return "".join(out)
+
+
+def _balanced_end(text: str, start: int) -> Optional[int]:
+    """Index of the bracket closing text[start], or None if unbalanced"""
+    depth = 0
+    in_string = False
+    escaped = False
+    for i in range(start, len(text)):
+        c = text[i]
+        if in_string:
+            if escaped:
+                escaped = False
+            elif c == "\\":
+                escaped = True
+            elif c == '"':
+                in_string = False
+        elif c == '"':
+            in_string = True
+        elif c in "{[":
+            depth += 1
+        elif c in "}]":
+            depth -= 1
+            if depth == 0:
+                return i
+    return None
+
+
+def iter_json(text: str, max_candidates: int = 5) -> Iterator[Tuple[Any, str]]:
+    """Yield every JSON object/array found in arbitrary text, in order.
+
+    Yields (value, outcome) where outcome is "ok" or "repaired", trying the
+    first max_candidates brackets (nested ones included, so a decision
+    wrapped in another object is found too). Raises
+    ResponseParseError("no_json" / "unrepairable") if nothing parses."""
+    starts = [i for i, c in enumerate(text) if c in "{["]
+    if not starts:
+        raise ResponseParseError(OUTCOME_NO_JSON, "no JSON object or array in response")
+
+    found = False
+    for start in starts[:max_candidates]:
+        end = _balanced_end(text, start)
+        candidate = text[start:end + 1] if end is not None else text[start:]
+        try:
+            value, outcome = json.loads(candidate), OUTCOME_OK
+        except json.JSONDecodeError:
+            try:
+                value, outcome = json.loads(repair_json(text[start:])), OUTCOME_REPAIRED
+            except json.JSONDecodeError:
+                continue
+        found = True
+        yield value, outcome
+
+    if not found:
+        raise ResponseParseError(OUTCOME_UNREPAIRABLE, "JSON could not be repaired")
+
+
+def extract_json(text: str, max_candidates: int = 5) -> Tuple[Any, str]:
+    """First JSON object/array in arbitrary text: (value, "ok" / "repaired")"""
+    return next(iter_json(text, max_candidates))
+
+
+def _normalize_action(value: Any) -> Optional[str]:
+    """Map an action value (possibly a near miss) to a canonical action"""
+    action = str(value or "").strip().lower()
+    if action in DECISION_ACTIONS:
+        return action
+    if action in ACTION_SYNONYMS:
+        return ACTION_SYNONYMS[action]
+    for word in action.replace("/", " ").replace("_", " ").split():
+        if word in DECISION_ACTIONS:
+            return word
+        if word in ACTION_SYNONYMS:
+            return ACTION_SYNONYMS[word]
+    return None
+
+
+def _resolve_target(value: Any, nearby: Dict[str, str]) -> Optional[str]:
+    """Map a target id or (partial) NPC name to a nearby NPC id"""
+    target = str(value or "").strip()
+    if target in nearby:
+        return target
+    lowered = target.lower()
+    for npc_id, name in nearby.items():
+        if lowered in (npc_id.lower(), name.lower()):
+            return npc_id
+    if lowered:
+        matches = [
+            npc_id for npc_id, name in nearby.items()
+            if lowered in name.lower() or name.lower() in lowered or npc_id.lower() in lowered
+        ]
+        if len(matches) == 1:
+            return matches[0]
+    return None
+
+
+def validate_decision(data: Any, nearby: Dict[str, str]) -> Dict[str, str]:
+    """Check a decision against the npc_decision schema.
+
+    nearby maps the NPC ids offered in the prompt to their names; target
+    names and near-miss actions are mapped to canonical values."""
+    if isinstance(data, list):
+        data = next((item for item in data if isinstance(item, dict)), None)
+    if not isinstance(data, dict):
+        raise ResponseParseError(OUTCOME_SCHEMA, "decision is not an object")
+
+    data = {str(key).strip().lower(): value for key, value in data.items()}
+    action = _normalize_action(data.get("action"))
+    if action is None:
+        raise ResponseParseError(OUTCOME_INVALID_ACTION, f"unknown action: {data.get('action')!r}")
+
+    target = _resolve_target(data.get("target"), nearby)
+    if target is None and action != "ignore":
+        raise ResponseParseError(OUTCOME_INVALID_TARGET, f"target not nearby: {data.get('target')!r}")
+
+    reason = str(data.get("reason") or "no reason given").strip()[:200]
+    return {"action": action, "target": target or "", "reason": reason}
+
+
+def parse_decision(text: str, nearby: Dict[str, str]) -> Tuple[Dict[str, str], str]:
+    """Extract and validate an NPC decision; returns (decision, outcome).
+
+    The first JSON value in the text that passes validate_decision wins;
+    if none does, the error of the first one is raised."""
+    first_error = None
+    for data, outcome in iter_json(text):
+        try:
+            return validate_decision(data, nearby), outcome
+        except ResponseParseError as error:
+            first_error = first_error or error
+    raise first_error
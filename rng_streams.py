@@ -0,0 +1,188 @@
+# 📁 rng_streams.py - Counter-based random streams
+# 🎯 Core function: Random draws keyed by (seed, day, entity, purpose), independent of execution order
+# 🔗 Key dependencies: hashlib, numpy (optional, vectorized draws)
+# 💡 Usage: streams = RandomStreams(seed); streams.stream(day, npc.id, "drift").randint(10, 25)
+
+import hashlib
+import math
+import random
+from typing import Dict, List, Optional, Sequence, Tuple, Union
+
+try:
+    import numpy as np
+except ImportError:
+    print("⚠️ NumPy not installed: pip install numpy")
+    np = None
+
+MASK = (1 << 64) - 1
+GOLDEN = 0x9E3779B97F4A7C15
+UNIT = 1.0 / (1 << 53)
+
+
+def _mix(z: int) -> int:
+    """SplitMix64 finalizer: a well-mixed 64-bit value for every input"""
+    z = (z + GOLDEN) & MASK
+    z = ((z ^ (z >> 30)) * 0xBF58476D1CE4E5B9) & MASK
+    z = ((z ^ (z >> 27)) * 0x94D049BB133111EB) & MASK
+    return z ^ (z >> 31)
+
+
+def _mix_array(z):
+    """_mix over a uint64 array (wrapping arithmetic gives the same bits)"""
+    z = z + np.uint64(GOLDEN)
+    z = (z ^ (z >> np.uint64(30))) * np.uint64(0xBF58476D1CE4E5B9)
+    z = (z ^ (z >> np.uint64(27))) * np.uint64(0x94D049BB133111EB)
+    return z ^ (z >> np.uint64(31))
+
+
+def text_key(text: str) -> int:
+    """Stable 64-bit key of an entity or purpose name (unlike hash(), same in every process)"""
+    return int.from_bytes(hashlib.blake2b(text.encode("utf-8"), digest_size=8).digest(), "little")
+
+
+def pair_key(first: int, second: int) -> int:
+    """Entity key of an ordered pair of entity keys"""
+    return _mix(first) ^ second
+
+
+class RandomStream:
+    """Draws of one (seed, day, entity, purpose) key.
+
+    Draw n is a pure function of the key and n, so a stream can be
+    recreated anywhere (another thread, shard or vectorized pass) and gives
+    the same values. Mirrors the parts of random.Random the simulation uses."""
+
+    __slots__ = ("base", "counter")
+
+    def __init__(self, base: int, counter: int = 0):
+        self.base = base
+        self.counter = counter  # Index of the next draw
+
+    def at(self, n: int) -> float:
+        """Draw n in [0, 1) without moving the counter"""
+        return (_mix((self.base + n) & MASK) >> 11) * UNIT
+
+    def random(self) -> float:
+        value = self.at(self.counter)
+        self.counter += 1
+        return value
+
+    def randint(self, low: int, high: int) -> int:
+        return low + int(self.random() * (high - low + 1))
+
+    def choice(self, seq: Sequence):
+        return seq[int(self.random() * len(seq))]
+
+    def gauss(self, mu: float = 0.0, sigma: float = 1.0) -> float:
+        """Normal draw (Box-Muller, two uniforms)"""
+        radius = math.sqrt(-2.0 * math.log(1.0 - self.random()))
+        return mu + sigma * radius * math.cos(2.0 * math.pi * self.random())
+
+
+class RandomStreams:
+    """Factory of counter-based streams for one world.
+
+    The same seed gives the same draw for the same (day, entity, purpose)
+    no matter in which order, thread or batch it is requested, so serial,
+    concurrent, sharded and vectorized runs produce identical worlds."""
+
+    def __init__(self, seed: Optional[int] = None, entity_keys: Optional[Dict[str, int]] = None):
+        if seed is None:
+            seed = random.getrandbits(64)  # Unseeded worlds still follow random.seed()
+        self.seed = seed
+        self.seed_key = _mix(seed & MASK)
+        self.purposes: Dict[str, int] = {}
+        self.days: Dict[int, int] = {}
+        # Entity name -> text_key; seed-independent, so forks can share it
+        self.entity_keys: Dict[str, int] = {} if entity_keys is None else entity_keys
+
+    def entity_key(self, entity: str) -> int:
+        """Cached text_key of an entity (NPC ids are hashed once, not once per day)"""
+        key = self.entity_keys.get(entity)
+        if key is None:
+            key = self.entity_keys[entity] = text_key(entity)
+        return key
+
+    def _purpose_key(self, purpose: str) -> int:
+        key = self.purposes.get(purpose)
+        if key is None:
+            key = self.purposes[purpose] = text_key(purpose)
+        return key
+
+    def _day_key(self, day: int) -> int:
+        key = self.days.get(day)
+        if key is None:
+            key = self.days[day] = _mix((self.seed_key + day) & MASK)
+        return key
+
+    def _base(self, day: int, entity_key: int, purpose_key: int) -> int:
+        # Day, entity and purpose keys are independent 64-bit hashes; one mix of their XOR is the stream key
+        return _mix(self._day_key(day) ^ entity_key ^ purpose_key)
+
+    def stream(self, day: int, entity: Union[str, int], purpose: str, counter: int = 0) -> RandomStream:
+        """Stream of an entity's draws for one purpose on one day (entity: name or key)"""
+        key = entity if isinstance(entity, int) else self.entity_key(entity)
+        return RandomStream(self._base(day, key, self._purpose_key(purpose)), counter)
+
+    def uniforms(self, day: int, entities: List[str], purpose: str, counter: int = 0):
+        """Draw `counter` of every entity's stream at once.
+
+        Returns a NumPy float64 array when NumPy is available (a list
+        otherwise); values are bit-identical to stream(...).at(counter)."""
+        purpose_key = self._purpose_key(purpose)
+        if np is None:
+            return [RandomStream(self._base(day, self.entity_key(entity), purpose_key)).at(counter)
+                    for entity in entities]
+        return self._uniform_array(day, self._key_array(entities), purpose_key, counter)
+
+    def uniform_rows(self, day: int, entities: List[str], purpose: str, count: int,
+                     start: int = 0) -> List[List[float]]:
+        """Draws start .. start + count - 1 of every entity's stream, one row per entity"""
+        purpose_key = self._purpose_key(purpose)
+        if np is None:
+            rows = []
+            for entity in entities:
+                rng = RandomStream(self._base(day, self.entity_key(entity), purpose_key))
+                rows.append([rng.at(i) for i in range(start, start + count)])
+            return rows
+        keys = self._key_array(entities)
+        columns = [self._uniform_array(day, keys, purpose_key, i) for i in range(start, start + count)]
+        return np.stack(columns, axis=1).tolist()
+
+    def randint_rows(self, day: int, entities: List[str], purpose: str,
+                     ranges: Sequence[Tuple[int, int]]) -> List[List[int]]:
+        """One row per entity: draw i of its stream as randint(*ranges[i]),
+        the values stream(...).randint() returns in that order"""
+        purpose_key = self._purpose_key(purpose)
+        if np is None:
+            rows = []
+            for entity in entities:
+                rng = RandomStream(self._base(day, self.entity_key(entity), purpose_key))
+                rows.append([rng.randint(low, high) for low, high in ranges])
+            return rows
+        keys = self._key_array(entities)
+        columns = [
+            np.floor(self._uniform_array(day, keys, purpose_key, i) * (high - low + 1)).astype(np.int64) + low
+            for i, (low, high) in enumerate(ranges)
+        ]
+        return np.stack(columns, axis=1).tolist()
+
+    def pair_randints(self, day: int, entities: List[str], purpose: str, low: int, high: int) -> List[List[int]]:
+        """randint(low, high) of every ordered pair's stream: result[i][j] for (entities[i], entities[j])"""
+        purpose_key = self._purpose_key(purpose)
+        keys = [self.entity_key(entity) for entity in entities]
+        span = high - low + 1
+        if np is None:
+            return [[low + int(RandomStream(self._base(day, pair_key(first, second), purpose_key)).at(0) * span)
+                     for second in keys] for first in keys]
+        keys = np.array(keys, dtype=np.uint64)
+        pairs = _mix_array(keys)[:, None] ^ keys[None, :]
+        draws = self._uniform_array(day, pairs, purpose_key, 0)
+        return (np.floor(draws * span).astype(np.int64) + low).tolist()
+
+    def _key_array(self, entities: List[str]):
+        return np.fromiter((self.entity_key(entity) for entity in entities), dtype=np.uint64, count=len(entities))
+
+    def _uniform_array(self, day: int, keys, purpose_key: int, counter: int):
+        base = _mix_array(keys ^ np.uint64(self._day_key(day) ^ purpose_key))
+        return (_mix_array(base + np.uint64(counter)) >> np.uint64(11)).astype(np.float64) * UNIT
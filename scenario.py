@@ -0,0 +1,335 @@
+# 📁 scenario.py - External scenario loader
+# 🎯 Core function: Stream NPC/location rosters (CSV/JSONL) and rules (JSON/TOML) into the simulator
+# 🔗 Key dependencies: csv, json, struct, array, tomllib (Python 3.11+, optional), models
+# 💡 Usage: CONFIG["scenario"] = "scenarios/medieval/scenario.toml" or load_scenario(simulator, path)
+
+import csv
+import gc
+import itertools
+import json
+import os
+import struct
+import time
+from array import array
+from typing import Dict, Iterator, List, Optional, Tuple
+
+from models import NPC, Location, INITIAL_RANGES
+
+try:
+    import tomllib
+except ImportError:
+    tomllib = None
+
+
+RELATIONSHIP_MODES = ("all", "location", "none")
+
+LOCATION_FIELDS = ("name", "type", "description")
+NPC_FIELDS = ("id", "name", "role", "location")
+NPC_STAT_FIELDS = tuple(field for field, _, _ in INITIAL_RANGES)  # Optional; missing values are drawn
+
+RULE_KEYS = ("name", "description", "locations", "npcs", "location_events", "role_actions", "relationships")
+
+# Compiled roster cache: magic, JSON header, then chunks of NPC records
+CACHE_MAGIC = b"LLMSIMSC"
+CACHE_VERSION = 1
+CACHE_CHUNK = 65536
+NO_STAT = 255  # Cached stat value meaning "draw randomly"
+
+
+class ScenarioError(ValueError):
+    """Scenario file failed validation"""
+
+    def __init__(self, path: str, message: str, line: Optional[int] = None):
+        where = f"{path}:{line}" if line else path
+        super().__init__(f"{where}: {message}")
+        self.path = path
+        self.line = line
+
+
+def load_rules(path: str) -> Dict:
+    """Read and validate a JSON or TOML rules file"""
+    if path.endswith(".toml"):
+        if tomllib is None:
+            raise ScenarioError(path, "TOML rules need Python 3.11+ (tomllib); use JSON instead")
+        with open(path, "rb") as f:
+            rules = tomllib.load(f)
+    else:
+        with open(path, "r", encoding="utf-8") as f:
+            rules = json.load(f)
+
+    if not isinstance(rules, dict):
+        raise ScenarioError(path, "rules must be an object")
+    unknown = set(rules) - set(RULE_KEYS)
+    if unknown:
+        raise ScenarioError(path, f"unknown keys: {', '.join(sorted(unknown))}")
+    for key in ("locations", "npcs"):
+        if not isinstance(rules.get(key), str):
+            raise ScenarioError(path, f"'{key}' must be a roster file path")
+
+    events = rules.setdefault("location_events", {})
+    if not isinstance(events, dict) or not all(
+        isinstance(names, list) and all(isinstance(name, str) for name in names)
+        for names in events.values()
+    ):
+        raise ScenarioError(path, "'location_events' must map location names to lists of strings")
+    actions = rules.setdefault("role_actions", {})
+    if not isinstance(actions, dict) or not all(isinstance(text, str) for text in actions.values()):
+        raise ScenarioError(path, "'role_actions' must map roles to strings")
+    # Absent: keep the simulator's relationship_init (CONFIG)
+    if rules.setdefault("relationships", None) not in RELATIONSHIP_MODES + (None,):
+        raise ScenarioError(path, f"'relationships' must be one of {', '.join(RELATIONSHIP_MODES)}")
+
+    base = os.path.dirname(os.path.abspath(path))
+    for key in ("locations", "npcs"):
+        rules[key] = os.path.join(base, rules[key])
+    return rules
+
+
+def iter_rows(path: str) -> Iterator[Tuple[int, Dict]]:
+    """Stream (line number, row) from a CSV (with header) or JSONL file"""
+    with open(path, "r", encoding="utf-8", newline="") as f:
+        if path.endswith(".jsonl"):
+            for line_no, line in enumerate(f, 1):
+                if not line.strip():
+                    continue
+                try:
+                    row = json.loads(line)
+                except json.JSONDecodeError as e:
+                    raise ScenarioError(path, f"invalid JSON: {e}", line_no)
+                if not isinstance(row, dict):
+                    raise ScenarioError(path, "row must be an object", line_no)
+                yield line_no, row
+        else:
+            reader = csv.DictReader(f)
+            for row in reader:
+                yield reader.line_num, row
+
+
+def _text(path: str, line_no: int, row: Dict, field: str) -> str:
+    """Required single-line text field"""
+    value = row.get(field)
+    value = "" if value is None else str(value).strip()
+    if not value:
+        raise ScenarioError(path, f"missing '{field}'", line_no)
+    if "\t" in value or "\n" in value:
+        raise ScenarioError(path, f"'{field}' must not contain tabs or newlines", line_no)
+    return value
+
+
+def _stat(path: str, line_no: int, row: Dict, field: str) -> int:
+    """Optional stat column (0..100, age 0..254); NO_STAT when absent"""
+    value = row.get(field)
+    if value is None or value == "":
+        return NO_STAT
+    try:
+        number = int(value)
+    except (TypeError, ValueError):
+        raise ScenarioError(path, f"'{field}' must be an integer", line_no)
+    if not 0 <= number <= (NO_STAT - 1 if field == "age" else 100):
+        raise ScenarioError(path, f"'{field}' out of range: {number}", line_no)
+    return number
+
+
+def read_locations(path: str) -> List[Tuple[str, str, str]]:
+    """Validated (name, type, description) rows"""
+    locations = []
+    seen = set()
+    for line_no, row in iter_rows(path):
+        name, location_type, description = (_text(path, line_no, row, field) for field in LOCATION_FIELDS)
+        if name in seen:
+            raise ScenarioError(path, f"duplicate location '{name}'", line_no)
+        seen.add(name)
+        locations.append((name, location_type, description))
+    if not locations:
+        raise ScenarioError(path, "no locations")
+    return locations
+
+
+def iter_npc_records(path: str, location_index: Dict[str, int]) -> Iterator[Tuple]:
+    """Stream validated NPC records: (id, name, role, location index, stats)"""
+    seen = set()
+    for line_no, row in iter_rows(path):
+        npc_id, name, role, location = (_text(path, line_no, row, field) for field in NPC_FIELDS)
+        if npc_id in seen:
+            raise ScenarioError(path, f"duplicate NPC id '{npc_id}'", line_no)
+        seen.add(npc_id)
+        index = location_index.get(location)
+        if index is None:
+            raise ScenarioError(path, f"unknown location '{location}'", line_no)
+        stats = tuple(_stat(path, line_no, row, field) for field in NPC_STAT_FIELDS)
+        yield npc_id, name, role, index, stats
+
+
+def _source_signature(paths: List[str]) -> Dict[str, List[int]]:
+    """Size and mtime of every source file (cache key)"""
+    signature = {}
+    for path in paths:
+        info = os.stat(path)
+        signature[os.path.abspath(path)] = [info.st_size, info.st_mtime_ns]
+    return signature
+
+
+def _read_cache(cache_path: str, signature: Dict) -> Optional[Tuple[Dict, Iterator[Tuple]]]:
+    """Open a compiled roster if it matches the sources: (header, record iterator)"""
+    try:
+        f = open(cache_path, "rb")
+    except OSError:
+        return None
+    try:
+        if f.read(len(CACHE_MAGIC)) != CACHE_MAGIC:
+            f.close()
+            return None
+        (header_size,) = struct.unpack("<I", f.read(4))
+        header = json.loads(f.read(header_size).decode("utf-8"))
+    except (struct.error, ValueError):
+        f.close()
+        return None
+    if header.get("version") != CACHE_VERSION or header.get("sources") != signature:
+        f.close()
+        return None
+    return header, _iter_cache_records(f)
+
+
+def _iter_cache_records(f) -> Iterator[Tuple]:
+    """Decode cache chunks one at a time (bounded memory)"""
+    stat_count = len(NPC_STAT_FIELDS)
+    with f:
+        while True:
+            chunk_header = f.read(8)
+            if len(chunk_header) < 8:
+                return
+            count, text_size = struct.unpack("<II", chunk_header)
+            texts = f.read(text_size).decode("utf-8").split("\n")
+            locations = array("H")
+            locations.frombytes(f.read(count * locations.itemsize))
+            stats = f.read(count * stat_count)
+            for i in range(count):
+                npc_id, name, role = texts[i].split("\t")
+                yield npc_id, name, role, locations[i], tuple(stats[i * stat_count:(i + 1) * stat_count])
+
+
+class CacheWriter:
+    """Writes validated NPC records to a compiled roster as they stream past"""
+
+    def __init__(self, cache_path: str, header: Dict):
+        self.cache_path = cache_path
+        self.tmp_path = f"{cache_path}.tmp"
+        self._file = open(self.tmp_path, "wb")
+        header_bytes = json.dumps(header).encode("utf-8")
+        self._file.write(CACHE_MAGIC + struct.pack("<I", len(header_bytes)) + header_bytes)
+        self._reset()
+
+    def _reset(self):
+        self._texts = []
+        self._locations = array("H")
+        self._stats = bytearray()
+
+    def add(self, record: Tuple):
+        npc_id, name, role, location, stats = record
+        self._texts.append(f"{npc_id}\t{name}\t{role}")
+        self._locations.append(location)
+        self._stats.extend(stats)
+        if len(self._texts) >= CACHE_CHUNK:
+            self._flush_chunk()
+
+    def _flush_chunk(self):
+        if not self._texts:
+            return
+        text_bytes = "\n".join(self._texts).encode("utf-8")
+        self._file.write(struct.pack("<II", len(self._texts), len(text_bytes)))
+        self._file.write(text_bytes)
+        self._file.write(self._locations.tobytes())
+        self._file.write(bytes(self._stats))
+        self._reset()
+
+    def commit(self):
+        """Finish the file and move it into place"""
+        self._flush_chunk()
+        self._file.close()
+        os.replace(self.tmp_path, self.cache_path)
+
+    def abort(self):
+        self._file.close()
+        if os.path.exists(self.tmp_path):
+            os.remove(self.tmp_path)
+
+
+def load_scenario(simulator, path: str, use_cache: bool = True) -> Dict:
+    """Populate an empty simulator from a scenario rules file.
+
+    NPC rows are validated and turned into NPC objects one at a time; the
+    first load also writes a compiled roster (<rules>.cache) that later loads
+    read instead of the CSV/JSONL sources while they are unchanged."""
+    started = time.perf_counter()
+    rules = load_rules(path)
+    signature = _source_signature([path, rules["locations"], rules["npcs"]])
+    cache_path = f"{path}.cache"
+
+    cached = _read_cache(cache_path, signature) if use_cache else None
+    writer = None
+    if cached:
+        header, records = cached
+        location_rows = [tuple(row) for row in header["locations"]]
+    else:
+        location_rows = read_locations(rules["locations"])
+        location_index = {name: i for i, (name, _, _) in enumerate(location_rows)}
+        records = iter_npc_records(rules["npcs"], location_index)
+        if use_cache:
+            writer = CacheWriter(cache_path, {
+                "version": CACHE_VERSION,
+                "sources": signature,
+                "locations": location_rows
+            })
+
+    for name, location_type, description in location_rows:
+        simulator.locations[name] = Location(name, location_type, description)
+    location_list = [simulator.locations[name] for name, _, _ in location_rows]
+
+    npcs = simulator.npcs
+    streams = simulator.streams
+    ranges = [(low, high) for _, low, high in INITIAL_RANGES]
+    records = iter(records)
+    gc_was_enabled = gc.isenabled()
+    gc.disable()  # Millions of new container objects would trigger repeated full collections
+    try:
+        while True:
+            batch = list(itertools.islice(records, CACHE_CHUNK))
+            if not batch:
+                break
+            # Missing stats of the whole batch in one vectorized draw (the values NPC() would draw)
+            drawn = iter(streams.randint_rows(
+                0, [record[0] for record in batch if NO_STAT in record[4]], "init", ranges
+            ))
+            for record in batch:
+                npc_id, name, role, location_index, stats = record
+                location = location_list[location_index]
+                if NO_STAT in stats:
+                    initial = [
+                        drawn_value if value == NO_STAT else value
+                        for value, drawn_value in zip(stats, next(drawn))
+                    ]
+                else:
+                    initial = stats
+                npcs[npc_id] = NPC(npc_id, name, role, location.name, initial=initial)
+                location.npc_ids.append(npc_id)  # Ids are unique (validated), skip add_npc's scan
+                if writer:
+                    writer.add(record)
+    except BaseException:
+        if writer:
+            writer.abort()
+        raise
+    finally:
+        if gc_was_enabled:
+            gc.enable()
+    if writer:
+        writer.commit()
+
+    simulator.location_events = rules["location_events"] or simulator.location_events
+    simulator.role_actions = rules["role_actions"] or simulator.role_actions
+    if rules["relationships"]:
+        simulator.relationship_init = rules["relationships"]
+
+    source = "compiled cache" if cached else "source files"
+    print(f"📦 Scenario '{rules.get('name', os.path.basename(path))}': {len(npcs)} NPCs in "
+          f"{len(location_rows)} locations from {source} ({time.perf_counter() - started:.2f}s)")
+    return rules
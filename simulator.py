@@ -1,40 +1,89 @@
 # 📁 simulator.py - Core world simulator logic
 # 🎯 Core function: Manages simulation, NPCs, events and time
-# 🔗 Key dependencies: models, llm_clients, config, json, random
+# 🔗 Key dependencies: models, llm_clients, config, rng_streams
 # 💡 Usage: Central class, used in main.py
 
-import json
-import random
+import os
 import asyncio
 from typing import Dict, List, Optional
 
-from models import NPC, Location
+from models import NPC, Location, STAT_NAMES
 from llm_clients import LLMManager
+from metrics import SimulationMetrics, null_phase
+from neighbor_index import NeighborIndex
+from relationship_index import RelationshipIndex
+from state_writer import WorldStateWriter
+from timeseries import TimeSeriesRecorder, numpy_available
+from status_server import StatusServer
+from prefetch import DecisionPrefetcher
+from decision_queue import DecisionQueue
+from event_engine import EventDrivenEngine
+from memory import EpisodicMemory, ACTION_IMPORTANCE, EVENT_IMPORTANCE
+from scenario import load_scenario
+from rng_streams import RandomStreams
+from world_fork import fork_mapping
 from config import CONFIG
 
 
 class WorldSimulator:
     """Main world simulation class"""
     
-    def __init__(self):
+    def __init__(self, seed: Optional[int] = None, output_dir: str = ""):
         print("🌍 Initializing world...")
+        self.streams = RandomStreams(seed)  # Counter-based draws keyed by (day, entity, purpose)
+        self.output_dir = output_dir  # Directory for all output files ("" = current directory)
+        if output_dir:
+            os.makedirs(output_dir, exist_ok=True)
         self.current_day = 0
         self.npcs: Dict[str, NPC] = {}
         self.locations: Dict[str, Location] = {}
         self.daily_logs: List[Dict] = []
         self.llm_manager = None
         self.world_initialized = False
+        self.location_events: Dict[str, List[str]] = CONFIG["location_events"]
+        self.role_actions: Dict[str, str] = CONFIG["role_actions"]
+        self.relationship_init = CONFIG.get("relationship_init", "all")
+        self.llm_decision_chance: float = CONFIG["llm_decision_chance"]
+        self.random_event_chance: float = CONFIG["random_event_chance"]
+        self.metrics = SimulationMetrics.from_config(CONFIG.get("metrics"), output_dir)
+        self.neighbor_index: Optional[NeighborIndex] = None
+        self.relationship_index: Optional[RelationshipIndex] = None
+        self.state_writer = WorldStateWriter(self._output_path(CONFIG["state_path"]), CONFIG["background_save"])
+        self.timeseries: Optional[TimeSeriesRecorder] = None
+        self.status_server: Optional[StatusServer] = None
+        self.serve_status = True  # Forked branches do not start their own status server
+        self._indexes_stale = False  # Set on forks: indexes are rebuilt when the branch runs
+        self._branch_count = 0  # Forks made without an explicit output directory
+        self.prefetcher: Optional[DecisionPrefetcher] = None
+        if CONFIG.get("prefetch", {}).get("enabled"):
+            self.prefetcher = DecisionPrefetcher(CONFIG["prefetch"].get("stat_tolerance", 15))
+        self.decision_queue = DecisionQueue.from_config(CONFIG.get("decision_queue"))
+        if self.decision_queue and self.prefetcher:
+            print("⚠️ Prefetch disabled: the decision queue already overlaps LLM requests with later days")
+            self.prefetcher = None
+        self.memory = EpisodicMemory.from_config(CONFIG.get("memory"))
+        self._last_npc_state: Dict[str, tuple] = {}
         
+    def _output_path(self, name: str) -> str:
+        """Path of an output file inside this world's output directory"""
+        return os.path.join(self.output_dir, name)
+
     async def initialize_llm(self):
         """Initialize LLM clients"""
         self.llm_manager = LLMManager(
             CONFIG["ollama_model"],
-            CONFIG["deepseek_api_key"]
+            CONFIG["deepseek_api_key"],
+            metrics=self.metrics,
+            concurrency=CONFIG.get("llm_concurrency"),
+            prompt_cache=CONFIG.get("prompt_cache"),
+            local_policy=CONFIG.get("local_policy")
         )
         await self.llm_manager.initialize()
     
     async def initialize_world_with_random_names(self):
         """Initialize world with LLM-generated names or fallback to config"""
+        if not self.world_initialized and CONFIG.get("scenario"):
+            self.load_scenario(CONFIG["scenario"])
         if not self.world_initialized:
             print("🎲 Attempting to generate random names...")
             
@@ -84,7 +133,7 @@ class WorldSimulator:
                 # Map location to existing locations
                 target_location = self._map_location_name(npc_data["location"], location_names)
                 
-                npc = NPC(npc_id, name, role, target_location)
+                npc = NPC(npc_id, name, role, target_location, self.streams.stream(0, npc_id, "init"))
                 self.npcs[npc_id] = npc
                 self.locations[target_location].add_npc(npc_id)
         else:
@@ -93,7 +142,7 @@ class WorldSimulator:
                 # Map location to existing locations
                 target_location = self._map_location_name(location, location_names)
                 
-                npc = NPC(npc_id, name, role, target_location)
+                npc = NPC(npc_id, name, role, target_location, self.streams.stream(0, npc_id, "init"))
                 self.npcs[npc_id] = npc
                 self.locations[target_location].add_npc(npc_id)
 
@@ -102,6 +151,13 @@ class WorldSimulator:
         
         print(f"✅ Created {len(self.npcs)} NPCs in {len(self.locations)} locations")
     
+    def load_scenario(self, path: str):
+        """Initialize the world from scenario files instead of config/LLM names"""
+        load_scenario(self, path, CONFIG.get("scenario_cache", True))
+        self._init_relationships()
+        self.world_initialized = True
+        print(f"✅ Created {len(self.npcs)} NPCs in {len(self.locations)} locations")
+
     def _map_location_name(self, original_location: str, available_locations: List[str]) -> str:
         """Map location name to existing location"""
         # Try exact match first
@@ -131,7 +187,7 @@ class WorldSimulator:
 
         # Create NPCs
         for npc_id, name, role, location in CONFIG["npc_data"]:
-            npc = NPC(npc_id, name, role, location)
+            npc = NPC(npc_id, name, role, location, self.streams.stream(0, npc_id, "init"))
             self.npcs[npc_id] = npc
             self.locations[location].add_npc(npc_id)
 
@@ -141,14 +197,70 @@ class WorldSimulator:
         print(f"✅ Created {len(self.npcs)} NPCs in {len(self.locations)} locations")
 
     def _init_relationships(self):
-        """Initialize relationships between NPCs"""
-        npc_list = list(self.npcs.keys())
-        for npc_id in npc_list:
-            for other_id in npc_list:
-                if npc_id != other_id:
-                    # Base relations with slight randomness
-                    base_relation = random.randint(-30, 50)
-                    self.npcs[npc_id].relationships[other_id] = base_relation
+        """Initialize relationships between NPCs.
+
+        relationship_init: "all" (every pair), "location" (pairs sharing a
+        location) or "none" (all start neutral; all pairs are infeasible at
+        very large populations)."""
+        if self.relationship_init == "all":
+            groups = [list(self.npcs.keys())]
+        elif self.relationship_init == "location":
+            groups = [location.npc_ids for location in self.locations.values()]
+        else:
+            groups = []
+        for npc_list in groups:
+            # Base relations with slight randomness, one stream per ordered pair
+            base_relations = self.streams.pair_randints(0, npc_list, "relationship", -30, 50)
+            for npc_id, row in zip(npc_list, base_relations):
+                relationships = self.npcs[npc_id].relationships
+                for other_id, base_relation in zip(npc_list, row):
+                    if npc_id != other_id:
+                        relationships[other_id] = base_relation
+        
+        self._build_indexes()
+
+    def _build_indexes(self):
+        """(Re)build relationship indexes and attach them as NPC observers"""
+        self._indexes_stale = False
+        self.neighbor_index = NeighborIndex(self.npcs, self.locations, CONFIG["neighbor_top_k"])
+        thresholds = CONFIG.get("relationship_thresholds", {})
+        self.relationship_index = RelationshipIndex(
+            self.npcs, self.locations,
+            friend_threshold=thresholds.get("friend", 50),
+            enemy_threshold=thresholds.get("enemy", -30)
+        )
+        self._attach_observers()
+
+    def _attach_observers(self):
+        """Point every NPC at the active relationship observers"""
+        observers = tuple(
+            component.on_relationship_change
+            for component in (self.neighbor_index, self.relationship_index, self.timeseries)
+            if component is not None
+        )
+        for npc in self.npcs.values():
+            npc.observers = observers
+
+    def _start_timeseries(self, first_day: int, last_day: int):
+        """Create the columnar recorder if enabled in config (once per world),
+        or make room for this run's days in the existing one"""
+        if self.timeseries:
+            self.timeseries.reserve(last_day)
+            return
+        settings = CONFIG.get("timeseries", {})
+        if not settings.get("enabled"):
+            return
+        if not numpy_available():
+            print("⚠️ Time-series export disabled (numpy unavailable)")
+            return
+        self.timeseries = TimeSeriesRecorder(
+            self._output_path(settings.get("directory", "timeseries")),
+            list(self.npcs.keys()),
+            list(self.locations.keys()),
+            capacity=last_day - first_day + 1,
+            first_day=first_day
+        )
+        self._attach_observers()
 
     async def run_simulation(self):
         """Main simulation loop"""
@@ -156,24 +268,16 @@ class WorldSimulator:
         if not self.world_initialized:
             await self.initialize_world_with_random_names()
         
+        if CONFIG.get("engine") == "events":
+            await self.run_event_driven(CONFIG["max_days"])
+            return
+        
         print(f"\n🚀 Starting simulation for {CONFIG['max_days']} days\n")
         
-        for day in range(1, CONFIG["max_days"] + 1):
-            self.current_day = day
-            print(f"📅 Day {day}")
-            
-            # Clear daily data
-            self._clear_daily_data()
-
-            # Main day loop
-            self._update_aging()
-            self._rule_based_decisions()
-            await self._llm_decisions()
-            self._random_events()
-            
-            # Logging and saving
-            self._log_day()
-            self._save_world_state()
+        # Files are one consumer of the day stream
+        async for _ in self.iter_days(CONFIG["max_days"]):
+            with self._phase("save_world_state"):
+                self._save_world_state()
             
             # Pause for observation
             await asyncio.sleep(0.1)
@@ -182,6 +286,213 @@ class WorldSimulator:
         await self._generate_final_chronicle()
         print(f"\n🎉 Simulation finished! Check world_state.json and chronicles.md")
 
+    def _phase(self, name: str):
+        """Metrics phase timer (no-op when metrics are off)"""
+        return self.metrics.phase(name) if self.metrics else null_phase(name)
+
+    async def iter_days(self, days: Optional[int] = None):
+        """Run the daily engine for `days` more days, yielding one compact result per day:
+        {"day", "status", "changed" (new values of changed stats), "deaths", "events"}.
+
+        The next day starts only when the consumer asks for it, so a slow
+        consumer pauses the simulation instead of buffering days. Run
+        cleanup happens when the stream is exhausted or closed (aclose())."""
+        if not self.world_initialized:
+            await self.initialize_world_with_random_names()
+        days = days or CONFIG["max_days"]
+        first_day = self.current_day + 1
+        last_day = self.current_day + days
+        metrics = self.metrics
+        phase = self._phase
+        self._start_timeseries(first_day, last_day)
+        await self._start_status_server()
+        if not self._last_npc_state:
+            self._collect_day_diff()  # Baseline for the first day's changes
+        
+        open_day = None  # Day whose metrics are not written yet
+        try:
+            for day in range(first_day, last_day + 1):
+                self.current_day = day
+                open_day = day
+                if self._indexes_stale:
+                    self._build_indexes()
+                print(f"📅 Day {day}")
+                if metrics:
+                    metrics.start_day(day)
+                if self.timeseries:
+                    self.timeseries.begin_day(day)
+                
+                # Clear daily data
+                with phase("clear_daily_data"):
+                    self._clear_daily_data()
+
+                # Main day loop
+                with phase("update_aging"):
+                    self._update_aging()
+                with phase("rule_based_decisions"):
+                    self._rule_based_decisions()
+                with phase("llm_decisions"):
+                    await self._llm_decisions()
+                if self.prefetcher and day < last_day:
+                    with phase("prefetch"):
+                        self._start_prefetch()
+                with phase("random_events"):
+                    self._random_events()
+                if self.memory:
+                    with phase("record_memories"):
+                        self._record_memories(self.npcs.values(), self.locations.values())
+                
+                # Logging
+                with phase("log_day"):
+                    self._log_day()
+                if self.timeseries:
+                    with phase("record_timeseries"):
+                        self.timeseries.record_day(day, self.npcs)
+                with phase("collect_day_diff"):
+                    day_result = self._collect_day_diff()
+                if self.status_server:
+                    self.status_server.publish(day_result)
+                
+                yield day_result
+                
+                # Consumer phases (e.g. saving) count towards the day they handled
+                if metrics:
+                    metrics.end_day(day)
+                open_day = None
+        finally:
+            if metrics:
+                if open_day is not None:
+                    metrics.end_day(open_day)  # Consumer stopped mid-day
+                metrics.close()
+            if self.prefetcher:
+                self.prefetcher.discard_unused()
+            if self.decision_queue:
+                self._close_decision_queue()
+            self._report_prompt_stats()
+            if self.timeseries:
+                self.timeseries.close()
+            if self.status_server:
+                await self.status_server.stop()
+            self.state_writer.close()
+
+    def fork(self, seed: Optional[int] = None, output_dir: Optional[str] = None, llm_manager=None,
+             **settings) -> "WorldSimulator":
+        """Branch this world at the current day in O(1).
+
+        NPCs, locations and memories are shared copy-on-write: each world
+        copies an entry when it first touches it, and an NPC's relationship
+        dict only when it first changes. The branch rebuilds its indexes when
+        it starts running. Without a seed it keeps this world's seed and so
+        draws exactly what this world would. settings override per-world
+        values such as llm_decision_chance, random_event_chance,
+        location_events or role_actions. llm_manager is not shared (clients
+        are bound to one event loop); without one the branch decides by rules
+        only. Without output_dir the branch writes to branch_<n> inside this
+        world's output directory; it may never share this world's files."""
+        if output_dir is None:
+            self._branch_count += 1
+            output_dir = os.path.join(self.output_dir, f"branch_{self._branch_count}")
+        elif os.path.abspath(output_dir) == os.path.abspath(self.output_dir):
+            raise ValueError(f"fork output_dir {output_dir!r} is this world's own output directory")
+        branch = WorldSimulator(seed=seed, output_dir=output_dir)
+        # Entity keys do not depend on the seed: share the parent's cache
+        branch.streams = RandomStreams(self.streams.seed if seed is None else seed, self.streams.entity_keys)
+        branch.current_day = self.current_day
+        branch.world_initialized = self.world_initialized
+        branch.location_events = self.location_events
+        branch.role_actions = self.role_actions
+        branch.relationship_init = self.relationship_init
+        branch.llm_decision_chance = self.llm_decision_chance
+        branch.random_event_chance = self.random_event_chance
+        branch.daily_logs = list(self.daily_logs)
+        branch.llm_manager = llm_manager
+        branch.serve_status = False
+        for name, value in settings.items():
+            if not hasattr(branch, name):
+                raise AttributeError(f"Unknown world setting: {name}")
+            setattr(branch, name, value)
+
+        self.npcs, branch.npcs = fork_mapping(self.npcs, NPC.fork_copy)
+        self.locations, branch.locations = fork_mapping(self.locations, Location.fork_copy)
+        self._last_npc_state, branch._last_npc_state = fork_mapping(self._last_npc_state, tuple)
+        if self.memory:
+            branch.memory = self.memory.fork()
+        for index in (self.neighbor_index, self.relationship_index):
+            if index:  # Same contents, now read through this world's copy-on-write view
+                index.npcs = self.npcs
+                index.locations = self.locations
+        branch._indexes_stale = self.neighbor_index is not None
+        print(f"🌿 Forked world at day {self.current_day} -> {output_dir}")
+        return branch
+
+    async def run_event_driven(self, days: Optional[int] = None):
+        """Run with the discrete-event engine instead of the daily sweep"""
+        if not self.world_initialized:
+            await self.initialize_world_with_random_names()
+        
+        days = days or CONFIG["max_days"]
+        if self._indexes_stale:
+            self._build_indexes()
+        settings = CONFIG.get("event_engine", {})
+        engine = EventDrivenEngine(
+            self,
+            resolution=settings.get("resolution", 1.0),
+            max_gap=settings.get("max_gap", 30.0),
+            save_every=settings.get("save_every", 0)
+        )
+        print(f"\n🚀 Starting event-driven simulation for {days} days\n")
+        await engine.run(days)
+        
+        self._report_prompt_stats()
+        self._save_world_state()
+        self.state_writer.close()
+        await self._generate_final_chronicle()
+        print(f"\n🎉 Simulation finished! Check world_state.json and chronicles.md")
+
+    async def _start_status_server(self):
+        """Start the live status server if enabled in config"""
+        settings = CONFIG.get("status_server", {})
+        if not settings.get("enabled") or self.status_server or not self.serve_status:
+            return
+        server = StatusServer(self, settings.get("host", "127.0.0.1"), settings.get("port", 8765))
+        await server.start()
+        self.status_server = server
+
+    def _collect_day_diff(self) -> Dict:
+        """Changes since the previous call: stats, deaths and today's events"""
+        changed = {}
+        deaths = []
+        for npc_id, npc in self.npcs.items():
+            current = (npc.health, npc.energy, npc.hunger, npc.mood, npc.alive)
+            previous = self._last_npc_state.get(npc_id)
+            if current == previous:
+                continue
+            self._last_npc_state[npc_id] = current
+            if previous is None:
+                changed[npc_id] = dict(zip(STAT_NAMES, current))
+                continue
+            stats = {
+                name: value
+                for name, value, old in zip(STAT_NAMES, current, previous)
+                if value != old
+            }
+            if stats:
+                changed[npc_id] = stats
+            if previous[4] and not npc.alive:
+                deaths.append(npc_id)
+
+        return {
+            "day": self.current_day,
+            "status": self.get_world_status(),
+            "changed": changed,
+            "deaths": deaths,
+            "events": {
+                name: list(loc.events_today)
+                for name, loc in self.locations.items()
+                if loc.events_today
+            }
+        }
+
     def _clear_daily_data(self):
         """Clear daily data"""
         for npc in self.npcs.values():
@@ -191,117 +502,293 @@ class WorldSimulator:
 
     def _update_aging(self):
         """Update age and health of NPCs"""
-        dead_npcs = []
+        alive = [npc for npc in self.npcs.values() if npc.alive]
+        day = self.current_day
+        # Natural energy and hunger drift: draws 0 and 1 of each NPC's "drift" stream, in one vectorized pass
+        drift = self.streams.randint_rows(day, [npc.id for npc in alive], "drift", [(10, 25), (15, 30)])
+        declining = []
         
-        for npc in self.npcs.values():
-            if not npc.alive:
-                continue
-                
+        for npc, (energy_loss, hunger_gain) in zip(alive, drift):
             # Aging (very slow for demo)
             npc.age += 0.1
             
-            # Natural energy and hunger reduction
-            energy_loss = random.randint(10, 25)
-            hunger_gain = random.randint(15, 30)
             npc.update_stat("energy", -energy_loss)
             npc.update_stat("hunger", hunger_gain)
+            if npc.age > 65 or npc.mood <= 40:
+                declining.append(npc)
+        
+        # Health decline takes the next draws (2, 3) of the same streams, drawn only for these NPCs
+        health_draws = self.streams.uniform_rows(day, [npc.id for npc in declining], "drift", 2, start=2)
+        for npc, draws in zip(declining, health_draws):
+            draw = iter(draws)
             
             # Age effect on health
             if npc.age > 65:
-                health_loss = random.randint(1, 5)
+                health_loss = 1 + int(next(draw) * 5)  # randint(1, 5)
                 print(f"  👴 Aging: {npc.name} loses health due to age")
                 npc.update_stat("health", -health_loss)
             
-            if npc.stats["mood"] <= 40:
-                health_loss = random.randint(1, int((100 - npc.stats["mood"]) / 10))
+            if npc.mood <= 40:
+                health_loss = 1 + int(next(draw) * int((100 - npc.mood) / 10))  # randint(1, (100 - mood) / 10)
                 print(f"  😔 {npc.name} loses health due to low mood")
                 npc.update_stat("health", -health_loss)
-                
-            # Death from disease/old age
-            if npc.stats["health"] <= 0:
-                npc.alive = False
-                npc.add_action(f"💀 {npc.name} died")
-                dead_npcs.append(npc.name)
-                print(f"💀 DEATH: {npc.name} died at age {npc.age:.1f}")
+        
+        # Death from disease/old age, or from health lost earlier (e.g. an attack)
+        dead_npcs = [npc for npc in alive if npc.health <= 0]
                 
         # Remove dead NPCs from locations
-        for npc_name in dead_npcs:
-            dead_npc = next(npc for npc in self.npcs.values() if npc.name == npc_name)
-            self.locations[dead_npc.location].remove_npc(dead_npc.id)
+        for dead_npc in dead_npcs:
+            self._handle_death(dead_npc)
+
+    def _handle_death(self, npc: NPC):
+        """Mark an NPC dead and remove it from its location and indexes"""
+        npc.alive = False
+        npc.add_action("died")
+        print(f"💀 DEATH: {npc.name} died at age {npc.age:.1f}")
+        self.locations[npc.location].remove_npc(npc.id)
+        if self.neighbor_index:
+            self.neighbor_index.on_death(npc.id)
+        if self.relationship_index:
+            self.relationship_index.on_death(npc.id)
+        if self.memory:
+            self.memory.forget(npc.id)
 
     def _rule_based_decisions(self):
         """Rule-based decisions for NPCs (food, sleep, work)"""
         for npc in self.npcs.values():
             if not npc.alive:
                 continue
+            self._apply_basic_needs(npc)
 
-            # Food - priority №1
-            if npc.stats["hunger"] > 70:
-                print(f"  🍞 Basic: {npc.name} eats (hunger: {npc.stats['hunger']})")
-                npc.update_stat("hunger", -40)
-                npc.update_stat("energy", 15)
-                npc.update_stat("mood", 10)
-                npc.add_action(f"🍞 {npc.name} ate")
-
-            # Sleep/rest - if low energy
-            elif npc.stats["energy"] < 30:
-                print(f"  😴 Basic: {npc.name} rests (energy: {npc.stats['energy']})")
-                npc.update_stat("energy", 50)
-                npc.update_stat("mood", 15)
-                npc.add_action(f"😴 {npc.name} rested")
-
-            # Work based on role - if energy is high
-            elif npc.stats["energy"] > 60 and random.random() < 0.6:
-                action = CONFIG["role_actions"].get(npc.role, "worked")
-                print(f"  🔨 Basic: {npc.name} works ({npc.role})")
-                npc.add_action(f"{npc.name} {action}")
-                npc.update_stat("energy", -15)
-                npc.update_stat("mood", 5)
+    def _apply_basic_needs(self, npc: NPC, work_roll: Optional[float] = None) -> bool:
+        """One day's basic decision for an NPC; returns whether it acted.
+        work_roll is an optional pre-drawn roll for the work chance."""
+        # Food - priority №1
+        if npc.hunger > 70:
+            print(f"  🍞 Basic: {npc.name} eats (hunger: {npc.hunger})")
+            npc.update_stat("hunger", -40)
+            npc.update_stat("energy", 15)
+            npc.update_stat("mood", 10)
+            npc.add_action("ate")
+
+        # Sleep/rest - if low energy
+        elif npc.energy < 30:
+            print(f"  😴 Basic: {npc.name} rests (energy: {npc.energy})")
+            npc.update_stat("energy", 50)
+            npc.update_stat("mood", 15)
+            npc.add_action("rested")
+
+        # Work based on role - if energy is high
+        elif npc.energy > 60 and (work_roll if work_roll is not None
+                                  else self.streams.stream(self.current_day, npc.id, "work").random()) < 0.6:
+            action = self.role_actions.get(npc.role, "worked")
+            print(f"  🔨 Basic: {npc.name} works ({npc.role})")
+            npc.add_action("work", reason=action)
+            npc.update_stat("energy", -15)
+            npc.update_stat("mood", 5)
+
+        else:
+            return False
+        return True
 
     async def _llm_decisions(self):
         """LLM-powered decisions for social interactions"""
-        if not self.llm_manager:
+        if not self.llm_manager or not self.neighbor_index:
+            return
+        if self.decision_queue:
+            await self._queued_llm_decisions()
             return
 
-        llm_active_npcs = []
+        # In pipelined mode today's candidates were drawn (and prefetched) yesterday
+        prefetched = self.prefetcher and self.prefetcher.has_day(self.current_day)
+        if prefetched:
+            candidates = [self.npcs[npc_id] for npc_id in self.prefetcher.candidates]
+        else:
+            candidates = self._draw_llm_candidates()
         
-        for npc in self.npcs.values():
-            if not npc.alive or random.random() > CONFIG["llm_decision_chance"]:
-                continue
+        # Need at least one other alive NPC in the same location
+        active = [npc for npc in candidates if npc.alive and self.neighbor_index.has_neighbors(npc.id)]
+        llm_active_npcs = [npc.name for npc in active]
 
-            # Get other NPCs in the same location
-            location_npcs = self.locations[npc.location].get_alive_npcs(self.npcs)
-            location_npcs = [npc_id for npc_id in location_npcs if npc_id != npc.id]
+        # All requests see the state at the start of the phase and run concurrently
+        # (bounded by the client's concurrency limiter); results are applied in NPC order
+        decisions = await asyncio.gather(*(self._decide(npc, prefetched) for npc in active))
+        for npc, decision in zip(active, decisions):
+            if decision and npc.alive:
+                await self._apply_llm_decision(npc, decision)
+        
+        if prefetched:
+            self.prefetcher.report_day()
+        
+        if llm_active_npcs:
+            print(f"🧠 [LLM SESSION] Processed {len(llm_active_npcs)} NPCs: {', '.join(llm_active_npcs)}")
+        else:
+            print(f"🎲 [NO LLM] All decisions made through basic logic")
 
-            if not location_npcs:
+    async def _queued_llm_decisions(self):
+        """Non-blocking LLM decisions: apply decisions that arrived since
+        yesterday, queue new requests and act on rules in the meantime"""
+        queue = self.decision_queue
+        await queue.wait()  # Bounded: days still advance when the model is slow
+        
+        acted = set()
+        for npc_id, requested_day, decision in queue.ready(self.current_day):
+            npc = self.npcs.get(npc_id)
+            # "ignore" needs no target: it is applied as a deliberate no-op
+            applied = npc is not None and npc.alive and (
+                decision.get("action") == "ignore" or self._is_valid_target(npc, decision.get("target", ""))
+            )
+            if applied:
+                await self._apply_llm_decision(npc, decision, requested_day)
+                acted.add(npc_id)
+            queue.record_applied(requested_day, self.current_day, applied)
+        
+        for npc in self._draw_llm_candidates():
+            if npc.id in acted or not self.neighbor_index.has_neighbors(npc.id):
                 continue
+            if not queue.has_pending(npc.id):
+                # Snapshot the state now: the request only starts once the day yields
+                queue.submit(
+                    npc.id, self.current_day,
+                    self.llm_manager.get_npc_decision(npc.to_dict(self.npcs), self._decision_context(npc))
+                )
+            fallback = self._fallback_decision(npc)
+            if fallback:
+                queue.record_fallback()
+                await self._apply_llm_decision(npc, fallback)
+        
+        queue.report_day(self.current_day, len(acted))
 
-            llm_active_npcs.append(npc.name)
+    def _fallback_decision(self, npc: NPC) -> Optional[Dict]:
+        """Rule-based social decision towards the strongest relationship nearby"""
+        neighbors = self.neighbor_index.top_neighbors(npc.id, 1)
+        if not neighbors:
+            return None
+        target_id = neighbors[0]
+        relationship = npc.relationships.get(target_id, 0)
+        if relationship < -10:
+            action = "argue"
+        elif relationship > 30 and npc.energy > 30:
+            action = "help"
+        else:
+            action = "chat"
+        return {"action": action, "target": target_id, "reason": "acted on instinct"}
 
-            # Formulate context for LLM
-            context = {
-                "nearby_npcs": location_npcs[:3],  # Top 3 closest
-                "location": npc.location
-            }
+    def _close_decision_queue(self):
+        """Cancel unfinished requests and print queue statistics"""
+        queue = self.decision_queue
+        queue.close()
+        stats = queue.to_dict()
+        print(f"📬 [QUEUE] {stats['applied']}/{stats['submitted']} LLM decisions applied "
+              f"(staleness {stats['staleness_days']} days, avg {stats['average_staleness']}), "
+              f"{stats['fallbacks']} rule-based fallbacks, {stats['dropped']} dropped, "
+              f"{stats['expired']} expired, {stats['rejected']} rejected, {stats['failed']} failed; "
+              f"{stats['waited_seconds']}s spent waiting")
 
-            # Get decision from LLM
-            decision = await self.llm_manager.get_npc_decision(npc.to_dict(), context)
-            
-            if decision:
-                await self._apply_llm_decision(npc, decision, location_npcs)
+    def _draw_llm_candidates(self, day: Optional[int] = None) -> List[NPC]:
+        """Pick NPCs that make an LLM decision on a day (default today), in one vectorized draw"""
+        alive = [npc for npc in self.npcs.values() if npc.alive]
+        rolls = self.streams.uniforms(self.current_day if day is None else day, [npc.id for npc in alive], "llm")
+        return [npc for npc, roll in zip(alive, rolls) if roll <= self.llm_decision_chance]
+
+    async def _decide(self, npc: NPC, prefetched: bool) -> Optional[Dict]:
+        """Prefetched decision if it still fits, otherwise a fresh LLM request"""
+        decision = None
+        if prefetched:
+            decision = await self.prefetcher.take(npc, self._is_valid_target)
+        if decision is None:
+            decision = await self._request_decision(npc)
+        return decision
+
+    async def _request_decision(self, npc: NPC) -> Optional[Dict]:
+        """Get decision from LLM"""
+        return await self.llm_manager.get_npc_decision(npc.to_dict(self.npcs), self._decision_context(npc))
+
+    def _decision_context(self, npc: NPC) -> Dict:
+        """Formulate context for LLM"""
+        nearby_npcs = self.neighbor_index.top_neighbors(npc.id)  # Strongest friends/enemies
+        nearby_names = {npc_id: self.npcs[npc_id].name for npc_id in nearby_npcs}
+        location = self.locations[npc.location]
+        context = {
+            "nearby_npcs": nearby_npcs,
+            "nearby_names": nearby_names,
+            "nearby_stats": {
+                npc_id: {"health": self.npcs[npc_id].health, "energy": self.npcs[npc_id].energy,
+                         "mood": self.npcs[npc_id].mood}
+                for npc_id in nearby_npcs
+            },
+            "location": npc.location,
+            "location_type": location.type,
+            "location_description": location.description,
+            "day": self.current_day,
+            "world": self.output_dir  # Keeps conversations of worlds sharing one client apart
+        }
+        if self.memory:
+            situation = f"{npc.location} {npc.role} {' '.join(nearby_names.values())}"
+            context["memories"] = self.memory.recall(npc.id, situation, self.current_day)
+        return context
+
+    def _start_prefetch(self):
+        """Draw tomorrow's LLM candidates and request their decisions now"""
+        if not self.llm_manager or not self.llm_manager.ollama_available or not self.neighbor_index:
+            return
         
-        if llm_active_npcs:
-            print(f"🧠 [LLM SESSION] Processed {len(llm_active_npcs)} NPCs: {', '.join(llm_active_npcs)}")
-        else:
-            print(f"🎲 [NO LLM] All decisions made through basic logic")
+        candidates = [
+            npc for npc in self._draw_llm_candidates(self.current_day + 1)
+            if self.neighbor_index.has_neighbors(npc.id)
+        ]
+        self.prefetcher.start(self.current_day + 1, [npc.id for npc in candidates])
+        
+        for npc in candidates:
+            predicted = self._predict_next_day_stats(npc)
+            npc_data = npc.to_dict(self.npcs)
+            npc_data["stats"] = predicted
+            context = self._decision_context(npc)
+            context["day"] = self.current_day + 1
+            self.prefetcher.submit(
+                npc.id,
+                self.llm_manager.get_npc_decision(npc_data, context),
+                predicted
+            )
+
+    def _report_prompt_stats(self):
+        """Print prompt eval tokens, time to first token and local policy share of this run's decisions"""
+        if not hasattr(self.llm_manager, "prompt_status"):
+            return
+        status = self.llm_manager.prompt_status()
+        if status["decisions"]:
+            print(f"🧮 [LLM] {status['decisions']} decisions ({status['conversation']} prompt cache): "
+                  f"{status['avg_prompt_eval_tokens']} prompt tokens evaluated and "
+                  f"{status['avg_ttft']:.3f}s to first token on average")
+        policy = self.llm_manager.policy_status() if hasattr(self.llm_manager, "policy_status") else None
+        if policy:
+            print(f"🧭 [POLICY] {policy['local']} decisions answered locally ({policy['local_share']:.0%}), "
+                  f"{policy['routed']} routed to the LLM; agreement with {policy['audited']} audited LLM decisions: "
+                  f"action {policy['action_agreement']}, action+target {policy['full_agreement']}")
+
+    def _predict_next_day_stats(self, npc: NPC) -> Dict[str, int]:
+        """Expected stats at tomorrow's LLM phase (mean drift + basic needs)"""
+        stats = npc.stats
+        stats["energy"] -= 17.5  # Mean of randint(10, 25)
+        stats["hunger"] += 22.5  # Mean of randint(15, 30)
+        if stats["hunger"] > 70:
+            stats["hunger"] -= 40
+            stats["energy"] += 15
+            stats["mood"] += 10
+        elif stats["energy"] < 30:
+            stats["energy"] += 50
+            stats["mood"] += 15
+        return {name: int(max(0, min(100, value))) for name, value in stats.items()}
 
-    async def _apply_llm_decision(self, npc: NPC, decision: Dict, available_npcs: List[str]):
-        """Apply LLM decision"""
+    async def _apply_llm_decision(self, npc: NPC, decision: Dict, requested_day: Optional[int] = None):
+        """Apply LLM decision (requested_day: day a late decision was asked for)"""
         action = decision.get("action", "ignore")
         target_id = decision.get("target", "")
         reason = decision.get("reason", "unknown reason")
+        if requested_day is not None and requested_day != self.current_day:
+            reason = f"{reason}, decided on day {requested_day}"
         
-        if target_id not in available_npcs:
+        if not self._is_valid_target(npc, target_id):
             return
 
         target_npc = self.npcs[target_id]
@@ -312,7 +799,7 @@ class WorldSimulator:
             npc.update_relationship(target_id, 10)
             target_npc.update_relationship(npc.id, 5)
             npc.update_stat("mood", 10)
-            npc.add_action(f"💬 {npc.name} talked to {target_npc.name} ({reason})")
+            npc.add_action("chat", target_id, reason)
             
         elif action == "help":
             # Helping
@@ -321,7 +808,7 @@ class WorldSimulator:
             target_npc.update_relationship(npc.id, 20)
             target_npc.update_stat("mood", 15)
             npc.update_stat("energy", -10)
-            npc.add_action(f"🤝 {npc.name} helped {target_npc.name} ({reason})")
+            npc.add_action("help", target_id, reason)
             
         elif action == "argue":
             # Conflict
@@ -330,23 +817,37 @@ class WorldSimulator:
             target_npc.update_relationship(npc.id, -15)
             npc.update_stat("mood", -10)
             target_npc.update_stat("mood", -15)
-            npc.add_action(f"😠 {npc.name} argued with {target_npc.name} ({reason})")
+            npc.add_action("argue", target_id, reason)
+
+    def _is_valid_target(self, npc: NPC, target_id: str) -> bool:
+        """Target must be another alive NPC in the same location"""
+        target = self.npcs.get(target_id) if isinstance(target_id, str) else None
+        return (
+            target is not None and target_id != npc.id
+            and target.alive and target.location == npc.location
+        )
 
     def _random_events(self):
         """Generate random events in locations"""
         for location in self.locations.values():
-            if random.random() < CONFIG["random_event_chance"]:
-                possible_events = CONFIG["location_events"].get(location.name, ["strange event"])
-                event = random.choice(possible_events)
-                
-                # Affect NPCs in the location
-                alive_npcs = location.get_alive_npcs(self.npcs)
-                for npc_id in alive_npcs:
-                    npc = self.npcs[npc_id]
-                    self._apply_event_effects(npc, event)
-                
-                location.add_event(f"🎲 {event}")
-                print(f"📍 {location.name}: {event}")
+            rng = self.streams.stream(self.current_day, location.name, "event")
+            if rng.random() < self.random_event_chance:
+                self._trigger_location_event(location, rng)
+
+    def _trigger_location_event(self, location: Location, rng) -> str:
+        """Pick a random event for a location (drawn from rng) and apply it to NPCs there"""
+        possible_events = self.location_events.get(location.name, ["strange event"])
+        event = rng.choice(possible_events)
+        
+        # Affect NPCs in the location
+        alive_npcs = location.get_alive_npcs(self.npcs)
+        for npc_id in alive_npcs:
+            npc = self.npcs[npc_id]
+            self._apply_event_effects(npc, event)
+        
+        location.add_event(f"🎲 {event}")
+        print(f"📍 {location.name}: {event}")
+        return event
 
     def _apply_event_effects(self, npc: NPC, event: str):
         """Apply effects of the event to NPCs"""
@@ -364,6 +865,26 @@ class WorldSimulator:
             print(f"  🌾 Event effect: {npc.name} enjoys {event}")
             npc.update_stat("mood", 15)
 
+    def _record_memories(self, npcs, locations):
+        """Store today's social actions, deaths and location events as NPC memories"""
+        day = self.current_day
+        for npc in npcs:
+            for action in npc.actions_today:
+                code, target_id = action[0], action[1]
+                importance = ACTION_IMPORTANCE.get(code)
+                if importance is None:
+                    continue  # Routine needs are not worth remembering
+                if code == "died":
+                    witnesses = self.locations[npc.location].get_alive_npcs(self.npcs)
+                else:
+                    witnesses = [npc.id, target_id] if target_id in self.npcs else [npc.id]
+                self.memory.remember(witnesses, npc.format_action(action, self.npcs), day, importance)
+        for location in locations:
+            if location.events_today:
+                present = location.get_alive_npcs(self.npcs)
+                for event in location.events_today:
+                    self.memory.remember(present, f"{event} in {location.name}", day, EVENT_IMPORTANCE)
+
     def _log_day(self):
         """Log events of the day"""
         day_summary = {
@@ -379,7 +900,7 @@ class WorldSimulator:
             for npc_id in location.npc_ids:
                 npc = self.npcs[npc_id]
                 if npc.alive and npc.actions_today:
-                    actions.extend(npc.actions_today)
+                    actions.extend(npc.describe_actions(self.npcs))
             
             day_summary["locations"][loc_name] = {
                 "npc_count": alive_count,
@@ -390,23 +911,48 @@ class WorldSimulator:
         self.daily_logs.append(day_summary)
 
     def _save_world_state(self):
-        """Save world state to JSON"""
-        world_data = {
+        """Hand a world snapshot to the background writer"""
+        self.state_writer.submit(self._snapshot_world_state())
+
+    def _snapshot_world_state(self) -> Dict:
+        """Detached copy of the world state (safe to serialize on another thread)"""
+        return {
             "current_day": self.current_day,
-            "npcs": {npc_id: npc.to_dict() for npc_id, npc in self.npcs.items()},
+            "npcs": {npc_id: npc.to_dict(self.npcs) for npc_id, npc in self.npcs.items()},
             "locations": {loc_name: loc.to_dict() for loc_name, loc in self.locations.items()},
-            "daily_logs": self.daily_logs
+            "daily_logs": list(self.daily_logs)
         }
-        
-        with open("world_state.json", "w", encoding="utf-8") as f:
-            json.dump(world_data, f, ensure_ascii=False, indent=2)
 
     async def _generate_final_chronicle(self):
         """Generate final chronicle"""
         print(f"\n📜 Generating final chronicle...")
         print(f"🤖 [LLM] Starting final chronicle generation...")
         
-        # Collect data for chronicle
+        events_data = self._collect_chronicle_data()
+
+        # Generate chronicle (recorded as a final metrics entry after the last day)
+        if self.metrics:
+            self.metrics.start_final()
+        with self._phase("chronicle"):
+            if self.llm_manager:
+                chronicle = await self.llm_manager.generate_chronicle(events_data)
+            else:
+                print(f"⚠️ [LLM] LLM Manager unavailable, creating basic chronicle...")
+                chronicle = self._create_simple_chronicle(events_data)
+        if self.metrics:
+            self.metrics.end_final()
+
+        # Save chronicle
+        try:
+            chronicle_path = self._output_path("chronicles.md")
+            with open(chronicle_path, "w", encoding="utf-8") as f:
+                f.write(chronicle)
+            print(f"💾 [SAVE] Chronicle saved to {chronicle_path}")
+        except Exception as e:
+            print(f"❌ [SAVE] Error saving chronicle: {e}")
+
+    def _collect_chronicle_data(self) -> Dict:
+        """Collect key events, deaths and strong relationships for the chronicle"""
         events_data = {
             "current_day": self.current_day,
             "alive_count": len([npc for npc in self.npcs.values() if npc.alive]),
@@ -428,34 +974,19 @@ class WorldSimulator:
             if not npc.alive:
                 events_data["deaths"].append(f"{npc.name} (age {npc.age:.1f})")
 
-        # Collect interesting relationships
-        for npc in self.npcs.values():
-            if npc.alive:
-                for other_id, relation in npc.relationships.items():
-                    if relation > 50 or relation < -30:
-                        other_npc = self.npcs.get(other_id)
-                        if other_npc:
-                            status = "friends" if relation > 50 else "enemies"
-                            events_data["relationships_summary"].append(
-                                f"{npc.name} and {other_npc.name} are {status} ({relation})"
-                            )
+        # Collect interesting relationships (friend/enemy pairs from the threshold index)
+        if self.relationship_index:
+            for npc_id, other_id, status in self.relationship_index.pairs():
+                npc = self.npcs[npc_id]
+                other_npc = self.npcs.get(other_id)
+                if other_npc:
+                    events_data["relationships_summary"].append(
+                        f"{npc.name} and {other_npc.name} are {status} ({npc.relationships[other_id]})"
+                    )
 
         print(f"📊 [DATA] Collected: {len(events_data['key_events'])} events, {len(events_data['deaths'])} deaths, {len(events_data['relationships_summary'])} relationships")
 
-        # Generate chronicle
-        if self.llm_manager:
-            chronicle = await self.llm_manager.generate_chronicle(events_data)
-        else:
-            print(f"⚠️ [LLM] LLM Manager unavailable, creating basic chronicle...")
-            chronicle = self._create_simple_chronicle(events_data)
-
-        # Save chronicle
-        try:
-            with open("chronicles.md", "w", encoding="utf-8") as f:
-                f.write(chronicle)
-            print(f"💾 [SAVE] Chronicle saved to chronicles.md")
-        except Exception as e:
-            print(f"❌ [SAVE] Error saving chronicle: {e}")
+        return events_data
 
     def _create_simple_chronicle(self, events_data: Dict) -> str:
         """Create simple chronicle without LLM"""
@@ -0,0 +1,93 @@
+# 📁 state_writer.py - Background world state writer
+# 🎯 Core function: Serialize and atomically write world snapshots off the event loop
+# 🔗 Key dependencies: json, os, threading
+# 💡 Usage: Used by WorldSimulator._save_world_state
+
+import json
+import os
+import threading
+from typing import Dict, Optional
+
+
+def write_json_atomic(path: str, data: Dict):
+    """Write JSON to a temp file and rename it over the target"""
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        json.dump(data, f, ensure_ascii=False, indent=2)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp_path, path)
+
+
+class WorldStateWriter:
+    """Single-slot, double-buffered writer running on a background thread.
+
+    At most one snapshot is being written and one is pending; submitting while
+    a snapshot is still pending replaces it (latest state wins)."""
+
+    def __init__(self, path: str = "world_state.json", background: bool = True):
+        self.path = path
+        self.background = background
+        self.written = 0
+        self.coalesced = 0
+        self.last_error: Optional[Exception] = None
+        self._pending: Optional[Dict] = None
+        self._busy = False
+        self._closed = False
+        self._cond = threading.Condition()
+        self._thread = None
+
+    def submit(self, snapshot: Dict):
+        """Queue a snapshot for writing; never blocks on disk I/O"""
+        if not self.background:
+            self._write(snapshot)
+            return
+
+        with self._cond:
+            if self._pending is not None:
+                self.coalesced += 1
+            self._pending = snapshot
+            if self._thread is None:
+                self._closed = False
+                self._thread = threading.Thread(target=self._run, name="world-state-writer", daemon=True)
+                self._thread.start()
+            self._cond.notify_all()
+
+    def flush(self):
+        """Block until every submitted snapshot is on disk"""
+        with self._cond:
+            while self._pending is not None or self._busy:
+                self._cond.wait()
+
+    def close(self):
+        """Flush and stop the writer thread"""
+        with self._cond:
+            self._closed = True
+            self._cond.notify_all()
+        if self._thread:
+            self._thread.join()
+            self._thread = None
+
+    def _run(self):
+        while True:
+            with self._cond:
+                while self._pending is None and not self._closed:
+                    self._cond.wait()
+                if self._pending is None:
+                    return
+                snapshot, self._pending = self._pending, None
+                self._busy = True
+
+            self._write(snapshot)
+
+            with self._cond:
+                self._busy = False
+                self._cond.notify_all()
+
+    def _write(self, snapshot: Dict):
+        try:
+            write_json_atomic(self.path, snapshot)
+            self.written += 1
+        except Exception as e:
+            self.last_error = e
+            print(f"❌ [SAVE] Error saving world state: {e}")
@@ -0,0 +1,147 @@
+# 📁 status_server.py - Live world status HTTP server
+# 🎯 Core function: Serve in-memory world views and stream per-day diffs (SSE)
+# 🔗 Key dependencies: asyncio, json (standard library only)
+# 💡 Usage: Started by WorldSimulator when CONFIG["status_server"]["enabled"] is set
+
+import asyncio
+import json
+from typing import Dict, List, Optional
+from urllib.parse import unquote, urlsplit
+
+
+STATUS_TEXT = {200: "OK", 400: "Bad Request", 404: "Not Found", 405: "Method Not Allowed"}
+
+
+class StatusServer:
+    """Minimal asyncio HTTP/1.1 server running inside the simulator process.
+
+    GET /status             world status (get_world_status)
+    GET /npcs               NPC ids
+    GET /npcs/<id>          one NPC (with friend/enemy ids)
+    GET /locations/<name>   one location (with friendship factions)
+    GET /events             server-sent events: one "diff" event per day
+    """
+
+    def __init__(self, simulator, host: str = "127.0.0.1", port: int = 8765, queue_size: int = 64):
+        self.simulator = simulator
+        self.host = host
+        self.port = port
+        self.queue_size = queue_size
+        self.subscribers: List[asyncio.Queue] = []
+        self.dropped = 0
+        self._server: Optional[asyncio.AbstractServer] = None
+
+    async def start(self):
+        """Start listening (port 0 picks a free port)"""
+        self._server = await asyncio.start_server(self._handle, self.host, self.port)
+        self.port = self._server.sockets[0].getsockname()[1]
+        print(f"🛰️ Status server on http://{self.host}:{self.port}")
+
+    async def stop(self):
+        """Close listeners and end all event streams"""
+        for queue in self.subscribers:
+            self._offer(queue, None)
+        if self._server:
+            self._server.close()
+            await self._server.wait_closed()
+            self._server = None
+
+    def publish(self, diff: Dict):
+        """Push a day diff to every subscriber without waiting on slow clients"""
+        for queue in self.subscribers:
+            self._offer(queue, diff)
+
+    def _offer(self, queue: asyncio.Queue, item):
+        # Slow clients lose their oldest pending diff instead of blocking the tick
+        if queue.full():
+            queue.get_nowait()
+            self.dropped += 1
+        queue.put_nowait(item)
+
+    async def _handle(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        try:
+            request_line = (await reader.readline()).decode("latin-1").strip()
+            while (await reader.readline()) not in (b"\r\n", b"\n", b""):
+                pass
+            parts = request_line.split()
+            if len(parts) < 2:
+                await self._send(writer, 400, {"error": "bad request"})
+                return
+            method, target = parts[0], parts[1]
+            if method != "GET":
+                await self._send(writer, 405, {"error": "only GET is supported"})
+                return
+
+            path = unquote(urlsplit(target).path).rstrip("/") or "/"
+            if path == "/events":
+                await self._stream_events(writer)
+            else:
+                status, body = self._route(path)
+                await self._send(writer, status, body)
+        except (ConnectionError, asyncio.CancelledError):
+            pass
+        finally:
+            writer.close()
+
+    def _route(self, path: str):
+        """Resolve a JSON view from in-memory state"""
+        sim = self.simulator
+        if path in ("/", "/status"):
+            return 200, sim.get_world_status()
+        if path == "/npcs":
+            return 200, list(sim.npcs.keys())
+        if path.startswith("/npcs/"):
+            npc = sim.npcs.get(path[len("/npcs/"):])
+            if npc is None:
+                return 404, {"error": "unknown npc"}
+            data = npc.to_dict(sim.npcs)
+            if sim.relationship_index:
+                data["friends"] = sim.relationship_index.friends_of(npc.id)
+                data["enemies"] = sim.relationship_index.enemies_of(npc.id)
+            return 200, data
+        if path.startswith("/locations/"):
+            location = sim.locations.get(path[len("/locations/"):])
+            if location is None:
+                return 404, {"error": "unknown location"}
+            data = location.to_dict()
+            data["alive_npcs"] = location.get_alive_npcs(sim.npcs)
+            if sim.relationship_index:
+                data["factions"] = sim.relationship_index.factions(location.name)
+            return 200, data
+        return 404, {"error": "not found"}
+
+    async def _send(self, writer: asyncio.StreamWriter, status: int, body):
+        payload = json.dumps(body, ensure_ascii=False).encode("utf-8")
+        writer.write(
+            f"HTTP/1.1 {status} {STATUS_TEXT.get(status, '')}\r\n"
+            f"Content-Type: application/json; charset=utf-8\r\n"
+            f"Content-Length: {len(payload)}\r\n"
+            f"Connection: close\r\n\r\n".encode("latin-1") + payload
+        )
+        await writer.drain()
+
+    async def _stream_events(self, writer: asyncio.StreamWriter):
+        """Send a status snapshot, then one SSE message per published diff"""
+        queue = asyncio.Queue(self.queue_size)
+        self.subscribers.append(queue)
+        try:
+            writer.write(
+                b"HTTP/1.1 200 OK\r\n"
+                b"Content-Type: text/event-stream\r\n"
+                b"Cache-Control: no-cache\r\n"
+                b"Connection: close\r\n\r\n"
+            )
+            writer.write(self._sse("status", self.simulator.get_world_status()))
+            await writer.drain()
+            while True:
+                diff = await queue.get()
+                if diff is None:
+                    break
+                writer.write(self._sse("diff", diff))
+                await writer.drain()
+        finally:
+            self.subscribers.remove(queue)
+
+    @staticmethod
+    def _sse(event: str, data) -> bytes:
+        return f"event: {event}\ndata: {json.dumps(data, ensure_ascii=False)}\n\n".encode("utf-8")
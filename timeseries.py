@@ -0,0 +1,232 @@
+# 📁 timeseries.py - Columnar per-day simulation export
+# 🎯 Core function: Record NPC stats, alive flags, locations and relationship deltas as .npy columns
+# 🔗 Key dependencies: numpy (optional), models
+# 💡 Usage: Enabled via CONFIG["timeseries"]; read back with TimeSeriesReader
+
+import json
+import os
+from array import array
+from typing import Dict, List, Optional
+
+from models import STAT_NAMES
+from state_writer import write_json_atomic
+
+try:
+    import numpy as np
+    from numpy.lib.format import open_memmap
+except ImportError:
+    print("⚠️ NumPy not installed: pip install numpy")
+    np = None
+
+
+# Per-NPC columns: name -> dtype; each is a (days, npcs) memory-mapped .npy file
+NPC_COLUMNS = {
+    **{name: "uint8" for name in STAT_NAMES},
+    "age": "float32",
+    "alive": "bool",
+    "location": "int16"
+}
+
+# Relationship delta columns (one row per change, ordered by day)
+DELTA_COLUMNS = {
+    "rel_day": ("i", "int32"),
+    "rel_src": ("i", "int32"),
+    "rel_dst": ("i", "int32"),
+    "rel_delta": ("h", "int16")
+}
+
+
+def numpy_available() -> bool:
+    """Check whether the columnar exporter can run"""
+    return np is not None
+
+
+class TimeSeriesRecorder:
+    """Writes one row per day into memory-mapped columns.
+
+    Row 0 is first_day. Columns start with room for `capacity` days and
+    double when a later day does not fit; an existing export of the same
+    NPCs is reopened and continued instead of being overwritten."""
+
+    def __init__(self, directory: str, npc_ids: List[str], location_names: List[str],
+                 capacity: int, first_day: int = 1):
+        if np is None:
+            raise RuntimeError("NumPy is required for time-series export")
+
+        os.makedirs(directory, exist_ok=True)
+        self.directory = directory
+        self.npc_ids = list(npc_ids)
+        self.npc_index = {npc_id: i for i, npc_id in enumerate(self.npc_ids)}
+        self.location_names = list(location_names)
+        self.location_index = {name: i for i, name in enumerate(self.location_names)}
+        self.first_day = first_day
+        self.days_written = first_day - 1  # Last day stored
+        self.current_day = first_day
+        self.deltas = {name: array(code) for name, (code, _) in DELTA_COLUMNS.items()}
+
+        if not self._reopen():
+            self.capacity = max(1, capacity)
+            shape = (self.capacity, len(self.npc_ids))
+            self.columns = {
+                name: open_memmap(self._path(name), mode="w+", dtype=dtype, shape=shape)
+                for name, dtype in NPC_COLUMNS.items()
+            }
+        self._write_meta()  # NPC ids once here; days_written is updated by close()
+
+    def _path(self, name: str) -> str:
+        return os.path.join(self.directory, f"{name}.npy")
+
+    def _reopen(self) -> bool:
+        """Continue an export of the same NPCs that covers first_day (days from first_day on are rewritten)"""
+        meta_path = os.path.join(self.directory, "meta.json")
+        if not os.path.exists(meta_path):
+            return False
+        with open(meta_path, encoding="utf-8") as f:
+            meta = json.load(f)
+        start = meta.get("first_day", 1)
+        if (meta.get("npc_ids") != self.npc_ids or meta.get("locations") != self.location_names
+                or not start <= self.first_day <= meta.get("days_written", 0) + 1):
+            return False
+        try:
+            columns = {name: open_memmap(self._path(name), mode="r+") for name in NPC_COLUMNS}
+        except (OSError, ValueError):
+            return False
+
+        self.columns = columns
+        self.capacity = len(columns["alive"])
+        self.days_written = self.first_day - 1
+        self.first_day = start
+        kept = None
+        for name, (_, dtype) in DELTA_COLUMNS.items():
+            if not os.path.exists(self._path(name)):
+                continue
+            values = np.load(self._path(name))
+            if name == "rel_day":
+                kept = int(np.searchsorted(values, self.days_written, side="right"))
+            self.deltas[name].frombytes(values.astype(dtype).tobytes())
+        if kept is not None:
+            for values in self.deltas.values():
+                del values[kept:]
+        print(f"📈 [TIMESERIES] Continuing {self.directory}/ after day {self.days_written}")
+        return True
+
+    def reserve(self, last_day: int):
+        """Make room for rows up to last_day, doubling the capacity as needed"""
+        needed = last_day - self.first_day + 1
+        if needed <= self.capacity:
+            return
+        capacity = max(needed, self.capacity * 2)
+        rows = self.days_written - self.first_day + 1
+        for name, dtype in NPC_COLUMNS.items():
+            old = self.columns.pop(name)
+            temp_path = self._path(name) + ".grow"
+            grown = open_memmap(temp_path, mode="w+", dtype=dtype, shape=(capacity, len(self.npc_ids)))
+            grown[:rows] = old[:rows]
+            grown.flush()
+            del old, grown
+            os.replace(temp_path, self._path(name))
+            self.columns[name] = open_memmap(self._path(name), mode="r+")
+        self.capacity = capacity
+
+    def begin_day(self, day: int):
+        """Set the day that relationship deltas are attributed to"""
+        self.current_day = day
+
+    def on_relationship_change(self, npc, other_id: str, old_value: int, new_value: int):
+        """Observer called by NPC.update_relationship"""
+        if new_value == old_value:
+            return
+        src = self.npc_index.get(npc.id)
+        dst = self.npc_index.get(other_id)
+        if src is None or dst is None:
+            return
+        self.deltas["rel_day"].append(self.current_day)
+        self.deltas["rel_src"].append(src)
+        self.deltas["rel_dst"].append(dst)
+        self.deltas["rel_delta"].append(new_value - old_value)
+
+    def record_day(self, day: int, npcs: Dict):
+        """Store end-of-day NPC state as row day - first_day"""
+        if day < self.first_day:
+            raise ValueError(f"Day {day} is before the first recorded day {self.first_day}")
+        self.reserve(day)
+        row = day - self.first_day
+        npc_list = [npcs[npc_id] for npc_id in self.npc_ids]
+        count = len(npc_list)
+        for name in STAT_NAMES:
+            self.columns[name][row] = np.fromiter(
+                (getattr(npc, name) for npc in npc_list), dtype="uint8", count=count)
+        self.columns["age"][row] = np.fromiter((npc.age for npc in npc_list), dtype="float32", count=count)
+        self.columns["alive"][row] = np.fromiter((npc.alive for npc in npc_list), dtype="bool", count=count)
+        self.columns["location"][row] = np.fromiter(
+            (self.location_index.get(npc.location, -1) for npc in npc_list), dtype="int16", count=count)
+        self.days_written = max(self.days_written, day)  # Written to meta.json by close()
+
+    def close(self):
+        """Flush columns and write relationship deltas (recording may continue afterwards)"""
+        for column in self.columns.values():
+            column.flush()
+        for name, (_, dtype) in DELTA_COLUMNS.items():
+            np.save(self._path(name), np.frombuffer(self.deltas[name], dtype=dtype))
+        self._write_meta()
+        print(f"📈 [TIMESERIES] Days {self.first_day}-{self.days_written} saved to {self.directory}/")
+
+    def _write_meta(self):
+        write_json_atomic(os.path.join(self.directory, "meta.json"), {
+            "npc_ids": self.npc_ids,
+            "locations": self.location_names,
+            "first_day": self.first_day,
+            "capacity": self.capacity,
+            "days_written": self.days_written,
+            "columns": list(NPC_COLUMNS.keys()),
+            "delta_columns": list(DELTA_COLUMNS.keys())
+        })
+
+
+class TimeSeriesReader:
+    """Memory-mapped reader; only the requested columns and days are touched"""
+
+    def __init__(self, directory: str):
+        if np is None:
+            raise RuntimeError("NumPy is required for time-series export")
+        self.directory = directory
+        with open(os.path.join(directory, "meta.json"), encoding="utf-8") as f:
+            self.meta = json.load(f)
+        self.npc_ids: List[str] = self.meta["npc_ids"]
+        self.locations: List[str] = self.meta["locations"]
+        self.first_day = self.meta.get("first_day", 1)
+        self.days = self.meta["days_written"]  # Last recorded day
+        self._npc_index = {npc_id: i for i, npc_id in enumerate(self.npc_ids)}
+
+    def _load(self, name: str):
+        path = os.path.join(self.directory, f"{name}.npy")
+        try:
+            return np.load(path, mmap_mode="r")
+        except ValueError:
+            # Empty arrays cannot be memory-mapped
+            return np.load(path)
+
+    def column(self, name: str, first_day: Optional[int] = None, last_day: Optional[int] = None,
+               npc_ids: Optional[List[str]] = None):
+        """Array of shape (days, npcs) for days first_day..last_day (inclusive)"""
+        if name not in self.meta["columns"]:
+            raise KeyError(f"Unknown column: {name}")
+        data = self._load(name)
+        first_day = max(first_day or self.first_day, self.first_day)
+        last_day = min(last_day or self.days, self.days)
+        data = data[first_day - self.first_day:max(0, last_day - self.first_day + 1)]
+        if npc_ids is not None:
+            data = data[:, [self._npc_index[npc_id] for npc_id in npc_ids]]
+        return data
+
+    def npc_series(self, npc_id: str, name: str):
+        """One NPC's values of a column over all recorded days"""
+        return self.column(name)[:, self._npc_index[npc_id]]
+
+    def relationship_deltas(self, first_day: Optional[int] = None, last_day: Optional[int] = None) -> Dict:
+        """Relationship changes (day, src, dst, delta) within a day range"""
+        arrays = {name: self._load(name) for name in DELTA_COLUMNS}
+        days = arrays["rel_day"]
+        start = np.searchsorted(days, first_day or self.first_day, side="left")
+        end = np.searchsorted(days, last_day or self.days, side="right")
+        return {name: values[start:end] for name, values in arrays.items()}
@@ -0,0 +1,177 @@
+# 📁 world_fork.py - Copy-on-write world branches
+# 🎯 Core function: Copy-on-write mappings for WorldSimulator.fork() and concurrent branch runs
+# 🔗 Key dependencies: asyncio, concurrent.futures (one thread + event loop per branch)
+# 💡 Usage: branch = simulator.fork(seed=7); run_branches([simulator, branch], days=10)
+
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Dict, List, Optional
+
+_MISSING = object()
+
+
+def _peek(mapping, key):
+    """Read a key without copying it into a copy-on-write layer"""
+    if isinstance(mapping, CowDict):
+        return mapping._peek(key)
+    return mapping.get(key, _MISSING)
+
+
+def _keys(mapping):
+    """Keys in insertion order without copying anything"""
+    if isinstance(mapping, CowDict):
+        return mapping._keys()
+    return iter(mapping)
+
+
+class CowDict(dict):
+    """dict that lazily copies entries from a frozen shared base.
+
+    A key found only in the base is copied with `copy_item` on first access
+    (reads included, since callers mutate the objects they get). Iteration
+    first copies every remaining entry in the base's order, after which the
+    mapping is an ordinary dict. The base is never written again; it may
+    itself be a CowDict (nested forks)."""
+
+    def __init__(self, base, copy_item: Callable):
+        super().__init__()
+        self._base = base
+        self._copy = copy_item
+        self._added: List = []  # Keys set here that the base does not have, in order
+        self._deleted = set()  # Base keys deleted here
+
+    def __missing__(self, key):
+        if self._base is not None and key not in self._deleted:
+            value = _peek(self._base, key)
+            if value is not _MISSING:
+                value = self._copy(value)
+                dict.__setitem__(self, key, value)
+                return value
+        raise KeyError(key)
+
+    def _peek(self, key):
+        value = dict.get(self, key, _MISSING)
+        if value is _MISSING and self._base is not None and key not in self._deleted:
+            return _peek(self._base, key)
+        return value
+
+    def _keys(self):
+        if self._base is None:
+            return iter(dict.keys(self))
+        return self._ordered_keys()
+
+    def _ordered_keys(self):
+        for key in _keys(self._base):
+            if key not in self._deleted:
+                yield key
+        yield from self._added
+
+    def materialize(self):
+        """Copy all remaining base entries; afterwards this is a plain dict"""
+        if self._base is None:
+            return
+        entries = {}
+        for key in _keys(self._base):
+            if key in self._deleted:
+                continue
+            value = dict.get(self, key, _MISSING)
+            entries[key] = self._copy(_peek(self._base, key)) if value is _MISSING else value
+        for key in self._added:
+            entries[key] = dict.__getitem__(self, key)
+        dict.clear(self)
+        dict.update(self, entries)
+        self._base = None
+        self._added = []
+        self._deleted = set()
+
+    def copied(self) -> int:
+        """Entries owned by this mapping (copied or added since the fork)"""
+        return dict.__len__(self)
+
+    def __setitem__(self, key, value):
+        if self._base is not None and not dict.__contains__(self, key) and key not in self:
+            if key in self._deleted:
+                self.materialize()  # A re-added key goes last, as in a plain dict
+            else:
+                self._added.append(key)
+        dict.__setitem__(self, key, value)
+
+    def __delitem__(self, key):
+        if self._base is None:
+            dict.__delitem__(self, key)
+            return
+        if key not in self:
+            raise KeyError(key)
+        if dict.__contains__(self, key):
+            dict.__delitem__(self, key)
+        if key in self._added:
+            self._added.remove(key)
+        else:
+            self._deleted.add(key)
+
+    def pop(self, key, *default):
+        if key not in self:
+            if default:
+                return default[0]
+            raise KeyError(key)
+        value = self[key]
+        del self[key]
+        return value
+
+    def __contains__(self, key):
+        return self._peek(key) is not _MISSING
+
+    def __len__(self):
+        if self._base is None:
+            return dict.__len__(self)
+        return len(self._base) + len(self._added) - len(self._deleted)
+
+    def __bool__(self):
+        return len(self) > 0
+
+    def get(self, key, default=None):
+        try:
+            return self[key]
+        except KeyError:
+            return default
+
+    def __iter__(self):
+        self.materialize()
+        return dict.__iter__(self)
+
+    def keys(self):
+        self.materialize()
+        return dict.keys(self)
+
+    def values(self):
+        self.materialize()
+        return dict.values(self)
+
+    def items(self):
+        self.materialize()
+        return dict.items(self)
+
+
+def fork_mapping(mapping: Dict, copy_item: Callable):
+    """Freeze a mapping and return two copy-on-write views of it (O(1)).
+
+    The original object becomes the shared base and must not be used again."""
+    return CowDict(mapping, copy_item), CowDict(mapping, copy_item)
+
+
+def run_branches(worlds: List, days: int, on_day: Optional[Callable] = None) -> List[Dict]:
+    """Run worlds concurrently for `days` more days, one thread and event loop each.
+
+    on_day(world, day_result) is called from the world's thread for every
+    day. Threads overlap LLM waits and file output; CPU-bound work still
+    shares the interpreter lock. Returns each world's final status."""
+
+    async def run(world):
+        async for day_result in world.iter_days(days):
+            world._save_world_state()
+            if on_day:
+                on_day(world, day_result)
+        return world.get_world_status()
+
+    with ThreadPoolExecutor(max_workers=len(worlds), thread_name_prefix="branch") as pool:
+        return list(pool.map(lambda world: asyncio.run(run(world)), worlds))
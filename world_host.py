@@ -0,0 +1,237 @@
+# 📁 world_host.py - Multi-world host with a shared LLM pool
+# 🎯 Core function: Run many independent worlds over one pooled LLM connection
+# 🔗 Key dependencies: asyncio, simulator, llm_clients, config
+# 💡 Usage: python world_host.py or await WorldHost(...).run()
+
+import asyncio
+import os
+import sys
+import time
+from collections import deque
+from typing import Dict, List, Optional
+
+from dotenv import load_dotenv
+
+from simulator import WorldSimulator
+from llm_clients import LLMManager
+from config import CONFIG
+
+
+class WorldQueueStats:
+    """Per-world request counters of the shared pool"""
+
+    __slots__ = ("submitted", "completed", "failed", "wait_seconds", "service_seconds")
+
+    def __init__(self):
+        self.submitted = 0
+        self.completed = 0
+        self.failed = 0
+        self.wait_seconds = 0.0
+        self.service_seconds = 0.0
+
+
+class SharedLLMPool:
+    """One LLMManager shared by many worlds.
+
+    Every world has its own FIFO queue; a fixed number of workers take requests
+    round-robin across worlds with pending work, so a busy world cannot starve
+    the others. The worker count is an upper bound on requests in flight;
+    the shared client's adaptive limiter settles on what the server sustains."""
+
+    def __init__(self, llm_manager: LLMManager, concurrency: int = 4):
+        self.llm = llm_manager
+        self.concurrency = concurrency
+        self.queues: Dict[str, deque] = {}
+        self.stats: Dict[str, WorldQueueStats] = {}
+        self._ready: deque = deque()  # Worlds with pending requests, in round-robin order
+        self._pending: Optional[asyncio.Semaphore] = None
+        self._workers: List[asyncio.Task] = []
+
+    def start(self):
+        """Start the worker tasks (call from the running event loop)"""
+        self._pending = asyncio.Semaphore(0)
+        self._workers = [asyncio.ensure_future(self._worker()) for _ in range(self.concurrency)]
+
+    async def stop(self):
+        """Cancel workers; requests still queued are cancelled too"""
+        for task in self._workers:
+            task.cancel()
+        await asyncio.gather(*self._workers, return_exceptions=True)
+        self._workers = []
+        for queue in self.queues.values():
+            for future, _, _, _ in queue:
+                future.cancel()
+            queue.clear()
+        self._ready.clear()
+
+    def client(self, world_id: str) -> "PooledLLMClient":
+        """LLMManager-compatible view that queues requests for one world"""
+        self.queues.setdefault(world_id, deque())
+        self.stats.setdefault(world_id, WorldQueueStats())
+        return PooledLLMClient(self, world_id)
+
+    def submit(self, world_id: str, method: str, *args) -> asyncio.Future:
+        """Queue a call of an LLMManager method for a world"""
+        future = asyncio.get_running_loop().create_future()
+        queue = self.queues[world_id]
+        if not queue:
+            self._ready.append(world_id)
+        queue.append((future, method, args, time.perf_counter()))
+        self.stats[world_id].submitted += 1
+        self._pending.release()
+        return future
+
+    def _next_request(self):
+        """Pop the next request, rotating across worlds"""
+        world_id = self._ready.popleft()
+        queue = self.queues[world_id]
+        request = queue.popleft()
+        if queue:
+            self._ready.append(world_id)
+        return world_id, request
+
+    async def _worker(self):
+        while True:
+            await self._pending.acquire()
+            world_id, (future, method, args, queued) = self._next_request()
+            if future.cancelled():
+                continue
+            stats = self.stats[world_id]
+            started = time.perf_counter()
+            stats.wait_seconds += started - queued
+            try:
+                result = await getattr(self.llm, method)(*args)
+            except Exception as e:
+                stats.failed += 1
+                if not future.cancelled():
+                    future.set_exception(e)
+            else:
+                stats.completed += 1
+                if not future.cancelled():
+                    future.set_result(result)
+            finally:
+                stats.service_seconds += time.perf_counter() - started
+
+    def report(self):
+        """Print per-world queueing statistics"""
+        print(f"📊 [POOL] {self.concurrency} workers shared by {len(self.stats)} worlds")
+        if hasattr(self.llm, "concurrency_status"):
+            status = self.llm.concurrency_status()
+            print(f"   🎚️ Adaptive limit {status['limit']}, {status['throughput']} req/s, "
+                  f"{status['backoffs']} backoffs")
+        if hasattr(self.llm, "prompt_status"):
+            prompts = self.llm.prompt_status()
+            print(f"   🧮 {prompts['avg_prompt_eval_tokens']} prompt tokens evaluated, "
+                  f"{prompts['avg_ttft']:.3f}s to first token per decision ({prompts['conversation']} prompt cache)")
+        policy = self.llm.policy_status() if hasattr(self.llm, "policy_status") else None
+        if policy:
+            print(f"   🧭 Local policy answered {policy['local']} decisions ({policy['local_share']:.0%}), "
+                  f"{policy['routed']} routed to the LLM, agreement {policy['action_agreement']} "
+                  f"on {policy['audited']} audits")
+        for world_id, stats in sorted(self.stats.items()):
+            average_wait = stats.wait_seconds / stats.submitted if stats.submitted else 0.0
+            print(f"   🌐 {world_id}: {stats.completed}/{stats.submitted} requests, "
+                  f"{stats.failed} failed, avg wait {average_wait:.3f}s, "
+                  f"service {stats.service_seconds:.2f}s")
+
+
+class PooledLLMClient:
+    """Drop-in replacement for LLMManager inside one world of a WorldHost"""
+
+    def __init__(self, pool: SharedLLMPool, world_id: str):
+        self.pool = pool
+        self.world_id = world_id
+
+    @property
+    def ollama_available(self) -> bool:
+        return self.pool.llm.ollama_available
+
+    async def initialize(self):
+        """The shared manager is initialized once by the host"""
+
+    async def generate_random_names(self, name_type: str, count: int) -> Optional[Dict]:
+        if not self.ollama_available:
+            return None
+        return await self.pool.submit(self.world_id, "generate_random_names", name_type, count)
+
+    async def get_npc_decision(self, npc_data: Dict, context: Dict) -> Optional[Dict]:
+        # Confident local decisions never wait for a pool worker
+        situation, local, audit = self.pool.llm.local_decision(npc_data, context)
+        if local and not audit:
+            return local
+        if not self.ollama_available:
+            return local
+        return await self.pool.submit(self.world_id, "llm_decision", npc_data, context, situation, local)
+
+    async def generate_chronicle(self, events_data: Dict) -> str:
+        return await self.pool.submit(self.world_id, "generate_chronicle", events_data)
+
+
+class WorldHost:
+    """Runs several independent worlds as asyncio tasks in one process.
+
+    Each world gets its own random generator (seed + index), state and output
+    directory; they only share the LLM connection pool."""
+
+    def __init__(self, world_count: int = 4, concurrency: int = 4,
+                 output_root: str = "worlds", seed: Optional[int] = None):
+        self.world_count = world_count
+        self.concurrency = concurrency
+        self.output_root = output_root
+        self.seed = seed
+        self.worlds: Dict[str, WorldSimulator] = {}
+        self.pool: Optional[SharedLLMPool] = None
+
+    @classmethod
+    def from_config(cls, settings: Optional[Dict] = None) -> "WorldHost":
+        """Create a host from CONFIG["world_host"]"""
+        settings = settings if settings is not None else CONFIG.get("world_host", {})
+        return cls(
+            world_count=settings.get("worlds", 4),
+            concurrency=settings.get("concurrency", 4),
+            output_root=settings.get("output_root", "worlds"),
+            seed=settings.get("seed")
+        )
+
+    async def run(self):
+        """Initialize the shared LLM layer once, then run all worlds concurrently"""
+        llm_manager = LLMManager(CONFIG["ollama_model"], CONFIG["deepseek_api_key"],
+                                 concurrency=CONFIG.get("llm_concurrency"),
+                                 prompt_cache=CONFIG.get("prompt_cache"),
+                                 local_policy=CONFIG.get("local_policy"))
+        await llm_manager.initialize()
+        self.pool = SharedLLMPool(llm_manager, self.concurrency)
+        self.pool.start()
+
+        for index in range(self.world_count):
+            world_id = f"world_{index}"
+            seed = None if self.seed is None else self.seed + index
+            world = WorldSimulator(seed=seed, output_dir=os.path.join(self.output_root, world_id))
+            world.llm_manager = self.pool.client(world_id)
+            self.worlds[world_id] = world
+
+        print(f"\n🌐 Running {self.world_count} worlds over {self.concurrency} shared LLM workers\n")
+        started = time.perf_counter()
+        try:
+            await asyncio.gather(*(world.run_simulation() for world in self.worlds.values()))
+        finally:
+            await self.pool.stop()
+
+        print(f"\n🏁 {self.world_count} worlds finished in {time.perf_counter() - started:.1f}s")
+        for world_id, world in self.worlds.items():
+            status = world.get_world_status()
+            print(f"   🌐 {world_id}: day {status['day']}, "
+                  f"survivors {status['alive_npcs']}/{status['total_npcs']} -> {world.output_dir}")
+        self.pool.report()
+
+
+if __name__ == "__main__":
+    load_dotenv()
+    print("🚀 Starting multi-world host...")
+    try:
+        asyncio.run(WorldHost.from_config().run())
+    except KeyboardInterrupt:
+        print("\n👋 Goodbye!")
+    except Exception as e:
+        print(f"\n💥 Critical error: {e}")
+        sys.exit(1)